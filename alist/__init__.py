@@ -5,12 +5,22 @@ __version__ = "0.0.4"
 
 from requests import Session
 from requests import HTTPError
-import json
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+from urllib3.exceptions import NewConnectionError
+import threading
+import time
 from urllib.parse import urlparse
 from alist.public import AlistPublic
 from alist.admin import AlistAdmin
 from alist import utils
+from alist.cache import ListingCache
+from alist.retry import RetryPolicy
+from alist.limit import AlistLimiter
+from alist.coalesce import SingleFlight
+from alist.replica import AlistReplicaSet
 import alist.setting
+from alist.aio import AsyncAlistClient
 
 
 class AlistClient(object):
@@ -24,20 +34,104 @@ class AlistClient(object):
         authorization = None,
         ssl_verify = True,
         cert = None,
+        thread_safe = False,
+        pool_connections = 10,
+        pool_maxsize = 10,
+        cache = None,
+        driver_cache_dir = None,
+        timeout = None,
+        retry = True,
+        limiter = None,
+        coalesce = True,
+        primary = 0,
+        health_interval = 10,
     ):
+        """
+        :param base_url: Alist的地址。也可以是多个副本的地址的列表，
+                         见 :class:`AlistReplicaSet <alist.replica.AlistReplicaSet>` 。
+        :param password: 密码
+        :param authorization: 授权码
+        :param ssl_verify: 是否校验证书。
+        :param cert: 客户端证书，与requests的cert参数相同。
+        :param thread_safe: 线程安全模式。开启后每个线程使用独立的会话，
+                            可以在多个线程中共享同一个客户端。所有会话共享同一个连接池。
+        :param pool_connections: 连接池缓存的主机数量。
+        :param pool_maxsize: 每个主机保持的最大连接数，所有线程共用。
+        :param cache: 目录列表的缓存。True表示使用默认的 :class:`ListingCache <alist.cache.ListingCache>` ，
+                      也可以传入自定义的ListingCache。默认不缓存。
+        :param driver_cache_dir: 驱动列表的缓存目录。指定后驱动列表保存在本地，
+                                 服务器版本不变时不再重新获取。默认不缓存。
+        :param timeout: 请求的超时时间，单位秒，与requests的timeout参数相同，可以是 ``(连接超时, 读取超时)`` 。
+        :param retry: 重试策略。True表示使用默认的 :class:`RetryPolicy <alist.retry.RetryPolicy>` ，
+                      也可以传入自定义的RetryPolicy。False或None表示不重试。
+        :param limiter: 限流器，限制所有请求的速率和并发数。True表示使用默认的
+                        :class:`AlistLimiter <alist.limit.AlistLimiter>` ，也可以传入自定义的AlistLimiter。
+                        默认不限流。请求只在限流器中排队，所以
+                        :func:`priority <alist.schedule.priority>` 只在设置了限流器时生效。
+        :param coalesce: 是否合并相同的并发读请求。True表示使用默认的
+                         :class:`SingleFlight <alist.coalesce.SingleFlight>` ，也可以传入自定义的SingleFlight。
+        :param primary: 有多个副本时，接收修改操作的主副本在base_url中的下标。
+        :param health_interval: 有多个副本时，健康检查的间隔秒数。0表示不在后台检查。
+        """
+        self.replicas = None
+        if isinstance(base_url, (list, tuple)):
+            self.replicas = AlistReplicaSet(self, base_url, primary=primary, interval=health_interval)
+            base_url = self.replicas.primary.url
         self.base_url = base_url.rstrip('/')
         self.public = AlistPublic(self)
         self.admin  = None
-        self.session = Session()
+        self.thread_safe = thread_safe
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._local = threading.local()
+        # 线程安全模式下每个线程的会话都挂载这个适配器，连接在线程之间复用
+        self.adapter = HTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize)
+        self._session = None if thread_safe else self.new_session()
         self.password = ""
         self.ssl_verify = ssl_verify
         self.cert = cert
+        if cache is True:
+            cache = ListingCache()
+        self.cache = cache if cache is not False else None
+        self.driver_cache_dir = driver_cache_dir
+        self.timeout = timeout
+        if retry is True:
+            retry = RetryPolicy()
+        self.retry = retry or None
+        if limiter is True:
+            limiter = AlistLimiter()
+        self.limiter = limiter or None
+        if coalesce is True:
+            coalesce = SingleFlight()
+        self.single_flight = coalesce or None
 
         self.url = urlparse(self.base_url)
 
         self.authorization = None
         self.login(password, authorization)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """
+        停止副本的健康检查线程，关闭连接池。
+
+        .. code-block:: python
+
+            with AlistClient(['https://a.alist.domain', 'https://b.alist.domain'], password='xxxxx') as client:
+                client.public.path('/')
+        """
+        if self.replicas is not None:
+            self.replicas.close()
+        if self._session is not None:
+            self._session.close()
+        self.adapter.close()
+
     def login(self, password = None, authorization = None):
         """
         使用password或authorization登录。
@@ -59,6 +153,38 @@ class AlistClient(object):
             return self.admin.login()
         return False
 
+    def new_session(self):
+        """
+        创建一个新的会话。所有会话挂载客户端共享的 ``adapter`` ，使用同一个连接池，
+        连接池大小由 ``pool_connections`` 和 ``pool_maxsize`` 指定。
+
+        :return: requests.Session
+        """
+        session = Session()
+        session.mount('http://', self.adapter)
+        session.mount('https://', self.adapter)
+        return session
+
+    @property
+    def session(self):
+        """
+        当前线程使用的会话。线程安全模式下，每个线程第一次访问时创建自己的会话。
+        """
+        if not self.thread_safe:
+            return self._session
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self.new_session()
+            self._local.session = session
+        return session
+
+    @session.setter
+    def session(self, session):
+        if self.thread_safe:
+            self._local.session = session
+        else:
+            self._session = session
+
     def is_login(self):
         """
         是否登录
@@ -67,6 +193,38 @@ class AlistClient(object):
         """
         return self.authorization != None
 
+    def cached(self, key, func, *args, **kwargs):
+        """
+        如果开启了缓存，先从缓存中查找key，没有命中时调用func并缓存结果。
+        调用func期间路径的缓存被删除时，结果可能已经过时，不缓存。
+
+        :param key: 缓存的键，第二个元素是路径。
+        :param func: 没有命中时调用的函数。
+        :return: func的返回值。
+        """
+        if self.cache is None:
+            return func(*args, **kwargs)
+        found, value = self.cache.get(key)
+        if found:
+            return value
+        generation = self.cache.begin(key)
+        try:
+            value = func(*args, **kwargs)
+            self.cache.set(key, value, generation)
+        finally:
+            self.cache.end(key)
+        return value
+
+    def invalidate_cache(self, path, recursive = False):
+        """
+        删除路径的缓存。没有开启缓存时什么都不做。
+
+        :param path: 路径
+        :param recursive: 是否同时删除所有子路径的缓存。
+        """
+        if self.cache is not None:
+            self.cache.invalidate(path, recursive)
+
     @staticmethod
     def decode_response(response):
         """
@@ -76,21 +234,45 @@ class AlistClient(object):
         :raises: 如果响应包含HTTP错误则触发requests.HTTPError。
         """
         content_type = response.headers.get("content-type", "")
+        return AlistClient.decode_content(response.content,
+                                          content_type,
+                                          response.encoding,
+                                          response,
+                                          response.status_code)
 
-        content = response.content.strip()
-        if response.encoding:
-            content = content.decode(response.encoding)
-        if not content:
-            return content
-        if content_type.split(";")[0] != "application/json":
+    @staticmethod
+    def decode_content(content, content_type, encoding = None, response = None, status_code = 200):
+        """
+        解析服务器返回的原始数据。同步客户端和异步客户端共用此函数，以保证两者的错误处理一致。
+
+        :param content: 原始数据，bytes。
+        :param content_type: 响应头中的content-type。
+        :param encoding: 数据的编码。
+        :param response: 原始的requests响应，可以为None。
+        :param status_code: HTTP状态码。
+        :return: 将JSON解析为字典，如果不是JSON则返回原始字符串。
+        :raises: 如果响应包含HTTP错误则触发requests.HTTPError。
+        """
+        if content_type.split(";")[0] != "application/json" or not content or content.isspace():
+            content = content.strip()
+            if encoding:
+                content = content.decode(encoding)
+            # 网关等返回的错误页面不是JSON
+            if status_code >= 400:
+                raise HTTPError(status_code, content, response=response)
             return content
 
+        # JSON直接从bytes解析，不再复制strip和decode的中间结果。
+        # JSON解析器会忽略首尾的空白，UTF-8编码也由解析器处理。
+        if encoding and encoding.lower().replace('-', '').replace('_', '') not in ['utf8', 'ascii']:
+            content = content.decode(encoding)
         try:
-            content = json.loads(content)
+            content = utils.json_loads(content)
         except ValueError:
             raise ValueError(f"Invalid json content: {content}")
         if content['code'] != 200:
-            response.status_code = content['code']
+            if response is not None:
+                response.status_code = content['code']
             raise HTTPError(content['code'], content['message'], response=response)
 
         if content['data'] is None:
@@ -117,11 +299,9 @@ class AlistClient(object):
             "Authorization": self.authorization,
             # "Content-Type": "application/json;charset=UTF-8", # requests 自动填充
         }
-        request_kwargs = kwargs
-        if "headers" in request_kwargs:
-            request_kwargs["headers"].update(headers)
-        else:
-            request_kwargs["headers"] = headers
+        # 不修改调用者传入的参数，避免多个线程共享同一个headers字典
+        request_kwargs = dict(kwargs)
+        request_kwargs["headers"] = {**(kwargs.get("headers") or {}), **headers}
         request_kwargs['verify'] = self.ssl_verify
         request_kwargs['cert']   = self.cert
 
@@ -146,6 +326,87 @@ class AlistClient(object):
 
         return f'{self.base_url}{self.get_api_url(endpoint)}'
 
+    def request(self, method, endpoint, stream = False, retry = True, **kwargs):
+        """
+        发送HTTP请求到端点，经过限流器并按照重试策略重试，返回原始的响应。
+        stream为True时，收到响应头后就释放限流器的并发数。
+        有多个副本时，每次尝试都重新选择副本，出错的副本被摘除后，重试会发送到其他副本。
+
+        :param method: 请求方法，GET、POST或DELETE。
+        :param endpoint: 发送请求的端点。
+        :param stream: 是否延迟读取响应的内容。
+        :param retry: 为False时不使用客户端的重试策略，用于调用者自己重试的请求。
+        :return: requests.Response
+        """
+        policy = self.retry if retry else None
+        request_kwargs = self.get_request_dict(method, endpoint, **kwargs)
+        if self.timeout is not None:
+            request_kwargs.setdefault('timeout', self.timeout)
+        url = self.get_endpoint_url(endpoint)
+        attempt = 0
+        while True:
+            # 先在限流器中排队再选择副本，排队时不占用副本的请求数
+            started = self.limiter.acquire() if self.limiter is not None else None
+            replica = None
+            if self.replicas is not None:
+                try:
+                    replica = self.replicas.choose(method, endpoint)
+                except BaseException:
+                    if started is not None:
+                        self.limiter.cancel()
+                    raise
+                url = f'{replica.url}{self.get_api_url(endpoint)}'
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, stream=stream, **request_kwargs)
+            except (ConnectionError, Timeout) as e:
+                if started is not None:
+                    if isinstance(e, Timeout):
+                        self.limiter.release(started, endpoint, timeout=True)
+                    else:
+                        self.limiter.cancel()
+                if replica is not None:
+                    self.replicas.release(replica, ok=False, connected=is_connected(e))
+                if policy is None or not policy.retry_error(method, endpoint, is_connected(e), attempt):
+                    raise
+                time.sleep(policy.delay(attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                if started is not None:
+                    self.limiter.cancel()
+                if replica is not None:
+                    self.replicas.release(replica)
+                raise
+            if started is not None:
+                self.limiter.release(started, endpoint, response.status_code)
+            if replica is not None:
+                self.replicas.release(replica, time.monotonic() - start, ok=response.status_code < 500)
+
+            if policy is not None and policy.retry_status(method, endpoint, response.status_code, attempt):
+                delay = policy.delay(attempt, response.headers.get('Retry-After'))
+                response.close()
+                time.sleep(delay)
+                attempt += 1
+                continue
+            return response
+
+    def fetch(self, method, endpoint, **kwargs):
+        """
+        发送HTTP请求到端点并读取响应。相同的并发读请求共享同一个响应，各自解析，
+        调用者得到的数据互不影响。
+
+        :param method: 请求方法，GET、POST或DELETE。
+        :param endpoint: 发送请求的端点。
+        :return: requests.Response
+        """
+        if self.single_flight is None:
+            return self.request(method, endpoint, **kwargs)
+        key = self.single_flight.key(method, endpoint, kwargs)
+        if key is None:
+            return self.single_flight.write(self.request, method, endpoint, **kwargs)
+        return self.single_flight.do(key, self.request, method, endpoint, **kwargs)
+
     def get(self, endpoint, **kwargs):
         """
         发送HTTP GET请求到端点。
@@ -153,9 +414,7 @@ class AlistClient(object):
         :param endpoint: 发送请求的端点。
         :return: 服务器返回的数据。
         """
-        request_kwargs = self.get_request_dict("GET", endpoint, **kwargs)
-        response = self.session.get(self.get_endpoint_url(endpoint), **request_kwargs)
-        return self.decode_response(response)
+        return self.decode_response(self.fetch("GET", endpoint, **kwargs))
 
     def post(self, endpoint, **kwargs):
         """
@@ -164,10 +423,18 @@ class AlistClient(object):
         :param endpoint: 发送请求的端点。
         :return: 服务器返回的数据。
         """
-        request_kwargs = self.get_request_dict("POST", endpoint, **kwargs)
-        response = self.session.post(self.get_endpoint_url(endpoint), **request_kwargs)
-        # return response
-        return self.decode_response(response)
+        return self.decode_response(self.fetch("POST", endpoint, **kwargs))
+
+    def stream(self, method, endpoint, **kwargs):
+        """
+        发送HTTP请求到端点，但不读取响应的内容，用于增量解析大的响应。
+        调用者负责关闭返回的响应。
+
+        :param method: 请求方法，GET、POST或DELETE。
+        :param endpoint: 发送请求的端点。
+        :return: requests.Response
+        """
+        return self.request(method, endpoint, stream=True, **kwargs)
 
     def delete(self, endpoint, **kwargs):
         """
@@ -176,8 +443,16 @@ class AlistClient(object):
         :param endpoint: 发送请求的端点。
         :return: 服务器返回的数据。
         """
-        request_kwargs = self.get_request_dict("DELETE", endpoint, **kwargs)
-        response = self.session.delete(self.get_endpoint_url(endpoint), **request_kwargs)
-        # return response
-        return self.decode_response(response)
+        return self.decode_response(self.fetch("DELETE", endpoint, **kwargs))
 
+
+def is_connected(error):
+    """
+    发生错误时是否已经建立了连接。没有建立连接时请求一定没有发送到服务器。
+
+    :param error: requests的ConnectionError或Timeout。
+    """
+    if isinstance(error, ConnectTimeout):
+        return False
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return not isinstance(reason, NewConnectionError)
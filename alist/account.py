@@ -3,8 +3,12 @@
 # @Author: Kai Peng
 
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from typing_extensions import SupportsIndex
 from alist import utils
+from alist.registry import AlistRegistry
+from alist.record import AlistRecord
+from alist.schedule import inherit
 # from alist import AlistClient
 
 empty_account = {
@@ -57,9 +61,9 @@ class AlistAccount(dict):
     描述Alist账户信息。不同账户需要的信息各不相同。
     更详细的信息请参考 :class:`AlistAdminDrivers <alist.driver.AlistAdminDrivers>`。
     """
-    # account = deepcopy(empty_account)
     def __init__(self, **kwargs):
-        super().__init__(deepcopy(empty_account))
+        # 模板的值都是None，浅拷贝即可
+        super().__init__(empty_account)
         for key in kwargs:
             try:
                 self[key] = kwargs[key]
@@ -75,6 +79,14 @@ class AlistAccount(dict):
     def __delitem__(self, __key) -> None:
         raise NotImplemented
 
+class AccountRecord(AlistRecord):
+    """
+    账号的紧凑只读记录，字段与 :class:`AlistAccount` 相同。
+    账号快照使用它保存账号。
+    """
+    __slots__ = ()
+    fields = tuple(empty_account) + ('id',)
+
 class AlistAdminAccount(object):
     """
     ``/api/admin/account`` API的实现。创建、删除、修改账号。
@@ -88,21 +100,21 @@ class AlistAdminAccount(object):
         return self.alist.post(endpoint, json=account)
 
     def _create(self, **kwargs):
-        # 检查必要的字段是否设置
+        # 按驱动的属性检查字段，避免无效的请求
         try:
             driver = self.alist.admin.drivers.get_driver(kwargs['type'])
         except KeyError:
             raise KeyError(f"{kwargs['type']} not support")
 
-        required = driver.get_required()
-        required.append('name')
-        not_set = set(required) - set(kwargs.keys())
-        if len(not_set) != 0:
-            raise ValueError(f"{kwargs['type']} must set {','.join(not_set)}")
+        driver.get_validator().validate(kwargs)
 
         kwargs['updated_at'] = utils.get_timestamp()
         account = AlistAccount(**kwargs)
-        return self._post_create(account)
+        try:
+            return self._post_create(account)
+        finally:
+            # 新账号的ID由服务器分配，只能重新加载
+            self.alist.admin.accounts.store.invalidate()
 
 
     def create_Onedrive(self,
@@ -228,8 +240,15 @@ class AlistAdminAccount(object):
         :param name: 账号名字。即虚拟地址。
         :return: 删除成功返回True。否则触发异常。
         """
+        store = self.alist.admin.accounts.store
         account = self.alist.admin.accounts.get_account(name)
-        return self._delete(account['id'])
+        try:
+            result = self._delete(account['id'])
+        except Exception:
+            store.invalidate()
+            raise
+        store.remove(account)
+        return result
 
     def save(self, account: AlistAccount):
         """
@@ -248,17 +267,29 @@ class AlistAdminAccount(object):
         :return: 修改成功返回True。否则触发异常。
         """
         endpoint = f'{self.endpoint}/save'
-        return self.alist.post(endpoint, json = account)
+        store = self.alist.admin.accounts.store
+        try:
+            result = self.alist.post(endpoint, json = account)
+        except Exception:
+            store.invalidate()
+            raise
+        store.put(AccountRecord.from_dict(account))
+        return result
 
 class AlistAdminAccounts(object):
     """
     alist账号列表。获取账号。
     """
     accounts = list()
+
+    ttl = 60
+    """账号快照的有效时间，单位秒"""
+
     def __init__(self, alist, endpoint):
         self.alist = alist
         self.endpoint = f'{endpoint}/accounts'
         self.accounts = deepcopy(self.accounts)
+        self.store = AlistRegistry(self._records, ('id', 'name'), self.ttl)
 
     def get(self) -> list:
         """
@@ -272,25 +303,69 @@ class AlistAdminAccounts(object):
 
         :return: 账号列表。:class:`AlistAccount <alist.account.AlistAccount>` 组成的列表。
         """
-        self.accounts.clear()
-
+        # 构造新的列表再替换，多个线程同时调用时不会互相干扰
         results = self.alist.get(self.endpoint)
-        for r in results:
-            self.accounts.append(AlistAccount(**r))
+        self.accounts = [AlistAccount(**r) for r in results]
         return self.accounts
 
     def get_account(self, id_or_name) -> AlistAccount:
         """
-        根据账号ID或名字获取账号。
+        根据账号ID或名字获取账号。从本地的账号快照中查找，快照过期时才从服务器重新加载。
 
         :param id_or_name: 账号ID或名字。
         :return: 账号。
         """
-        accounts = self.get()
-        for acc in accounts:
-            if acc['id'] == id_or_name or acc['name'] == id_or_name:
-                return acc
-        raise KeyError(f'{id_or_name} not found')
+        return AlistAccount(**self.store.get(id_or_name))
+
+    def reload(self):
+        """
+        从服务器重新加载账号快照。
+
+        :return: 账号列表。
+        """
+        return [AlistAccount(**r) for r in self.store.reload()]
+
+    def _records(self):
+        return [AccountRecord.from_dict(a) for a in self.get()]
+
+    def create_many(self, accounts, workers = 8):
+        """
+        批量创建账号。所有账号先在本地检查，检查通过的账号并发创建，
+        某个账号失败不影响其他账号。在多个线程中发送请求，建议客户端开启 ``thread_safe`` 。
+
+        .. code-block:: python
+
+            results = client.admin.accounts.create_many([
+                {'type': 'Native', 'name': '/a', 'root_folder': '/tmp/a'},
+                {'type': 'Native', 'name': '/b', 'root_folder': '/tmp/b'},
+            ], workers=4)
+            failed = [r for r in results if not r['success']]
+
+        :param accounts: 账号的字段组成的字典的列表，必须包含 ``type`` 和 ``name`` 。
+        :param workers: 同时创建的账号数。
+        :return: 与accounts一一对应的结果，包含 ``name``、``success``、``error`` 。
+        """
+        errors = self.alist.admin.drivers.validate(accounts)
+        results = [{
+            'name': account.get('name'),
+            'success': False,
+            'error': ValueError('; '.join(e)) if e else None,
+        } for account, e in zip(accounts, errors)]
+
+        def create(i):
+            account = dict(accounts[i], updated_at=utils.get_timestamp())
+            try:
+                self.alist.admin.account._post_create(AlistAccount(**account))
+                results[i]['success'] = True
+            except Exception as e:
+                results[i]['error'] = e
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(inherit(create), [i for i, e in enumerate(errors) if not e]))
+        finally:
+            self.store.invalidate()
+        return results
 
     def __getitem__(self, index):
         return self.get()[index]
@@ -6,6 +6,8 @@ from alist.setting import AlistAaminSettings
 from alist.driver import AlistAdminDrivers
 from alist.account import AlistAdminAccount, AlistAdminAccounts
 from alist.meta    import AlistAdminMeta, AlistAdminMetas
+from alist.cache   import normpath, parent_path
+from alist.schedule import priority, current_priority
 
 class AlistAdmin(object):
     """
@@ -85,7 +87,10 @@ class AlistAdmin(object):
             'path': path,
             'names': names
         }
-        return self.alist.delete(endpoint, json=data)
+        try:
+            return self.alist.delete(endpoint, json=data)
+        finally:
+            self._invalidate_names(path, names)
 
     def mkdir(self, path):
         """
@@ -102,7 +107,11 @@ class AlistAdmin(object):
             'path': path
         }
         endpoint = f'{self.endpoint}/mkdir'
-        return self.alist.post(endpoint, json=data)
+        try:
+            return self.alist.post(endpoint, json=data)
+        finally:
+            self.alist.invalidate_cache(parent_path(path))
+            self.alist.invalidate_cache(path, recursive=True)
 
     def rename(self, path, name):
         """
@@ -122,7 +131,12 @@ class AlistAdmin(object):
             'name': name
         }
         endpoint = f'{self.endpoint}/rename'
-        return self.alist.post(endpoint, json=data)
+        try:
+            return self.alist.post(endpoint, json=data)
+        finally:
+            self.alist.invalidate_cache(parent_path(path))
+            self.alist.invalidate_cache(path, recursive=True)
+            self.alist.invalidate_cache(f'{normpath(parent_path(path))}/{name}', recursive=True)
 
     def move(self, src_dir, dst_dir, names):
         """
@@ -147,7 +161,11 @@ class AlistAdmin(object):
             'names': names
         }
         endpoint = f'{self.endpoint}/move'
-        return self.alist.post(endpoint, json=data)
+        try:
+            return self.alist.post(endpoint, json=data)
+        finally:
+            self._invalidate_names(src_dir, names)
+            self._invalidate_names(dst_dir, names)
 
     def copy(self, src_dir, dst_dir, names):
         """
@@ -172,11 +190,14 @@ class AlistAdmin(object):
             'names': names
         }
         endpoint = f'{self.endpoint}/copy'
-        return self.alist.post(endpoint, json=data)
+        try:
+            return self.alist.post(endpoint, json=data)
+        finally:
+            self._invalidate_names(dst_dir, names)
 
     def folder(self, path):
         """
-        获取指定路径下的所有文件夹。
+        获取指定路径下的所有文件夹。客户端开启缓存时，优先返回缓存的结果。
 
         .. code-block:: python
 
@@ -189,11 +210,12 @@ class AlistAdmin(object):
             'path': path
         }
         endpoint = f'{self.endpoint}/folder'
-        return self.alist.post(endpoint, json=data)
+        key = ('folder', normpath(path))
+        return self.alist.cached(key, self.alist.post, endpoint, json=data)
 
     def refresh(self, path):
         """
-        刷新指定路径。
+        刷新指定路径。刷新会让服务器重新列出整个目录树，没有设置优先级时是后台请求。
 
         .. code-block:: python
 
@@ -206,6 +228,16 @@ class AlistAdmin(object):
         data = {
             'path': path
         }
-        self.alist.post(endpoint, json=data)
-        self.alist.public.path(path)
+        with priority(current_priority('background')):
+            try:
+                self.alist.post(endpoint, json=data)
+            finally:
+                self.alist.invalidate_cache(path, recursive=True)
+            self.alist.public.path(path)
         return True
+
+    def _invalidate_names(self, path, names):
+        """删除目录和其中若干文件的缓存。"""
+        self.alist.invalidate_cache(path)
+        for name in names:
+            self.alist.invalidate_cache(f'{normpath(path)}/{name}', recursive=True)
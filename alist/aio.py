@@ -0,0 +1,1350 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import asyncio
+import os
+import ssl
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+import alist
+from alist import utils
+from alist.admin import AlistAdmin
+from alist.setting import AlistSetting, SettingRecord, AlistAaminSettings, AlistPublicSettings
+from alist.setting import group_front, group_back, group_other
+from alist.driver import AlistDriver, AlistAdminDrivers
+from alist.account import AlistAccount, AccountRecord, AlistAdminAccount, AlistAdminAccounts
+from alist.meta import AlistMeta, MetaRecord, AlistAdminMeta, AlistAdminMetas
+from alist.retry import RetryPolicy
+from alist.limit import AlistLimiter
+from alist.schedule import priority, current_priority
+from alist.coalesce import SingleFlight
+from alist.registry import AlistRegistry
+from alist.paging import PageSizeTuner
+from alist.walk import AlistWalker, join_path
+from alist.columnar import AlistColumns
+from alist.cache import normpath, parent_path
+
+
+class AsyncAlistClient(object):
+    """
+    基于asyncio的Alist客户端。接口与 :class:`AlistClient <alist.AlistClient>` 相同，
+    只是所有API都需要 ``await``， ``iter_files`` 和 ``walk`` 使用 ``async for`` 迭代。
+    依赖线程池或者同步的流式响应的方法（ ``iter_path`` 、 ``build_index`` 、 ``snapshot`` 、
+    ``download`` 、 ``upload_many`` ）只有同步客户端提供。依赖 ``aiohttp``，
+    可以通过 ``pip install python-alist-api[async]`` 安装。
+
+    .. code-block:: python
+
+        async with AsyncAlistClient('https://your.alist.domain', password='xxxxx') as client:
+            files = await client.public.path('/')
+            accounts = await client.admin.accounts.get()
+    """
+    def __init__(
+        self,
+        base_url,
+        password = None,
+        authorization = None,
+        ssl_verify = True,
+        cert = None,
+        limit = 100,
+        limit_per_host = 0,
+        driver_cache_dir = None,
+        timeout = None,
+        retry = True,
+        limiter = None,
+        coalesce = True,
+    ):
+        """
+        :param base_url: Alist的地址。
+        :param password: 密码。在 ``async with`` 或调用 :meth:`login` 时登录。
+        :param authorization: 授权码。
+        :param ssl_verify: 是否校验证书。
+        :param cert: 客户端证书，与requests的cert参数相同。
+        :param limit: 连接池的最大连接数。0表示不限制。
+        :param limit_per_host: 每个主机的最大连接数。0表示不限制。
+        :param driver_cache_dir: 驱动列表的缓存目录。
+        :param timeout: 请求的超时时间，单位秒，可以是 ``(连接超时, 读取超时)`` 。
+        :param retry: 重试策略，与 :class:`AlistClient <alist.AlistClient>` 相同。
+        :param limiter: 限流器，与 :class:`AlistClient <alist.AlistClient>` 相同。
+                        :func:`priority <alist.schedule.priority>` 只在设置了限流器时生效。
+        :param coalesce: 是否合并相同的并发读请求，与 :class:`AlistClient <alist.AlistClient>` 相同。
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncAlistClient requires aiohttp, "
+                              "install it with 'pip install python-alist-api[async]'")
+
+        self.base_url = base_url.rstrip('/')
+        self.public = AsyncAlistPublic(self)
+        self.admin  = None
+        self.session = None
+        self.password = ""
+        self.ssl_verify = ssl_verify
+        self.cert = cert
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.cache = None
+        self.driver_cache_dir = driver_cache_dir
+        self.timeout = client_timeout(timeout)
+        if retry is True:
+            retry = RetryPolicy()
+        self.retry = retry or None
+        if limiter is True:
+            limiter = AlistLimiter()
+        self.limiter = limiter or None
+        if coalesce is True:
+            coalesce = SingleFlight()
+        self.single_flight = coalesce or None
+
+        self.url = urlparse(self.base_url)
+
+        self.authorization = None
+        self._credentials = (password, authorization)
+
+    async def __aenter__(self):
+        await self.login(*self._credentials)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def login(self, password = None, authorization = None):
+        """
+        使用password或authorization登录。
+
+        :param password: 密码
+        :param authorization: 授权码
+        :return: 登录成功返回Ture，登录失败触发异常。
+        """
+        if self.is_login():
+            return True
+
+        self.authorization = authorization
+        self.password = password
+        if self.password != None and self.authorization == None:
+            self.authorization = utils.calc_authorization(password)
+
+        if self.authorization:
+            self.admin = AsyncAlistAdmin(self)
+            return await self.admin.login()
+        return False
+
+    def is_login(self):
+        """
+        是否登录
+
+        :return: 如果已登录，返回True；否则返回Flase。
+        """
+        return self.authorization != None
+
+    def cached(self, key, func, *args, **kwargs):
+        """异步客户端不缓存目录列表，直接调用func。"""
+        return func(*args, **kwargs)
+
+    def invalidate_cache(self, path, recursive = False):
+        """异步客户端不缓存目录列表，什么都不做。"""
+        pass
+
+    async def close(self):
+        """关闭连接池。"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _ssl_context(self):
+        if not self.ssl_verify:
+            return False
+        if self.cert is None:
+            return True
+        context = ssl.create_default_context()
+        if isinstance(self.cert, (list, tuple)):
+            context.load_cert_chain(*self.cert)
+        else:
+            context.load_cert_chain(self.cert)
+        return context
+
+    def get_session(self):
+        """
+        获取aiohttp会话。第一次调用时创建连接池，必须在事件循环中调用。
+
+        :return: aiohttp.ClientSession
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit,
+                                             limit_per_host=self.limit_per_host,
+                                             ssl=self._ssl_context())
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    def get_request_dict(self, method, endpoint, **kwargs):
+        """
+        获取aiohttp请求参数。
+
+        :param method: 请求方法，GET、POST或DELETE。
+        :param endpoint: URL端点。
+        :param kwargs: 其他可选参数。
+        :return: aiohttp请求参数。
+        """
+        headers = {
+            "Method": method,
+            "Path": self.get_api_url(endpoint),
+            "Authority": self.url.hostname,
+            "Scheme": self.url.scheme,
+            "Accept": "application/json, text/plain, */*",
+            "Origin": self.base_url,
+            "Authorization": self.authorization,
+        }
+        request_kwargs = dict(kwargs)
+        request_kwargs["headers"] = {**(kwargs.get("headers") or {}), **headers}
+        # aiohttp不接受值为None的头部和参数，requests会自动忽略它们
+        request_kwargs["headers"] = {k: v for k, v in request_kwargs["headers"].items() if v is not None}
+        if request_kwargs.get("params") is not None:
+            request_kwargs["params"] = {k: v for k, v in request_kwargs["params"].items() if v is not None}
+        return request_kwargs
+
+    def get_api_url(self, endpoint):
+        """
+        返回指定端点的api url，不包含主机和端口。
+
+        :param endpoint: 服务端点。
+        :return: api url
+        """
+        return f'/api{endpoint}'
+
+    def get_endpoint_url(self, endpoint):
+        """
+        返回指定端点的完整URL，包含主机和端口。
+
+        :param endpoint: 服务端点。
+        :return: 完整的URL。
+        """
+        return f'{self.base_url}{self.get_api_url(endpoint)}'
+
+    async def request(self, method, endpoint, **kwargs):
+        """
+        发送HTTP请求到端点，并按照 :meth:`AlistClient.decode_response <alist.AlistClient.decode_response>`
+        的规则解析响应。相同的并发读请求共享同一个响应，各自解析。
+
+        :param method: 请求方法，GET、POST或DELETE。
+        :param endpoint: 发送请求的端点。
+        :return: 服务器返回的数据。
+        """
+        if self.single_flight is None:
+            content, content_type, charset, status = await self.send(method, endpoint, **kwargs)
+        else:
+            key = self.single_flight.key(method, endpoint, kwargs)
+            if key is None:
+                content, content_type, charset, status = await self.single_flight.write_async(
+                    self.send, method, endpoint, **kwargs)
+            else:
+                content, content_type, charset, status = await self.single_flight.do_async(
+                    key, self.send, method, endpoint, **kwargs)
+        return alist.AlistClient.decode_content(content, content_type, charset, status_code=status)
+
+    async def send(self, method, endpoint, **kwargs):
+        """
+        发送HTTP请求到端点，经过限流器并按照重试策略重试。
+
+        :param method: 请求方法，GET、POST或DELETE。
+        :param endpoint: 发送请求的端点。
+        :return: ``(内容, content-type, 编码, 状态码)``
+        """
+        request_kwargs = self.get_request_dict(method, endpoint, **kwargs)
+        if self.timeout is not None:
+            request_kwargs.setdefault('timeout', self.timeout)
+        url = self.get_endpoint_url(endpoint)
+        attempt = 0
+        while True:
+            session = self.get_session()
+            started = await self.limiter.acquire_async() if self.limiter is not None else None
+            try:
+                async with session.request(method, url, **request_kwargs) as response:
+                    retry = self.retry is not None and self.retry.retry_status(method, endpoint, response.status, attempt)
+                    if not retry:
+                        content = await response.read()
+                if started is not None:
+                    self.limiter.release(started, endpoint, response.status)
+                    started = None
+                if retry:
+                    delay = self.retry.delay(attempt, response.headers.get('Retry-After'))
+                else:
+                    return (content,
+                            response.headers.get("content-type", ""),
+                            response.charset or 'utf-8',
+                            response.status)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if started is not None:
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.limiter.release(started, endpoint, timeout=True)
+                    else:
+                        self.limiter.cancel()
+                # ClientConnectorError表示连接没有建立，请求一定没有发送
+                connected = not isinstance(e, aiohttp.ClientConnectorError)
+                if self.retry is None or not self.retry.retry_error(method, endpoint, connected, attempt):
+                    raise
+                delay = self.retry.delay(attempt)
+            except BaseException:
+                if started is not None:
+                    self.limiter.cancel()
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, endpoint, **kwargs):
+        """
+        发送HTTP GET请求到端点。
+
+        :param endpoint: 发送请求的端点。
+        :return: 服务器返回的数据。
+        """
+        return await self.request("GET", endpoint, **kwargs)
+
+    async def post(self, endpoint, **kwargs):
+        """
+        发送HTTP POST请求到端点。
+
+        :param endpoint: 发送请求的端点。
+        :return: 服务器返回的数据。
+        """
+        return await self.request("POST", endpoint, **kwargs)
+
+    async def delete(self, endpoint, **kwargs):
+        """
+        发送HTTP DELETE请求到端点。
+
+        :param endpoint: 发送请求的端点。
+        :return: 服务器返回的数据。
+        """
+        return await self.request("DELETE", endpoint, **kwargs)
+
+
+def client_timeout(timeout):
+    """
+    把requests风格的timeout转换为 ``aiohttp.ClientTimeout`` 。
+
+    :param timeout: None、秒数或者 ``(连接超时, 读取超时)`` 。
+    """
+    if timeout is None or isinstance(timeout, aiohttp.ClientTimeout):
+        return timeout
+    # 与requests相同，timeout限制的是连接和每次读取的时间，而不是整个请求的时间
+    if isinstance(timeout, (tuple, list)):
+        connect, read = timeout
+    else:
+        connect = read = timeout
+    return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+
+# 以下类组合同步版本的数据结构（设置、账号、快照等），只提供有异步实现的方法。
+# 依赖线程或者流式响应的方法（iter_path、build_index、snapshot、download、upload_many）
+# 没有异步版本，不会出现在异步客户端上。
+
+async def _get_setting(settings, key):
+    if settings.store.is_expired():
+        await settings.reload()
+    s = settings.store.find(key)
+    if s is None:
+        raise KeyError(f'setting \'{key}\' not found')
+    return AlistSetting(**s)
+
+
+async def _reload_settings(settings):
+    results = await settings.get()
+    settings.store.set_items([SettingRecord.from_dict(s) for s in results])
+    return results
+
+
+class AsyncAlistPublicSettings(object):
+    """
+    :class:`AlistPublicSettings <alist.setting.AlistPublicSettings>` 的异步版本。
+    """
+    settings = AlistPublicSettings.settings
+
+    ttl = AlistPublicSettings.ttl
+    """设置快照的有效时间，单位秒"""
+
+    def __init__(self, alist, public, endpoint):
+        self.alist = alist
+        self.endpoint = endpoint
+        # 快照只通过协程加载，loader不会被调用
+        self.store = AlistRegistry(None, ('key',), self.ttl)
+
+        for key in self.settings:
+            attr = f"setting_{key.replace(' ', '_').replace('.', '_')}"
+            setattr(public, attr, self._factory_get_setting(key))
+
+    async def get(self, group = None):
+        """
+        获取公开的设置
+
+        :return: 公开的设置
+        """
+        endpoint = f'{self.endpoint}/settings'
+        settings = await self.alist.get(endpoint)
+        return [AlistSetting(**s) for s in settings]
+
+    def __call__(self, group = None):
+        return self.get(group)
+
+    async def get_setting(self, key):
+        """
+        获取指定设置。从本地的设置快照中查找，快照过期时才从服务器重新加载。
+
+        :param key: 设置的键值
+        """
+        return await _get_setting(self, key)
+
+    async def reload(self):
+        """
+        从服务器重新加载设置快照。
+
+        :return: 公开的设置
+        """
+        return await _reload_settings(self)
+
+    def _factory_get_setting(self, key):
+        def _get_setting_wrapper():
+            return self.get_setting(key)
+        return _get_setting_wrapper
+
+
+class AsyncAlistPublic(object):
+    """
+    ``/api/public`` 相关API的异步版本。方法与 :class:`AlistPublic <alist.public.AlistPublic>` 相同，
+    ``iter_files`` 和 ``walk`` 是异步生成器，使用 ``async for`` 迭代。
+    ``iter_path`` 、 ``build_index`` 、 ``snapshot`` 、 ``download`` 和 ``upload_many``
+    依赖线程池或者同步的流式响应，只有同步客户端提供。
+    """
+    def __init__(self, alist):
+        self.alist = alist
+        self.endpoint = '/public'
+        self.settings = AsyncAlistPublicSettings(self.alist, self, self.endpoint)
+
+    async def path(self, path, page_num=1, page_size=30, password=None):
+        """
+        与 :meth:`AlistPublic.path <alist.public.AlistPublic.path>` 相同。
+        """
+        endpoint = f'{self.endpoint}/path'
+        data = {
+            'path': path,
+            'password': password,
+            'page_num': page_num,
+            'page_size': page_size
+        }
+        key = ('path', normpath(path), page_num, page_size, password)
+        return await self.alist.cached(key, self.alist.post, endpoint, json=data)
+
+    async def iter_files(self, path, password=None, page_size=100, prefetch=True, tuner=None):
+        """
+        与 :meth:`AlistPublic.iter_files <alist.public.AlistPublic.iter_files>` 相同。
+        处理当前页时，下一页在单独的任务中请求。
+
+        .. code-block:: python
+
+            async for f in client.public.iter_files('/path'):
+                print(f['name'])
+        """
+        if tuner is None:
+            tuner = PageSizeTuner(page_size)
+
+        async def fetch(page_num, size):
+            start = time.monotonic()
+            result = await self.path(path, page_num, size, password)
+            return result, size, time.monotonic() - start
+
+        def submit(page_num, size):
+            if not prefetch:
+                return fetch(page_num, size)
+            return asyncio.ensure_future(fetch(page_num, size))
+
+        offset = 0
+        pending = submit(1, tuner.page_size)
+        try:
+            while pending is not None:
+                result, size, latency = await pending
+                pending = None
+                files = result['files']
+                offset += len(files)
+                tuner.update(latency, files)
+
+                total = (result.get('meta') or {}).get('total')
+                if total is None:
+                    done = len(files) < size
+                else:
+                    done = len(files) == 0 or offset >= total
+                if not done:
+                    size = tuner.next_page_size(offset)
+                    pending = submit(offset // size + 1, size)
+
+                for f in files:
+                    yield f
+        finally:
+            if asyncio.isfuture(pending):
+                pending.cancel()
+            elif pending is not None:
+                pending.close()
+
+    async def scandir(self, path, password=None, page_size=100):
+        """
+        与 :meth:`AlistPublic.scandir <alist.public.AlistPublic.scandir>` 相同。
+        """
+        return [f async for f in self.iter_files(path, password, page_size, prefetch=False)]
+
+    async def columns(self, path, password=None, page_size=100):
+        """
+        与 :meth:`AlistPublic.columns <alist.public.AlistPublic.columns>` 相同。
+        """
+        return AlistColumns.from_files(await self.scandir(path, password, page_size))
+
+    async def walk(self, top, max_depth=None, include=None, exclude=None,
+                   password=None, passwords=None, workers=8, onerror=None):
+        """
+        与 :meth:`AlistPublic.walk <alist.public.AlistPublic.walk>` 相同。
+        多个目录在不同的任务中并发列出，哪个先完成就先返回哪个。
+
+        .. code-block:: python
+
+            async for dirpath, dirnames, filenames in client.public.walk('/', exclude=['.git']):
+                print(dirpath, filenames)
+        """
+        # 只使用AlistWalker的过滤规则和密码匹配，遍历在事件循环中进行
+        walker = AlistWalker(self, top,
+                             max_depth=max_depth,
+                             include=include,
+                             exclude=exclude,
+                             password=password,
+                             passwords=passwords,
+                             workers=workers,
+                             onerror=onerror)
+
+        def listdir(path):
+            # 任务在创建时复制当前的优先级，遍历默认是后台请求
+            with priority(current_priority('background')):
+                return asyncio.ensure_future(
+                    self.scandir(path, walker.get_password(path), walker.page_size))
+
+        queue = deque([(top, 0)])
+        pending = dict()
+        try:
+            while queue or pending:
+                while queue and len(pending) < workers:
+                    path, depth = queue.popleft()
+                    pending[listdir(path)] = (path, depth)
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    path, depth = pending.pop(task)
+                    try:
+                        files = task.result()
+                    except Exception as e:
+                        if onerror is None:
+                            raise
+                        onerror(path, e)
+                        continue
+
+                    dirs, others = walker.split(path, files)
+                    if max_depth is None or depth < max_depth:
+                        for d in dirs:
+                            queue.append((join_path(path, d['name']), depth + 1))
+                    yield path, [d['name'] for d in dirs], [f['name'] for f in others]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def preview(self, path):
+        """
+        与 :meth:`AlistPublic.preview <alist.public.AlistPublic.preview>` 相同。
+        """
+        endpoint = f'{self.endpoint}/preview'
+        data = {
+            'path': path
+        }
+        return await self.alist.post(endpoint, json=data)
+
+    async def search(self, path, keyword):
+        """
+        与 :meth:`AlistPublic.search <alist.public.AlistPublic.search>` 相同。
+        """
+        endpoint = f'{self.endpoint}/search'
+        data = {
+            'path': path,
+            'keyword': keyword,
+        }
+        return await self.alist.post(endpoint, json=data)
+
+    async def upload(self, files, path, password=None):
+        """
+        上传文件到指定路径，与 :meth:`AlistPublic.upload <alist.public.AlistPublic.upload>` 相同。
+
+        :param files: 文件列表
+        :param path: 上传的路径
+        :param password: 访问密码
+        """
+        endpoint = f'{self.endpoint}/upload'
+        form = aiohttp.FormData()
+        form.add_field('path', path)
+        if password is not None:
+            form.add_field('password', password)
+        fs = list()
+        try:
+            for filename in files:
+                f = open(filename, 'rb')
+                fs.append(f)
+                form.add_field('files', f, filename=filename)
+            return await self.alist.post(endpoint, data=form)
+        finally:
+            for f in fs:
+                f.close()
+            self.alist.invalidate_cache(path)
+
+
+class AsyncAlistAaminSettings(object):
+    """
+    :class:`AlistAaminSettings <alist.setting.AlistAaminSettings>` 的异步版本。
+    """
+    settings_ro = AlistAaminSettings.settings_ro
+    settings_rw = AlistAaminSettings.settings_rw
+
+    ttl = AlistAaminSettings.ttl
+    """设置快照的有效时间，单位秒"""
+
+    def __init__(self, alist, admin, endpoint):
+        self.alist = alist
+        self.endpoint = endpoint
+        # 快照只通过协程加载，loader不会被调用
+        self.store = AlistRegistry(None, ('key',), self.ttl)
+
+        for key in self.settings_ro:
+            attr = f"setting_{key.replace(' ', '_').replace('.', '_')}"
+            setattr(admin, attr, self._factory_get(key))
+
+        for key in self.settings_rw:
+            attr = f"setting_{key.replace(' ', '_').replace('.', '_')}"
+            setattr(admin, attr, self._factory_get_or_update(key))
+
+    async def get(self, group = None):
+        """
+        获取管理员设置。
+
+        :param group: 指定设置组。如果留空，返回所有设置。
+        :return: 管理员设置。
+        """
+        endpoint = f'{self.endpoint}/settings'
+        if group is None:
+            settings = await self.alist.get(endpoint)
+        else:
+            settings = await self.alist.get(endpoint, params = {'group': group})
+
+        return [AlistSetting(**s) for s in settings]
+
+    def __call__(self, group = None):
+        return self.get(group)
+
+    def frontend(self):
+        """获取前端设置"""
+        return self.get(group=group_front)
+
+    def backend(self):
+        """获取后端设置"""
+        return self.get(group=group_back)
+
+    def other(self):
+        """获取其他设置"""
+        return self.get(group=group_other)
+
+    async def get_setting(self, key) -> AlistSetting:
+        """
+        获取指定设置。从本地的设置快照中查找，快照过期时才从服务器重新加载。
+
+        :param key: 设置的键值
+        """
+        return await _get_setting(self, key)
+
+    async def reload(self):
+        """
+        从服务器重新加载设置快照。
+
+        :return: 管理员设置。
+        """
+        return await _reload_settings(self)
+
+    async def save(self, settings: list):
+        """
+        保存设置。保存成功后更新本地的设置快照，保存失败时快照不变。
+
+        :param settings: AlistSetting列表
+        :return: 保存成功返回True
+        """
+        endpoint = f'{self.endpoint}/settings'
+        result = await self.alist.post(endpoint, json=[s for s in settings])
+        for s in settings:
+            self.store.put(SettingRecord.from_dict(s))
+        self.alist.public.settings.store.invalidate()
+        return result
+
+    def batch(self):
+        """
+        批量修改设置，所有修改通过一次请求保存。
+
+        .. code-block:: python
+
+            async with client.admin.settings.batch() as batch:
+                batch.set_value('title', 'My Alist')
+                batch.set_value('enable search', 'true')
+
+        :return: :class:`AsyncAlistSettingsBatch`
+        """
+        return AsyncAlistSettingsBatch(self)
+
+    async def _get_or_update(self, key, new = None):
+        s = await self.get_setting(key)
+        old = s.get_value()
+        if new is None or new == old:
+            return old
+        else:
+            s.set_value(new)
+            await self.save([s])
+            return new
+
+    _factory_get_or_update = AlistAaminSettings._factory_get_or_update
+    _factory_get = AlistAaminSettings._factory_get
+
+
+class AsyncAlistSettingsBatch(object):
+    """
+    :class:`AlistSettingsBatch <alist.setting.AlistSettingsBatch>` 的异步版本。
+    进入 ``async with`` 时加载一次设置快照，之后的修改只在本地检查，
+    退出时通过一次请求保存，发生异常时放弃所有修改。
+    """
+    def __init__(self, settings):
+        """
+        :param settings: :class:`AsyncAlistAaminSettings`
+        """
+        self.settings = settings
+        self.changes = dict()
+        self.snapshot = None
+
+    async def __aenter__(self):
+        await self.load()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.commit()
+        else:
+            self.rollback()
+
+    async def load(self):
+        """加载设置快照。快照没有过期时不发送请求。"""
+        if self.settings.store.is_expired():
+            settings = await self.settings.reload()
+        else:
+            settings = self.settings.store.all()
+        self.snapshot = {s['key']: s for s in settings}
+
+    def _get(self, key):
+        if self.snapshot is None:
+            raise RuntimeError('settings batch is not loaded, use "async with" or await load() first')
+        try:
+            return AlistSetting(**self.snapshot[key])
+        except KeyError:
+            raise KeyError(f'setting \'{key}\' not found')
+
+    def set_value(self, key, new):
+        """
+        修改设置的值，规则与 :meth:`AlistSetting.set_value <alist.setting.AlistSetting.set_value>` 相同。
+
+        :param key: 设置的键值
+        :param new: 新值
+        :return: 新值new。
+        """
+        if key in self.settings.settings_ro:
+            raise KeyError(f'setting \'{key}\' is read only')
+        s = self.changes.get(key)
+        if s is None:
+            s = self._get(key)
+        s.set_value(new)
+        self.changes[key] = s
+        return new
+
+    def get_value(self, key):
+        """
+        获取设置的值，包括尚未提交的修改。
+
+        :param key: 设置的键值
+        """
+        if key in self.changes:
+            return self.changes[key].get_value()
+        return self._get(key).get_value()
+
+    def changed(self):
+        """
+        :return: 值与设置快照不同的设置列表。
+        """
+        return [s for key, s in self.changes.items()
+                if s.get_value() != self._get(key).get_value()]
+
+    async def commit(self):
+        """
+        提交修改。没有变化时不发送请求。
+
+        :return: 保存的设置列表。
+        """
+        changed = self.changed()
+        if len(changed) != 0:
+            await self.settings.save(changed)
+            for s in changed:
+                self.snapshot[s['key']] = s
+        self.changes.clear()
+        return changed
+
+    def rollback(self):
+        """放弃所有修改。"""
+        self.changes.clear()
+
+
+class AsyncAlistAdminDrivers(object):
+    """
+    :class:`AlistAdminDrivers <alist.driver.AlistAdminDrivers>` 的异步版本，
+    同样支持 ``driver_cache_dir`` 。
+    """
+    def __init__(self, alist, endpoint) -> None:
+        self.alist = alist
+        self.endpoint = f'{endpoint}/drivers'
+        self.drivers = list()
+        self.index = dict()
+        self._lock = asyncio.Lock()
+
+    # 缓存文件的读写和账号的检查不涉及请求，与同步版本共用
+    cache_file = AlistAdminDrivers.cache_file
+    load_cache = AlistAdminDrivers.load_cache
+    save_cache = AlistAdminDrivers.save_cache
+    _errors = AlistAdminDrivers._errors
+
+    def set_drivers(self, results):
+        """
+        使用服务器返回的驱动列表替换本地的驱动列表。
+
+        :param results: ``{驱动名: 属性列表}``
+        """
+        drivers = list()
+        index = dict()
+        for name in results:
+            driver = AlistDriver(name, results[name])
+            drivers.append(driver)
+            index[name] = driver
+            func_name = f"driver_{name.replace('.', '_')}"
+            setattr(self.alist, func_name, self._factory_get_driver(name))
+        self.drivers = drivers
+        self.index = index
+
+    async def get(self):
+        """ 获取所有驱动的列表，包含驱动必须提供的属性。
+
+        :return: 驱动列表
+        """
+        async with self._lock:
+            if len(self.drivers) == 0:
+                await self._load()
+        return self.drivers
+
+    def __call__(self):
+        return self.get()
+
+    async def _load(self):
+        version = None
+        if self.alist.driver_cache_dir is not None:
+            version = (await self.alist.public.settings.get_setting('version'))['value']
+            results = self.load_cache(version)
+            if results is not None:
+                self.set_drivers(results)
+                return
+        results = await self.alist.get(self.endpoint)
+        self.set_drivers(results)
+        if version is not None:
+            self.save_cache(version, results)
+
+    async def reload(self):
+        """
+        从服务器重新获取驱动列表，并更新缓存文件。
+
+        :return: 驱动列表
+        """
+        async with self._lock:
+            self.drivers = list()
+            self.index = dict()
+            if self.alist.driver_cache_dir is not None:
+                version = (await self.alist.public.settings.get_setting('version'))['value']
+                try:
+                    os.remove(self.cache_file(version))
+                except OSError:
+                    pass
+            await self._load()
+        return self.drivers
+
+    async def get_driver(self, name) -> AlistDriver:
+        """
+        获取指定名字的驱动。
+
+        :param name: 驱动的名字。
+        """
+        await self.get()
+        try:
+            return self.index[name]
+        except KeyError:
+            raise KeyError(f'driver \'{name}\' not found')
+
+    async def validate(self, accounts):
+        """
+        批量检查账号，不发送创建请求。与
+        :meth:`AlistAdminDrivers.validate <alist.driver.AlistAdminDrivers.validate>` 相同。
+        """
+        await self.get()
+        return [self._errors(account) for account in accounts]
+
+    def _factory_get_driver(self, name):
+        def get_driver_wrapper():
+            return self.get_driver(name)
+        return get_driver_wrapper
+
+
+class AsyncAlistAdminAccount(object):
+    """
+    :class:`AlistAdminAccount <alist.account.AlistAdminAccount>` 的异步版本。
+    """
+    def __init__(self, alist, endpoint: str):
+        self.alist = alist
+        self.endpoint = f'{endpoint}/account'
+
+    # 只是按驱动组装字段，然后调用 _create
+    create_Onedrive = AlistAdminAccount.create_Onedrive
+    create_Native = AlistAdminAccount.create_Native
+    create_Alist = AlistAdminAccount.create_Alist
+
+    async def _post_create(self, account: AlistAccount):
+        endpoint = f'{self.endpoint}/create'
+        return await self.alist.post(endpoint, json=account)
+
+    async def _create(self, **kwargs):
+        # 按驱动的属性检查字段，避免无效的请求
+        try:
+            driver = await self.alist.admin.drivers.get_driver(kwargs['type'])
+        except KeyError:
+            raise KeyError(f"{kwargs['type']} not support")
+
+        driver.get_validator().validate(kwargs)
+
+        kwargs['updated_at'] = utils.get_timestamp()
+        account = AlistAccount(**kwargs)
+        try:
+            return await self._post_create(account)
+        finally:
+            self.alist.admin.accounts.store.invalidate()
+
+    async def _delete(self, id):
+        params = {'id': id}
+        return await self.alist.delete(self.endpoint, params = params)
+
+    async def delete(self, name):
+        """
+        删除账号
+
+        :param name: 账号名字。
+        :return: 删除成功返回True。否则触发异常。
+        """
+        store = self.alist.admin.accounts.store
+        account = await self.alist.admin.accounts.get_account(name)
+        try:
+            result = await self._delete(account['id'])
+        except Exception:
+            store.invalidate()
+            raise
+        store.remove(account)
+        return result
+
+    async def save(self, account: AlistAccount):
+        """
+        修改账号的设置并保存。
+
+        :param account: 账号信息
+        :return: 修改成功返回True。否则触发异常。
+        """
+        endpoint = f'{self.endpoint}/save'
+        store = self.alist.admin.accounts.store
+        try:
+            result = await self.alist.post(endpoint, json = account)
+        except Exception:
+            store.invalidate()
+            raise
+        store.put(AccountRecord.from_dict(account))
+        return result
+
+
+class AsyncAlistAdminAccounts(object):
+    """
+    :class:`AlistAdminAccounts <alist.account.AlistAdminAccounts>` 的异步版本。
+    """
+    ttl = AlistAdminAccounts.ttl
+
+    def __init__(self, alist, endpoint):
+        self.alist = alist
+        self.endpoint = f'{endpoint}/accounts'
+        self.accounts = list()
+        # 快照只通过协程加载，loader不会被调用
+        self.store = AlistRegistry(None, ('id', 'name'), self.ttl)
+
+    async def get(self) -> list:
+        """
+        获取账号列表。
+
+        :return: 账号列表。
+        """
+        results = await self.alist.get(self.endpoint)
+        self.accounts = [AlistAccount(**r) for r in results]
+        return self.accounts
+
+    def __call__(self, *args, **kwds):
+        return self.get()
+
+    async def get_account(self, id_or_name) -> AlistAccount:
+        """
+        获取指定账号。从本地的账号快照中查找，快照过期时才从服务器重新加载。
+
+        :param id_or_name: 账号id或者账号名字
+        :return: 账号。
+        """
+        if self.store.is_expired():
+            await self.reload()
+        account = self.store.find(id_or_name)
+        if account is None:
+            raise KeyError(f'{id_or_name} not found')
+        return AlistAccount(**account)
+
+    async def reload(self):
+        """
+        从服务器重新加载账号快照。
+
+        :return: 账号列表。
+        """
+        accounts = await self.get()
+        self.store.set_items([AccountRecord.from_dict(a) for a in accounts])
+        return list(accounts)
+
+    async def create_many(self, accounts, workers = 8):
+        """
+        批量创建账号，与 :meth:`AlistAdminAccounts.create_many <alist.account.AlistAdminAccounts.create_many>` 相同。
+        """
+        errors = await self.alist.admin.drivers.validate(accounts)
+        results = [{
+            'name': account.get('name'),
+            'success': False,
+            'error': ValueError('; '.join(e)) if e else None,
+        } for account, e in zip(accounts, errors)]
+        semaphore = asyncio.Semaphore(workers)
+
+        async def create(i):
+            account = dict(accounts[i], updated_at=utils.get_timestamp())
+            async with semaphore:
+                try:
+                    await self.alist.admin.account._post_create(AlistAccount(**account))
+                    results[i]['success'] = True
+                except Exception as e:
+                    results[i]['error'] = e
+
+        try:
+            # 批量创建默认是后台请求，任务在创建时复制当前的优先级
+            with priority(current_priority('background')):
+                tasks = [asyncio.ensure_future(create(i)) for i, e in enumerate(errors) if not e]
+            await asyncio.gather(*tasks)
+        finally:
+            self.store.invalidate()
+        return results
+
+    async def _getitem(self, index):
+        return (await self.get())[index]
+
+    def __getitem__(self, index):
+        return self._getitem(index)
+
+
+class AsyncAlistAdminMeta(object):
+    """
+    :class:`AlistAdminMeta <alist.meta.AlistAdminMeta>` 的异步版本。
+    """
+    def __init__(self, alist, endpoint):
+        self.alist = alist
+        self.endpoint = f'{endpoint}/meta'
+
+    # 只是组装字段，然后调用 _create
+    create = AlistAdminMeta.create
+
+    async def _post_create(self, meta: AlistMeta):
+        endpoint = f'{self.endpoint}/create'
+        return await self.alist.post(endpoint, json=meta)
+
+    async def _create(self, **kwargs):
+        if 'path' not in kwargs:
+            raise ValueError("meta must set path")
+        meta = AlistMeta(**kwargs)
+        try:
+            return await self._post_create(meta)
+        finally:
+            self.alist.admin.metas.store.invalidate()
+
+    async def _delete(self, id):
+        params = {'id': id}
+        return await self.alist.delete(self.endpoint, params = params)
+
+    async def delete(self, path):
+        """
+        删除meta
+
+        :param path: 路径
+        """
+        store = self.alist.admin.metas.store
+        meta = await self.alist.admin.metas.get_meta(path)
+        try:
+            result = await self._delete(meta['id'])
+        except Exception:
+            store.invalidate()
+            raise
+        store.remove(meta)
+        return result
+
+    async def save(self, meta: AlistMeta):
+        """
+        修改meta的设置并保存
+
+        :param meta: meta信息
+        """
+        endpoint = f'{self.endpoint}/save'
+        store = self.alist.admin.metas.store
+        try:
+            result = await self.alist.post(endpoint, json = meta)
+        except Exception:
+            store.invalidate()
+            raise
+        store.put(MetaRecord.from_dict(meta))
+        return result
+
+
+class AsyncAlistAdminMetas(object):
+    """
+    :class:`AlistAdminMetas <alist.meta.AlistAdminMetas>` 的异步版本。
+    """
+    ttl = AlistAdminMetas.ttl
+
+    def __init__(self, alist, endpoint):
+        self.alist = alist
+        self.endpoint = f'{endpoint}/metas'
+        self.metas = list()
+        # 快照只通过协程加载，loader不会被调用
+        self.store = AlistRegistry(None, ('id', 'path'), self.ttl)
+
+    async def get(self):
+        """
+        获取meta列表
+        """
+        results = await self.alist.get(self.endpoint)
+        self.metas = [AlistMeta(**r) for r in results]
+        return self.metas
+
+    def __call__(self, *args, **kwds):
+        return self.get()
+
+    async def get_meta(self, id_or_path) -> AlistMeta:
+        """
+        获取指定meta。从本地的meta快照中查找，快照过期时才从服务器重新加载。
+
+        :param id_or_path: meta id 或者是 meta path
+        """
+        if self.store.is_expired():
+            await self.reload()
+        meta = self.store.find(id_or_path)
+        if meta is None:
+            raise KeyError(f'{id_or_path} not found')
+        return AlistMeta(**meta)
+
+    async def reload(self):
+        """
+        从服务器重新加载meta快照。
+
+        :return: meta列表
+        """
+        metas = await self.get()
+        self.store.set_items([MetaRecord.from_dict(m) for m in metas])
+        return list(metas)
+
+    async def _getitem(self, index):
+        return (await self.get())[index]
+
+    def __getitem__(self, index):
+        return self._getitem(index)
+
+
+class AsyncAlistAdmin(object):
+    """
+    ``/api/admin`` 相关API的异步版本。方法与 :class:`AlistAdmin <alist.admin.AlistAdmin>` 相同。
+    """
+    def __init__(self, alist):
+        self.alist = alist
+        self.endpoint = '/admin'
+        self.settings = AsyncAlistAaminSettings(alist, self, self.endpoint)
+        self.drivers  = AsyncAlistAdminDrivers(alist, self.endpoint)
+        self.account  = AsyncAlistAdminAccount(alist, self.endpoint)
+        self.accounts = AsyncAlistAdminAccounts(alist, self.endpoint)
+
+        self.meta     = AsyncAlistAdminMeta(alist, self.endpoint)
+        self.metas    = AsyncAlistAdminMetas(alist, self.endpoint)
+
+    _invalidate_names = AlistAdmin._invalidate_names
+
+    async def login(self):
+        """登录。不建议直接使用此接口。"""
+        endpoint = f'{self.endpoint}/login'
+        return await self.alist.get(endpoint)
+
+    async def clear_cache(self):
+        """清理所有的缓存数据。"""
+        endpoint = f'{self.endpoint}/clear_cache'
+        return await self.alist.get(endpoint)
+
+    async def link(self, path):
+        """
+        返回真实的链接。
+
+        :param path: 文件路径。
+        """
+        data = {
+            'path': path
+        }
+        endpoint = f'{self.endpoint}/link'
+        return await self.alist.get(endpoint, json=data)
+
+    async def files(self, path, names):
+        """
+        删除指定路径下的若干个文件和文件夹。
+
+        :param path: 文件所在路径。
+        :param names: 文件名和文件夹列表。
+        """
+        endpoint = f'{self.endpoint}/files'
+        data = {
+            'path': path,
+            'names': names
+        }
+        try:
+            return await self.alist.delete(endpoint, json=data)
+        finally:
+            self._invalidate_names(path, names)
+
+    async def mkdir(self, path):
+        """
+        创建文件夹。
+
+        :param path: 新文件夹的路径
+        """
+        data = {
+            'path': path
+        }
+        endpoint = f'{self.endpoint}/mkdir'
+        try:
+            return await self.alist.post(endpoint, json=data)
+        finally:
+            self.alist.invalidate_cache(parent_path(path))
+            self.alist.invalidate_cache(path, recursive=True)
+
+    async def rename(self, path, name):
+        """
+        重命名文件或文件名
+
+        :param path: 旧文件名，完整路径
+        :param name: 新文件名，不带路径
+        """
+        data = {
+            'path': path,
+            'name': name
+        }
+        endpoint = f'{self.endpoint}/rename'
+        try:
+            return await self.alist.post(endpoint, json=data)
+        finally:
+            self.alist.invalidate_cache(parent_path(path))
+            self.alist.invalidate_cache(path, recursive=True)
+            self.alist.invalidate_cache(f'{normpath(parent_path(path))}/{name}', recursive=True)
+
+    async def move(self, src_dir, dst_dir, names):
+        """
+        移动文件和文件夹。
+
+        :param src_dir: 源文件夹
+        :param dst_dir: 目的文件夹
+        :param names: 文件/文件夹列表
+        """
+        data = {
+            'src_dir': src_dir,
+            'dst_dir': dst_dir,
+            'names': names
+        }
+        endpoint = f'{self.endpoint}/move'
+        try:
+            return await self.alist.post(endpoint, json=data)
+        finally:
+            self._invalidate_names(src_dir, names)
+            self._invalidate_names(dst_dir, names)
+
+    async def copy(self, src_dir, dst_dir, names):
+        """
+        复制文件和文件夹。
+
+        :param src_dir: 源文件夹
+        :param dst_dir: 目的文件夹
+        :param names: 文件/文件夹列表
+        """
+        data = {
+            'src_dir': src_dir,
+            'dst_dir': dst_dir,
+            'names': names
+        }
+        endpoint = f'{self.endpoint}/copy'
+        try:
+            return await self.alist.post(endpoint, json=data)
+        finally:
+            self._invalidate_names(dst_dir, names)
+
+    async def folder(self, path):
+        """
+        获取指定路径下的所有文件夹。
+
+        :param path: 指定路径。
+        """
+        data = {
+            'path': path
+        }
+        endpoint = f'{self.endpoint}/folder'
+        key = ('folder', normpath(path))
+        return await self.alist.cached(key, self.alist.post, endpoint, json=data)
+
+    async def refresh(self, path):
+        """
+        刷新指定路径。没有设置优先级时是后台请求。
+
+        :param path: 刷新的路径。
+        """
+        endpoint = f'{self.endpoint}/refresh'
+        data = {
+            'path': path
+        }
+        with priority(current_priority('background')):
+            try:
+                await self.alist.post(endpoint, json=data)
+            finally:
+                self.alist.invalidate_cache(path, recursive=True)
+            await self.alist.public.path(path)
+        return True
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def normpath(path):
+    """规范化路径，去掉末尾的 ``/`` 。"""
+    return '/' + path.strip('/')
+
+
+def parent_path(path):
+    """返回父目录的路径。"""
+    path = normpath(path)
+    return path.rsplit('/', 1)[0] or '/'
+
+
+class ListingCache(object):
+    """
+    目录列表的缓存。超过 ``maxsize`` 时淘汰最久没有使用的条目，条目在 ``ttl`` 秒后过期。
+    可以在多个线程中使用。
+
+    缓存的键是一个元组，第二个元素是路径，例如 ``('path', '/dir', 1, 30, None)`` 。
+    返回的结果由所有调用者共享，不要修改它。
+
+    正在请求的路径有一个代数，删除路径的缓存时增加代数。请求开始时调用 :meth:`begin`
+    得到代数，结束时把它传给 :meth:`set` ，代数变化说明请求期间路径被修改过，结果不缓存。
+    """
+    def __init__(self, maxsize = 1024, ttl = 60):
+        """
+        :param maxsize: 最多缓存的条目数。
+        :param ttl: 条目的有效时间，单位秒。
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.paths = dict()
+        self.fetching = dict()
+        self.generations = dict()
+        self.counter = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _remove(self, key):
+        del self.entries[key]
+        keys = self.paths[key[1]]
+        keys.discard(key)
+        if not keys:
+            del self.paths[key[1]]
+
+    def get(self, key):
+        """
+        获取缓存的条目。
+
+        :param key: 缓存的键。
+        :return: ``(True, value)`` ，没有命中时返回 ``(False, None)`` 。
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def begin(self, key):
+        """
+        开始请求key，请求结束后必须调用 :meth:`end` 。
+
+        :param key: 缓存的键。
+        :return: 路径当前的代数，传给 :meth:`set` 。
+        """
+        with self.lock:
+            path = key[1]
+            self.fetching[path] = self.fetching.get(path, 0) + 1
+            return self.generations.get(path, 0)
+
+    def end(self, key):
+        """
+        请求key结束。
+
+        :param key: 缓存的键。
+        """
+        with self.lock:
+            path = key[1]
+            count = self.fetching[path] - 1
+            if count:
+                self.fetching[path] = count
+            else:
+                # 代数只对正在请求的路径有意义
+                del self.fetching[path]
+                self.generations.pop(path, None)
+
+    def set(self, key, value, generation = None):
+        """
+        添加缓存条目。
+
+        :param key: 缓存的键。
+        :param value: 缓存的值。
+        :param generation: :meth:`begin` 返回的代数。路径的代数已经变化时不缓存。
+        :return: 是否缓存了value。
+        """
+        with self.lock:
+            if generation is not None and self.generations.get(key[1], 0) != generation:
+                return False
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.paths.setdefault(key[1], set()).add(key)
+            while len(self.entries) > self.maxsize:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+            return True
+
+    def _bump(self, paths):
+        self.counter += 1
+        for p in paths:
+            self.generations[p] = self.counter
+
+    def invalidate(self, path, recursive = False):
+        """
+        删除路径的所有缓存条目。
+
+        :param path: 路径
+        :param recursive: 是否同时删除所有子路径的缓存。
+        """
+        path = normpath(path)
+        prefix = path.rstrip('/') + '/'
+        with self.lock:
+            if recursive:
+                paths = [p for p in self.paths if p == path or p.startswith(prefix)]
+                self._bump([p for p in self.fetching if p == path or p.startswith(prefix)])
+            else:
+                paths = [path] if path in self.paths else []
+                if path in self.fetching:
+                    self._bump([path])
+            for p in paths:
+                for key in list(self.paths.get(p, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """清空缓存。"""
+        with self.lock:
+            self.entries.clear()
+            self.paths.clear()
+            self._bump(list(self.fetching))
+
+    def stats(self):
+        """
+        缓存统计信息。
+
+        :return: 包含 ``hits``、``misses``、``hit_rate``、``evictions``、``invalidations``、``size`` 的字典。
+        """
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self.entries),
+            }
+
+    def __len__(self):
+        return len(self.entries)
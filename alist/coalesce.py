@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import asyncio
+import json
+import threading
+from alist.retry import idempotent_endpoints
+
+
+class _Call(object):
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    合并相同的并发读请求。端点和参数都相同的请求同时进行时，只有第一个请求发送到服务器，
+    其他请求等待它完成并得到相同的响应。只合并可以重复发送的请求，修改操作总是单独发送。
+
+    修改操作开始和结束时都会增加代数 ``generation`` ，代数是请求的键的一部分，
+    所以修改操作之后发出的读请求不会合并到修改之前发出、可能读到旧数据的请求。
+
+    .. code-block:: python
+
+        client = AlistClient('https://your.alist.domain', coalesce=True)
+        # 多个线程同时列出同一个目录，只发送一个请求
+    """
+    def __init__(self, endpoints = idempotent_endpoints):
+        """
+        :param endpoints: 可以合并的POST端点，GET请求总是可以合并。
+        """
+        self.endpoints = frozenset(endpoints)
+        self.lock = threading.Lock()
+        self.calls = dict()
+        self.tasks = dict()
+        self.generation = 0
+
+    def key(self, method, endpoint, kwargs):
+        """
+        请求的键，包含当前的代数。
+
+        :return: 请求不能合并时返回None，这样的请求使用 :meth:`write` 发送。
+        """
+        if method != 'GET' and endpoint not in self.endpoints:
+            return None
+        try:
+            params = json.dumps(kwargs, sort_keys=True)
+        except TypeError:
+            # 上传的文件等无法比较的参数
+            return None
+        return self.generation, method, endpoint, params
+
+    def bump(self):
+        """增加代数，之后的读请求不再合并到正在进行的请求。"""
+        with self.lock:
+            self.generation += 1
+
+    def write(self, func, *args, **kwargs):
+        """
+        执行不能合并的请求。请求开始和结束时都增加代数：开始之后发出的读请求可能与它并发，
+        结束之后发出的读请求必须看到它的结果。
+
+        :param func: 发送请求的函数。
+        """
+        self.bump()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.bump()
+
+    async def write_async(self, func, *args, **kwargs):
+        """
+        :meth:`write` 的协程版本，func是协程函数。
+        """
+        self.bump()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self.bump()
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        执行func，键相同的并发调用共享同一个结果或异常。
+
+        :param key: 请求的键。
+        :param func: 发送请求的函数。
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key, func, *args, **kwargs):
+        """
+        :meth:`do` 的协程版本，func是协程函数。请求在单独的任务中执行，
+        一个调用者被取消不会影响其他调用者。
+        """
+        task = self.tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self.tasks[key] = task
+
+            def done(t):
+                if self.tasks.get(key) is t:
+                    del self.tasks[key]
+            task.add_done_callback(done)
+        return await asyncio.shield(task)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# NumPy 2的变长字符串类型
+string_dtype = getattr(getattr(numpy, 'dtypes', None), 'StringDType', None)
+
+
+def tz_offset(tz):
+    """
+    时区的偏移秒数。
+
+    :param tz: 时间字符串的最后6个字符，例如 ``+08:00`` 。不是时区时返回0，即UTC时间。
+    """
+    if len(tz) == 6 and tz[0] in '+-' and tz[3] == ':' and tz[1:3].isdigit() and tz[4:6].isdigit():
+        offset = int(tz[1:3]) * 3600 + int(tz[4:6]) * 60
+        return -offset if tz[0] == '-' else offset
+    return 0
+
+
+def parse_one(value):
+    """
+    解析一个时间字符串的前19个字符，无法识别时返回NaT。
+
+    :param value: 例如 ``2023-06-11T11:03:03`` 。
+    """
+    try:
+        return numpy.datetime64(value, 's')
+    except ValueError:
+        return numpy.datetime64('NaT', 's')
+
+
+def string_array(values):
+    """
+    创建字符串数组。定长的 ``str`` 数组会把每个元素补齐到最长的元素，
+    所以NumPy 2使用变长的 ``StringDType`` ，更早的版本使用object数组。
+
+    :param values: 字符串的列表。
+    """
+    if string_dtype is not None:
+        return numpy.array(values, dtype=string_dtype())
+    return numpy.array(values, dtype=object)
+
+
+def parse_time(values):
+    """
+    把Alist返回的时间字符串转换为UTC时间的 ``datetime64[s]`` 数组。
+    例如 ``2023-06-11T11:03:03.684818327+08:00`` 。无法识别的时间为NaT。
+
+    :param values: 时间字符串的列表。
+    """
+    bases = list()
+    offsets = list()
+    # 同一个目录的时区通常相同，缓存每种时区的偏移
+    cache = dict()
+    for value in values:
+        if not value or len(value) < 19:
+            bases.append('NaT')
+            offsets.append(0)
+            continue
+        bases.append(value[:19])
+        tz = value[-6:]
+        offset = cache.get(tz)
+        if offset is None:
+            offset = cache[tz] = tz_offset(tz)
+        offsets.append(offset)
+    try:
+        times = numpy.array(bases, dtype='datetime64[s]')
+    except ValueError:
+        # 有无法识别的时间，逐个解析
+        times = numpy.array([parse_one(b) for b in bases], dtype='datetime64[s]')
+    return times - numpy.array(offsets, dtype='timedelta64[s]')
+
+
+class AlistColumns(object):
+    """
+    按列保存的文件列表。``name``、``size``、``type``、``updated_at`` 各是一个NumPy数组，
+    过滤、排序、分组和求和都是向量化的，适合处理很大的目录。依赖 ``numpy`` ，
+    可以通过 ``pip install python-alist-api[columnar]`` 安装。
+
+    ``name`` 是变长的字符串数组（NumPy 2的 ``StringDType`` ，更早的版本是object数组），
+    不会把每个文件名都补齐到最长的文件名。
+
+    .. code-block:: python
+
+        cols = client.public.columns('/movies')
+        big = cols[cols['size'] > 1024 ** 3].sort('size', reverse=True)
+        print(big.sum('size'), cols.group_by_type())
+        videos = cols.filter(cols.has_ext('.mkv', '.mp4')).to_dicts()
+    """
+    columns = ('name', 'size', 'type', 'updated_at')
+    """列名"""
+
+    def __init__(self, name, size, type, updated_at):
+        """
+        :param name: 文件名数组。
+        :param size: 文件大小数组。
+        :param type: 文件类型数组。
+        :param updated_at: 修改时间数组，UTC时间。
+        """
+        if numpy is None:
+            raise ImportError("AlistColumns requires numpy, "
+                              "install it with 'pip install python-alist-api[columnar]'")
+        self.name = name
+        self.size = size
+        self.type = type
+        self.updated_at = updated_at
+        self._lower_name = None
+
+    @classmethod
+    def from_files(cls, files):
+        """
+        从文件列表创建。
+
+        :param files: 文件字典的可迭代对象，例如
+                      :meth:`AlistPublic.iter_files <alist.public.AlistPublic.iter_files>` 的返回值。
+        """
+        if numpy is None:
+            raise ImportError("AlistColumns requires numpy, "
+                              "install it with 'pip install python-alist-api[columnar]'")
+        names, sizes, types, times = list(), list(), list(), list()
+        for f in files:
+            names.append(f['name'])
+            sizes.append(f.get('size') or 0)
+            types.append(f.get('type') or 0)
+            times.append(f.get('updated_at'))
+        return cls(string_array(names),
+                   numpy.array(sizes, dtype=numpy.int64),
+                   numpy.array(types, dtype=numpy.int8),
+                   parse_time(times))
+
+    def __len__(self):
+        return len(self.name)
+
+    def __getitem__(self, key):
+        """
+        ``cols['size']`` 返回一列，其他的下标（切片、布尔数组、下标数组）返回新的AlistColumns。
+        """
+        if isinstance(key, str):
+            if key not in self.columns:
+                raise KeyError(key)
+            return getattr(self, key)
+        return self.filter(key)
+
+    def filter(self, mask):
+        """
+        选出部分文件。
+
+        :param mask: 布尔数组、下标数组或切片。
+        :return: 新的AlistColumns。
+        """
+        return type(self)(self.name[mask], self.size[mask], self.type[mask], self.updated_at[mask])
+
+    def has_ext(self, *exts):
+        """
+        文件名是否以指定的扩展名结尾，不区分大小写。
+
+        :param exts: 扩展名，例如 ``'.mkv'`` 。
+        :return: 布尔数组。
+        """
+        if self._lower_name is None:
+            names = self.name
+            if names.dtype == object:
+                names = names.astype(str)
+            self._lower_name = numpy.char.lower(names)
+        names = self._lower_name
+        mask = numpy.zeros(len(self), dtype=bool)
+        for ext in exts:
+            mask |= numpy.char.endswith(names, ext.lower())
+        return mask
+
+    def sort(self, by = 'name', reverse = False):
+        """
+        排序。
+
+        :param by: 排序的列名。
+        :param reverse: 是否降序。
+        :return: 新的AlistColumns。
+        """
+        order = numpy.argsort(self[by], kind='stable')
+        if reverse:
+            order = order[::-1]
+        return self.filter(order)
+
+    def sum(self, column = 'size'):
+        """
+        求和。
+
+        :param column: 列名。
+        """
+        return int(self[column].sum())
+
+    def group_by_type(self):
+        """
+        按文件类型分组统计。
+
+        :return: ``{type: {'count': 文件数, 'size': 总大小}}``
+        """
+        types, inverse = numpy.unique(self.type, return_inverse=True)
+        counts = numpy.bincount(inverse, minlength=len(types))
+        # bincount的weights是浮点数，大文件的总和会丢失精度
+        sizes = numpy.zeros(len(types), dtype=numpy.int64)
+        numpy.add.at(sizes, inverse, self.size)
+        return {int(t): {'count': int(c), 'size': int(s)}
+                for t, c, s in zip(types, counts, sizes)}
+
+    def to_dicts(self):
+        """
+        转换为文件字典的列表。``updated_at`` 转换为UTC时间的字符串，例如 ``2023-06-11T03:03:03Z`` 。
+        """
+        times = numpy.datetime_as_string(self.updated_at, timezone='UTC')
+        return [{'name': n, 'size': s, 'type': t, 'updated_at': u if u != 'NaT' else None}
+                for n, s, t, u in zip(self.name.tolist(), self.size.tolist(),
+                                      self.type.tolist(), times.tolist())]
+
+    def __repr__(self) -> str:
+        return f'AlistColumns({len(self)} files, {self.sum()} bytes)'
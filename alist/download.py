@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from requests import HTTPError, Timeout
+from alist.retry import RetryPolicy
+from alist.schedule import priority, current_priority, inherit
+
+state_suffix = '.alist-download'
+"""断点续传状态文件的后缀"""
+
+
+class AlistDownloader(object):
+    """
+    分段并发下载。先解析出文件的真实链接，然后用HTTP Range请求把文件分成若干段，
+    在线程池中并发下载，直接写入预先分配好的本地文件的对应位置。
+
+    下载进度保存在 ``本地文件名 + '.alist-download'`` 中，中断后再次下载同一个文件时，
+    从中断的位置继续。服务器不支持Range请求时，退化为单线程下载。
+
+    每个下载线程使用自己的会话（共享客户端的连接池），每个分段请求都经过客户端的限流器，
+    没有设置优先级时是后台请求。
+    """
+    def __init__(self,
+                 alist,
+                 segments = 4,
+                 min_segment_size = 4 * 1024 * 1024,
+                 chunk_size = 1024 * 1024,
+                 retries = 3,
+                 timeout = 60,
+                 callback = None,
+                 retry = None):
+        """
+        :param alist: :class:`AlistClient <alist.AlistClient>`
+        :param segments: 最多同时下载的分段数。
+        :param min_segment_size: 每个分段的最小字节数，小文件使用更少的分段。
+        :param chunk_size: 每次写入文件的字节数。
+        :param retries: 每个分段失败后的重试次数。
+        :param timeout: 连接和读取的超时时间，单位秒。
+        :param callback: 进度回调函数，参数是 ``(downloaded, size)`` 。
+        :param retry: 计算分段重试前等待时间的 :class:`RetryPolicy <alist.retry.RetryPolicy>` ，
+                      默认使用客户端的重试策略，客户端不重试时使用默认的RetryPolicy。
+        """
+        self.alist = alist
+        self.segments = segments
+        self.min_segment_size = min_segment_size
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.timeout = timeout
+        self.callback = callback
+        self.retry = retry or getattr(alist, 'retry', None) or RetryPolicy()
+        self.lock = threading.Lock()
+        self._local = threading.local()
+
+    def session(self):
+        """当前线程使用的会话，每个下载线程第一次请求时创建自己的会话。"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self.alist.new_session()
+        return session
+
+    def resolve(self, path):
+        """
+        解析文件的真实链接。登录后使用 :meth:`AlistAdmin.link <alist.admin.AlistAdmin.link>` ，
+        否则使用Alist的 ``/d`` 下载地址。
+
+        :param path: 文件路径。
+        :return: ``(url, headers)``
+        """
+        if not self.alist.is_login():
+            return f'{self.alist.base_url}/d{quote(path)}', {}
+
+        link = self.alist.admin.link(path)
+        headers = link.get('headers') or {}
+        if isinstance(headers, list):
+            headers = {h['name']: h['value'] for h in headers}
+        return link['url'], headers
+
+    def _get(self, url, headers, start = None, end = None):
+        headers = dict(headers)
+        if start is not None:
+            headers['Range'] = f'bytes={start}-{"" if end is None else end}'
+        # 与客户端的流式请求相同，收到响应头后就释放限流器的并发数
+        limiter = getattr(self.alist, 'limiter', None)
+        started = limiter.acquire() if limiter is not None else None
+        try:
+            response = self.session().get(url,
+                                          headers=headers,
+                                          stream=True,
+                                          timeout=self.timeout,
+                                          verify=self.alist.ssl_verify,
+                                          cert=self.alist.cert)
+        except Timeout:
+            if started is not None:
+                limiter.release(started, '/d', timeout=True)
+            raise
+        except BaseException:
+            if started is not None:
+                limiter.cancel()
+            raise
+        if started is not None:
+            limiter.release(started, '/d', response.status_code)
+        if response.status_code >= 400:
+            response.close()
+            raise HTTPError(response.status_code, response.reason, response=response)
+        return response
+
+    def probe(self, url, headers):
+        """
+        获取文件大小，以及服务器是否支持Range请求。
+
+        :return: ``(size, accept_ranges)`` ，无法获取大小时size为None。
+        """
+        with self._get(url, headers, 0, 0) as response:
+            if response.status_code == 206:
+                m = re.match(r'bytes \d+-\d+/(\d+)', response.headers.get('Content-Range', ''))
+                if m:
+                    return int(m.group(1)), True
+            length = response.headers.get('Content-Length')
+            return (int(length) if length is not None else None), False
+
+    def plan(self, size):
+        """
+        把文件分段。
+
+        :return: ``[start, end, done]`` 的列表，end包含在分段内。
+        """
+        count = max(1, min(self.segments, size // self.min_segment_size))
+        step = -(-size // count)
+        return [[start, min(start + step, size) - 1, 0] for start in range(0, size, step)]
+
+    def load_state(self, state_file, url_path, size):
+        try:
+            with open(state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('path') != url_path or state.get('size') != size:
+            return None
+        return state
+
+    def save_state(self, state_file, state):
+        tmp = f'{state_file}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, state_file)
+
+    def _write(self, f, data, offset):
+        if hasattr(os, 'pwrite'):
+            os.pwrite(f.fileno(), data, offset)
+        else:
+            with self.lock:
+                f.seek(offset)
+                f.write(data)
+
+    def _download_segment(self, f, url, headers, segment, progress):
+        attempts = 0
+        while True:
+            start, end, done = segment
+            if start + done > end:
+                return
+            try:
+                with self._get(url, headers, start + done, end) as response:
+                    if response.status_code != 206:
+                        raise HTTPError(response.status_code, 'range request not supported', response=response)
+                    for chunk in response.iter_content(self.chunk_size):
+                        chunk = chunk[:end + 1 - start - segment[2]]
+                        self._write(f, chunk, start + segment[2])
+                        with self.lock:
+                            segment[2] += len(chunk)
+                        progress(len(chunk))
+                if start + segment[2] <= end:
+                    raise IOError(f'segment {start}-{end} is incomplete')
+                return
+            except Exception as e:
+                attempts += 1
+                if attempts > self.retries:
+                    raise
+                response = getattr(e, 'response', None)
+                retry_after = response.headers.get('Retry-After') if response is not None else None
+                time.sleep(self.retry.delay(attempts - 1, retry_after))
+
+    def download(self, path, local, url = None, headers = None):
+        """
+        下载文件。
+
+        :param path: Alist上的文件路径。
+        :param local: 本地文件路径。
+        :param url: 可选，直接使用此链接下载，不再解析path。
+        :param headers: 可选，下载链接需要的请求头。
+        :return: 本地文件路径。
+        """
+        with priority(current_priority('background')):
+            return self._download(path, local, url, headers)
+
+    def _download(self, path, local, url, headers):
+        if url is None:
+            url, headers = self.resolve(path)
+        headers = headers or {}
+
+        size, accept_ranges = self.probe(url, headers)
+        if not accept_ranges or not size:
+            return self._download_stream(url, headers, local)
+
+        state_file = local + state_suffix
+        state = self.load_state(state_file, path, size)
+        if state is None or not os.path.exists(local):
+            state = {'path': path, 'size': size, 'segments': self.plan(size)}
+            with open(local, 'wb') as f:
+                f.truncate(size)
+            self.save_state(state_file, state)
+
+        segments = state['segments']
+        downloaded = [sum(s[2] for s in segments)]
+        saved = [downloaded[0]]
+
+        def progress(n):
+            with self.lock:
+                downloaded[0] += n
+                current = downloaded[0]
+                # 每下载若干个数据块保存一次进度
+                if current - saved[0] >= self.chunk_size * self.segments:
+                    saved[0] = current
+                    self.save_state(state_file, state)
+            if self.callback is not None:
+                self.callback(current, size)
+
+        with open(local, 'r+b') as f:
+            try:
+                with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+                    download_segment = inherit(self._download_segment)
+                    futures = [executor.submit(download_segment, f, url, headers, s, progress)
+                               for s in segments]
+                    for future in futures:
+                        future.result()
+            finally:
+                with self.lock:
+                    self.save_state(state_file, state)
+
+        os.remove(state_file)
+        return local
+
+    def _download_stream(self, url, headers, local):
+        downloaded = 0
+        with self._get(url, headers) as response, open(local, 'wb') as f:
+            size = response.headers.get('Content-Length')
+            size = int(size) if size is not None else None
+            for chunk in response.iter_content(self.chunk_size):
+                f.write(chunk)
+                downloaded += len(chunk)
+                if self.callback is not None:
+                    self.callback(downloaded, size)
+        return local
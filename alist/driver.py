@@ -3,6 +3,10 @@
 # @Author: Kai Peng
 
 from copy import deepcopy
+import hashlib
+import json
+import os
+import threading
 from typing import Any
 
 class AlistDriverAttribute(dict):
@@ -38,6 +42,72 @@ class AlistDriverAttribute(dict):
     def __delitem__(self, __key: Any) -> None:
         raise NotImplemented
 
+attr_types = {
+    'string': (str,),
+    'text'  : (str,),
+    'select': (str,),
+    'bool'  : (bool,),
+    'number': (int, float),
+}
+"""驱动属性的类型对应的Python类型"""
+
+
+class AlistDriverValidator(object):
+    """
+    根据驱动的属性检查账号，在发送请求之前发现缺少的字段、错误的类型和不允许的值。
+    由 :meth:`AlistDriver.get_validator` 创建，每个驱动只编译一次。
+    """
+    def __init__(self, driver):
+        """
+        :param driver: :class:`AlistDriver`
+        """
+        self.name = driver.get_name()
+        self.required = ['name'] + driver.get_required()
+        self.types = {'name': (str,)}
+        self.values = dict()
+        for attr in driver.attrs:
+            types = attr_types.get(attr['type'])
+            if types is not None:
+                self.types[attr['name']] = types
+            if attr['type'] == 'select' and attr['values']:
+                self.values[attr['name']] = frozenset(v.strip() for v in attr['values'].split(','))
+
+    def errors(self, account):
+        """
+        检查账号。
+
+        :param account: 账号的字段组成的字典。
+        :return: 错误信息的列表，没有错误时返回空列表。
+        """
+        errors = list()
+        not_set = [key for key in self.required if account.get(key) is None]
+        if len(not_set) != 0:
+            errors.append(f"{self.name} must set {','.join(not_set)}")
+        for key, types in self.types.items():
+            value = account.get(key)
+            if value is None:
+                continue
+            # bool是int的子类，number类型不接受bool
+            if not isinstance(value, types) or (bool not in types and isinstance(value, bool)):
+                errors.append(f"{key} must be {' or '.join(t.__name__ for t in types)}")
+            elif key in self.values and value not in self.values[key]:
+                errors.append(f"{key} must be one of {','.join(sorted(self.values[key]))}")
+        return errors
+
+    def validate(self, account):
+        """
+        检查账号，有错误时触发ValueError。
+
+        :param account: 账号的字段组成的字典。
+        """
+        errors = self.errors(account)
+        if len(errors) != 0:
+            raise ValueError('; '.join(errors))
+
+    def __call__(self, account):
+        return self.validate(account)
+
+
 class AlistDriver(object):
     """
     描述Alist驱动。一个驱动包含若干个属性。
@@ -47,6 +117,13 @@ class AlistDriver(object):
         self.attrs = list()
         for attr in attrs:
             self.attrs.append(AlistDriverAttribute(**attr))
+        self.validator = None
+
+    def get_validator(self) -> AlistDriverValidator:
+        """获取驱动的账号检查器。第一次调用时编译，之后直接返回。"""
+        if self.validator is None:
+            self.validator = AlistDriverValidator(self)
+        return self.validator
 
     def get_attr(self, name) -> AlistDriverAttribute:
         """
@@ -83,6 +160,9 @@ class AlistDriver(object):
 class AlistAdminDrivers(object):
     """
     驱动列表。api ``/api/admin/drivers`` 的实现。
+
+    创建客户端时指定 ``driver_cache_dir`` ，驱动列表会保存到该目录下，
+    按服务器地址和版本号区分。服务器版本不变时，直接从文件加载，不再请求服务器。
     """
     drivers = list()
 
@@ -90,18 +170,118 @@ class AlistAdminDrivers(object):
         self.alist = alist
         self.endpoint = f'{endpoint}/drivers'
         self.drivers = deepcopy(self.drivers)
+        self.index = dict()
+        self._lock = threading.Lock()
+
+    def cache_file(self, version):
+        """
+        驱动列表缓存文件的路径。
+
+        :param version: 服务器的版本号。
+        :return: 文件路径，没有指定缓存目录时返回None。
+        """
+        cache_dir = self.alist.driver_cache_dir
+        if cache_dir is None:
+            return None
+        key = hashlib.sha1(f'{self.alist.base_url}\n{version}'.encode('utf-8')).hexdigest()
+        return os.path.join(cache_dir, f'drivers-{key}.json')
+
+    def load_cache(self, version):
+        """
+        从缓存文件加载驱动列表。
+
+        :param version: 服务器的版本号。
+        :return: 服务器返回的驱动列表，缓存不存在或者不匹配时返回None。
+        """
+        filename = self.cache_file(version)
+        if filename is None:
+            return None
+        try:
+            with open(filename, encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache.get('base_url') != self.alist.base_url or cache.get('version') != version:
+            return None
+        return cache.get('drivers')
+
+    def save_cache(self, version, results):
+        """
+        保存驱动列表到缓存文件。写入失败时忽略。
+
+        :param version: 服务器的版本号。
+        :param results: 服务器返回的驱动列表。
+        """
+        filename = self.cache_file(version)
+        if filename is None:
+            return
+        cache = {'base_url': self.alist.base_url, 'version': version, 'drivers': results}
+        tmp = f'{filename}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(tmp, filename)
+        except OSError:
+            pass
+
+    def set_drivers(self, results):
+        """
+        使用服务器返回的驱动列表替换本地的驱动列表。
+
+        :param results: ``{驱动名: 属性列表}``
+        """
+        drivers = list()
+        index = dict()
+        for name in results:
+            driver = AlistDriver(name, results[name])
+            drivers.append(driver)
+            index[name] = driver
+            func_name = f"driver_{name.replace('.', '_')}"
+            setattr(self.alist, func_name, self._factory_get_driver(name))
+        self.drivers = drivers
+        self.index = index
 
     def get(self):
         """ 获取所有驱动的列表，包含驱动必须提供的属性。
 
         :return: 驱动列表
         """
-        if len(self.drivers) == 0:
-            results = self.alist.get(self.endpoint)
-            for name in results:
-                self.drivers.append(AlistDriver(name, results[name]))
-                func_name = f"driver_{name.replace('.', '_')}"
-                setattr(self.alist, func_name, self._factory_get_driver(name))
+        with self._lock:
+            if len(self.drivers) == 0:
+                self._load()
+        return self.drivers
+
+    def _load(self):
+        version = None
+        if self.alist.driver_cache_dir is not None:
+            version = self.alist.public.settings.get_setting('version')['value']
+            results = self.load_cache(version)
+            if results is not None:
+                self.set_drivers(results)
+                return
+        results = self.alist.get(self.endpoint)
+        self.set_drivers(results)
+        if version is not None:
+            self.save_cache(version, results)
+
+    def reload(self):
+        """
+        从服务器重新获取驱动列表，并更新缓存文件。
+
+        :return: 驱动列表
+        """
+        with self._lock:
+            self.drivers = list()
+            self.index = dict()
+            if self.alist.driver_cache_dir is not None:
+                version = self.alist.public.settings.get_setting('version')['value']
+                filename = self.cache_file(version)
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
+            self._load()
         return self.drivers
 
     def __call__(self) -> Any:
@@ -113,14 +293,37 @@ class AlistAdminDrivers(object):
 
         :param name: 驱动的名字。
         """
-        drivers = self.get()
-        for d in drivers:
-            if d.get_name() == name:
-                return d
-        raise KeyError(f'driver \'{name}\' not found')
+        self.get()
+        try:
+            return self.index[name]
+        except KeyError:
+            raise KeyError(f'driver \'{name}\' not found')
+
+    def validate(self, accounts):
+        """
+        批量检查账号，不发送创建请求。驱动列表只获取一次。
+
+        .. code-block:: python
+
+            errors = client.admin.drivers.validate([
+                {'type': 'Native', 'name': '/a', 'root_folder': '/tmp'},
+                {'type': 'Native', 'name': '/b'},
+            ])
+            # [[], ['Native must set root_folder']]
+
+        :param accounts: 账号的字段组成的字典的列表，必须包含 ``type`` 。
+        :return: 与accounts一一对应的错误信息列表，没有错误的账号对应空列表。
+        """
+        self.get()
+        return [self._errors(account) for account in accounts]
+
+    def _errors(self, account):
+        driver = self.index.get(account.get('type'))
+        if driver is None:
+            return [f"{account.get('type')} not support"]
+        return driver.get_validator().errors(account)
 
     def  _factory_get_driver(self, name):
         def get_driver_wrapper():
             return self.get_driver(name)
         return get_driver_wrapper
-
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import re
+import threading
+from array import array
+from alist.cache import normpath
+from alist.record import FileRecord
+from alist.walk import AlistWalker, join_path, match
+
+
+def trigrams(text):
+    """文本中所有长度为3的子串。"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def literals(pattern):
+    """glob模式中不包含通配符的部分。"""
+    return [s for s in re.split(r'\*|\?|\[[^\]]*\]', pattern) if s]
+
+
+class AlistSearchIndex(object):
+    """
+    本地的文件名搜索索引。遍历目录树，为每个文件名的三元组（长度为3的子串）建立倒排表，
+    子串、前缀和glob查询先用倒排表找出候选，再逐个确认，不需要请求服务器，也不需要开启 ``enable search`` 。
+
+    :meth:`refresh` 重新列出目录，只进入新增的或者文件信息（大小、修改时间）变化了的子目录。
+    注意很多存储只在直接的子项变化时才更新目录的修改时间，更深层的变化需要刷新对应的目录。
+
+    .. code-block:: python
+
+        index = client.public.build_index('/movies')
+        index.search('2023')
+        index.glob('*.mkv')
+        # 上传文件之后
+        index.refresh('/movies/new')
+    """
+    def __init__(self,
+                 public,
+                 top = '/',
+                 password = None,
+                 passwords = None,
+                 workers = 8,
+                 page_size = 100):
+        """
+        :param public: :class:`AlistPublic <alist.public.AlistPublic>`
+        :param top: 建立索引的目录。
+        :param password: 默认的访问密码。
+        :param passwords: 路径到访问密码的字典，使用最长匹配的路径的密码。
+        :param workers: 同时请求的目录数。
+        :param page_size: 列目录时的初始页面大小。
+        """
+        self.public = public
+        self.top = normpath(top)
+        self.password = password
+        self.passwords = passwords
+        self.workers = workers
+        self.page_size = page_size
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """清空索引。"""
+        with self.lock:
+            # records[id] 是 (path, 小写的文件名, FileRecord)，删除的元素为None
+            self.records = list()
+            self.ids = dict()
+            self.children = dict()
+            self.postings = dict()
+            self.dead = 0
+
+    def build(self):
+        """
+        遍历目录树，重新建立索引。
+
+        :return: 索引的文件数。
+        """
+        self.clear()
+        self.refresh()
+        return len(self)
+
+    def refresh(self, path = None):
+        """
+        重新列出目录，更新索引。只进入新增的、没有列出过的或者文件信息变化了的子目录。
+
+        :param path: 开始刷新的目录，默认是建立索引的目录。
+        :return: 重新列出的目录数。
+        """
+        walker = AlistWalker(self.public,
+                             normpath(path or self.top),
+                             password=self.password,
+                             passwords=self.passwords,
+                             workers=self.workers,
+                             page_size=self.page_size,
+                             descend=self.is_changed)
+        count = 0
+        for dirpath, dirs, files in walker:
+            self.apply(dirpath, dirs + files)
+            count += 1
+        return count
+
+    def is_changed(self, path, entry):
+        """
+        目录是否需要重新列出。
+
+        :param path: 目录的路径。
+        :param entry: 父目录列表中的文件信息。
+        """
+        with self.lock:
+            i = self.ids.get(path)
+            if i is None or path not in self.children:
+                return True
+            old = self.records[i][2]
+            return old['updated_at'] != entry.get('updated_at') or old['size'] != entry.get('size')
+
+    def apply(self, path, files):
+        """
+        使用目录的最新列表更新索引。
+
+        :param path: 目录的路径。
+        :param files: 目录中的所有文件。
+        """
+        path = normpath(path)
+        names = {f['name']: f for f in files}
+        with self.lock:
+            for name in self.children.get(path, set()) - names.keys():
+                self._remove(join_path(path, name))
+            for name, f in names.items():
+                self._put(join_path(path, name), f)
+            self.children[path] = set(names)
+            # 删除的元素过多时重建倒排表
+            if self.dead > 1024 and self.dead > len(self.ids):
+                self._compact()
+
+    def _put(self, path, entry):
+        i = self.ids.get(path)
+        if i is not None:
+            old = self.records[i][2]
+            if all(old[key] == entry.get(key) for key in ('size', 'type', 'updated_at')):
+                return
+            self.records[i] = None
+            self.dead += 1
+        name = entry['name'].lower()
+        i = len(self.records)
+        self.records.append((path, name, FileRecord.from_dict(entry)))
+        self.ids[path] = i
+        self._index(i, name)
+
+    def _index(self, i, name):
+        for t in trigrams('/' + name):
+            posting = self.postings.get(t)
+            if posting is None:
+                posting = self.postings[t] = array('I')
+            posting.append(i)
+
+    def _remove(self, path):
+        i = self.ids.pop(path, None)
+        if i is not None:
+            self.records[i] = None
+            self.dead += 1
+        for name in self.children.pop(path, ()):
+            self._remove(join_path(path, name))
+
+    def _compact(self):
+        records = [r for r in self.records if r is not None]
+        self.records = list()
+        self.ids = dict()
+        self.postings = dict()
+        self.dead = 0
+        for path, name, entry in records:
+            i = len(self.records)
+            self.records.append((path, name, entry))
+            self.ids[path] = i
+            self._index(i, name)
+
+    def _candidates(self, *texts):
+        """
+        可能包含所有texts的元素。texts是小写的，可以以 ``/`` 开头表示文件名的开头。
+        """
+        grams = set()
+        for text in texts:
+            grams |= trigrams(text)
+        if not grams:
+            return [r for r in self.records if r is not None]
+        postings = list()
+        for t in grams:
+            posting = self.postings.get(t)
+            if posting is None:
+                return []
+            postings.append(posting)
+        # 只使用最短的倒排表，其余的条件在确认时检查
+        records = self.records
+        return [records[i] for i in min(postings, key=len) if records[i] is not None]
+
+    def _result(self, records, limit):
+        results = sorted((path, entry) for path, _, entry in records)
+        return results if limit is None else results[:limit]
+
+    def search(self, text, limit = None):
+        """
+        查找文件名包含text的文件，不区分大小写。
+
+        :param text: 要查找的子串。
+        :param limit: 最多返回的结果数。
+        :return: ``(路径, 文件信息)`` 的列表，按路径排序。
+        """
+        text = text.lower()
+        with self.lock:
+            records = [r for r in self._candidates(text) if text in r[1]]
+        return self._result(records, limit)
+
+    def prefix(self, text, limit = None):
+        """
+        查找文件名以text开头的文件，不区分大小写。
+
+        :param text: 文件名的前缀。
+        :param limit: 最多返回的结果数。
+        :return: ``(路径, 文件信息)`` 的列表，按路径排序。
+        """
+        text = text.lower()
+        with self.lock:
+            records = [r for r in self._candidates('/' + text) if r[1].startswith(text)]
+        return self._result(records, limit)
+
+    def glob(self, pattern, limit = None):
+        """
+        查找匹配glob模式的文件，区分大小写。与 ``walk`` 的include参数相同，
+        包含 ``/`` 的模式匹配完整路径，其他模式只匹配文件名。
+
+        :param pattern: glob模式，例如 ``*.mkv`` 。
+        :param limit: 最多返回的结果数。
+        :return: ``(路径, 文件信息)`` 的列表，按路径排序。
+        """
+        with self.lock:
+            if '/' in pattern:
+                candidates = [r for r in self.records if r is not None]
+            else:
+                parts = [p.lower() for p in literals(pattern)]
+                # 不以通配符开头时，第一部分是文件名的前缀
+                if parts and pattern[0] not in '*?[':
+                    parts[0] = '/' + parts[0]
+                candidates = self._candidates(*parts)
+            records = [r for r in candidates if match([pattern], r[0], r[2]['name'])]
+        return self._result(records, limit)
+
+    def get(self, path):
+        """
+        获取文件信息。
+
+        :param path: 文件的路径。
+        :return: 文件信息，不存在时触发KeyError。
+        """
+        with self.lock:
+            return self.records[self.ids[normpath(path)]][2]
+
+    def __contains__(self, path):
+        return normpath(path) in self.ids
+
+    def __len__(self):
+        return len(self.ids)
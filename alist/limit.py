@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import asyncio
+import threading
+import time
+from alist.schedule import FairQueue, current_priority
+
+
+class TokenBucket(object):
+    """
+    令牌桶。每秒补充 ``rate`` 个令牌，最多积累 ``burst`` 个，每个请求消耗一个令牌。
+    令牌不足时请求预约之后的令牌，按照预约的顺序等待。
+    """
+    def __init__(self, rate, burst = None):
+        """
+        :param rate: 每秒的请求数。
+        :param burst: 允许的突发请求数，默认等于rate。
+        """
+        self.rate = rate
+        self.burst = burst or max(1, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        取一个令牌。
+
+        :return: 需要等待的秒数。
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        """取一个令牌，令牌不足时等待。"""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AlistLimiter(object):
+    """
+    请求的限流器，包括令牌桶限速和自适应的并发数限制（AIMD）。
+
+    并发数在延迟和错误率正常时缓慢增加（每轮增加1），在收到429、5xx、超时或者延迟突增时减半，
+    每轮最多减少一次。延迟按端点分别统计，上传等耗时的请求不会影响列目录等请求的判断。
+
+    超过并发数的请求按优先级类别（见 :func:`priority <alist.schedule.priority>` ）排队，
+    类别之间按权重公平出队，同一类别内先进先出。除了权重最高的类别，其他类别最多占用
+    ``limit - reserve`` 个并发数，后台请求很多时交互请求也不需要等待。
+
+    .. code-block:: python
+
+        client = AlistClient('https://your.alist.domain', limiter=AlistLimiter(rate=10, limit=4))
+        print(client.limiter.limit, client.limiter.queued)
+    """
+    def __init__(self,
+                 rate = None,
+                 burst = None,
+                 limit = 8,
+                 min_limit = 1,
+                 max_limit = 64,
+                 backoff = 0.5,
+                 tolerance = 2.0,
+                 min_latency = 0.1,
+                 smoothing = 0.1,
+                 weights = None,
+                 reserve = 1):
+        """
+        :param rate: 每秒最多的请求数，默认不限速。
+        :param burst: 允许的突发请求数，默认等于rate。
+        :param limit: 初始的并发数。
+        :param min_limit: 最小的并发数。
+        :param max_limit: 最大的并发数。
+        :param backoff: 过载时并发数乘以的系数。
+        :param tolerance: 延迟超过平均延迟的多少倍时认为过载。
+        :param min_latency: 延迟低于这个秒数时不认为过载，避免很快的请求因为抖动而减少并发数。
+        :param smoothing: 平均延迟的平滑系数，越大越快适应新的延迟。
+        :param weights: 优先级类别到权重的字典，默认是
+                        :data:`priority_weights <alist.schedule.priority_weights>` 。
+        :param reserve: 为权重最高的类别保留的并发数。
+        """
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self._limit = float(limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.min_latency = min_latency
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.waiters = FairQueue(weights)
+        self.top = max(self.waiters.weights.values())
+        self.reserve = reserve
+        self.latencies = dict()
+        self.decreased = 0
+        self.lock = threading.Lock()
+
+    @property
+    def limit(self):
+        """当前的并发数。"""
+        return max(1, int(self._limit))
+
+    @property
+    def queued(self):
+        """排队等待的请求数。"""
+        return len(self.waiters)
+
+    def stats(self):
+        """
+        :return: ``{'limit': 并发数, 'in_flight': 正在进行的请求数, 'queued': 排队的请求数,
+                 'queues': 每个类别排队的请求数}``
+        """
+        with self.lock:
+            return {'limit': self.limit, 'in_flight': self.in_flight, 'queued': len(self.waiters),
+                    'queues': self.waiters.lengths()}
+
+    def _allowed(self, name):
+        """类别为name的请求现在能否开始。"""
+        if self.waiters.weights[name] < self.top:
+            return self.in_flight < max(1, self.limit - self.reserve)
+        return self.in_flight < self.limit
+
+    def _enter(self, wake, name):
+        """有空闲的并发数时占用并返回True，否则把wake加入队列。"""
+        with self.lock:
+            if name not in self.waiters.weights:
+                raise KeyError(f'unknown priority {name}')
+            # 排队的请求在并发数空出时就会出队，剩下的都是不能开始的，新请求可以直接比较
+            if self._allowed(name):
+                self.in_flight += 1
+                return True
+            self.waiters.append(wake, name)
+            return False
+
+    def _wake(self):
+        # 把空出的并发数直接交给排队的请求
+        while True:
+            wake = self.waiters.pop(self._allowed)
+            if wake is None:
+                break
+            self.in_flight += 1
+            wake()
+
+    def acquire(self, priority = None):
+        """
+        等待空闲的并发数和令牌。
+
+        :param priority: 优先级类别，默认是 :func:`current_priority <alist.schedule.current_priority>` 。
+        :return: 开始请求的时间，传给 :meth:`release` 。
+        """
+        event = threading.Event()
+        wake = event.set
+        if not self._enter(wake, priority or current_priority()):
+            try:
+                event.wait()
+            except BaseException:
+                # 等待被中断（例如KeyboardInterrupt）：还在排队时出队，已经得到并发数时归还
+                with self.lock:
+                    waiting = self.waiters.remove(wake)
+                if not waiting:
+                    self.cancel()
+                raise
+        try:
+            if self.bucket is not None:
+                self.bucket.acquire()
+        except BaseException:
+            self.cancel()
+            raise
+        return time.monotonic()
+
+    async def acquire_async(self, priority = None):
+        """
+        :meth:`acquire` 的协程版本。
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(_resolve, future)
+
+        if not self._enter(wake, priority or current_priority()):
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self.lock:
+                    waiting = self.waiters.remove(wake)
+                if not waiting:
+                    self.cancel()
+                raise
+        try:
+            if self.bucket is not None:
+                await asyncio.sleep(self.bucket.reserve())
+        except BaseException:
+            self.cancel()
+            raise
+        return time.monotonic()
+
+    def release(self, started, endpoint = None, status = None, timeout = False):
+        """
+        请求结束，根据结果调整并发数。
+
+        :param started: :meth:`acquire` 的返回值。
+        :param endpoint: 请求的端点。
+        :param status: HTTP状态码。
+        :param timeout: 是否超时。
+        """
+        now = time.monotonic()
+        latency = now - started
+        with self.lock:
+            saturated = bool(self.waiters) or self.in_flight >= self.limit
+            self.in_flight -= 1
+            spike = self._spike(endpoint, latency)
+            if timeout or spike or status == 429 or (status or 0) >= 500:
+                # 减少之前发出的请求不再触发减少，每轮最多减少一次
+                if started >= self.decreased:
+                    self._limit = max(self.min_limit, self._limit * self.backoff)
+                    self.decreased = now
+            elif saturated:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._wake()
+
+    def _spike(self, endpoint, latency):
+        average = self.latencies.get(endpoint)
+        if average is None:
+            self.latencies[endpoint] = latency
+            return False
+        self.latencies[endpoint] = average + self.smoothing * (latency - average)
+        return latency > self.min_latency and latency > average * self.tolerance
+
+    def cancel(self):
+        """请求没有完成（例如连接失败），释放并发数，不调整并发数。"""
+        with self.lock:
+            self.in_flight -= 1
+            self._wake()
@@ -4,6 +4,8 @@
 
 from copy import deepcopy
 from alist import utils
+from alist.registry import AlistRegistry
+from alist.record import AlistRecord
 
 empty_meta = {
     "path"              : None, # str
@@ -21,7 +23,7 @@ class AlistMeta(dict):
     """
 
     def __init__(self, **kwargs):
-        super().__init__(deepcopy(empty_meta))
+        super().__init__(empty_meta)
         for key in kwargs:
             try:
                 self[key] = kwargs[key]
@@ -30,7 +32,7 @@ class AlistMeta(dict):
 
     def __setitem__(self, __key, __value):
         if __key in self.keys() or __key == 'id':
-            if __key in ['hide', 'only_shows'] and __value != None:
+            if __key in ['hide', 'only_shows'] and isinstance(__value, (list, tuple)):
                 return super().__setitem__(__key, ','.join(__value))
             else:
                 return super().__setitem__(__key, __value)
@@ -40,6 +42,14 @@ class AlistMeta(dict):
     def __delitem__(self, __key) -> None:
         raise NotImplemented
 
+class MetaRecord(AlistRecord):
+    """
+    meta的紧凑只读记录，字段与 :class:`AlistMeta` 相同。
+    meta快照使用它保存meta。
+    """
+    __slots__ = ()
+    fields = tuple(empty_meta) + ('id',)
+
 class AlistAdminMeta(object):
     """
     ``/api/admin/meta`` 相关API的实现。
@@ -57,7 +67,11 @@ class AlistAdminMeta(object):
         if 'path' not in kwargs:
             raise ValueError(f"meta must set path")
         account = AlistMeta(**kwargs)
-        return self._post_create(account)
+        try:
+            return self._post_create(account)
+        finally:
+            # 新meta的ID由服务器分配，只能重新加载
+            self.alist.admin.metas.store.invalidate()
 
     def create(self,
                path,
@@ -101,8 +115,15 @@ class AlistAdminMeta(object):
         >>> alist.admin.meta.delete('/path')
         True
         """
+        store = self.alist.admin.metas.store
         meta = self.alist.admin.metas.get_meta(path)
-        return self._delete(meta['id'])
+        try:
+            result = self._delete(meta['id'])
+        except Exception:
+            store.invalidate()
+            raise
+        store.remove(meta)
+        return result
 
     def save(self, meta: AlistMeta):
         """
@@ -118,7 +139,14 @@ class AlistAdminMeta(object):
         True
         """
         endpoint = f'{self.endpoint}/save'
-        return self.alist.post(endpoint, json = meta)
+        store = self.alist.admin.metas.store
+        try:
+            result = self.alist.post(endpoint, json = meta)
+        except Exception:
+            store.invalidate()
+            raise
+        store.put(MetaRecord.from_dict(meta))
+        return result
 
 class AlistAdminMetas(object):
     """
@@ -126,10 +154,14 @@ class AlistAdminMetas(object):
     """
     metas = list()
 
+    ttl = 60
+    """meta快照的有效时间，单位秒"""
+
     def __init__(self, alist, endpoint):
         self.alist = alist
         self.endpoint = f'{endpoint}/metas'
         self.metas = deepcopy(self.metas)
+        self.store = AlistRegistry(self._records, ('id', 'path'), self.ttl)
 
     def get(self):
         """
@@ -138,26 +170,31 @@ class AlistAdminMetas(object):
         >>> client.admin.metas.get()
         [{'path': '/path', 'password': '789', 'hide': 'README.md', 'only_shows': '', 'upload': True, 'readme': '', 'id': 1}]
         """
-        self.metas.clear()
         results = self.alist.get(self.endpoint)
-        for r in results:
-            self.metas.append(AlistMeta(**r))
+        self.metas = [AlistMeta(**r) for r in results]
         return self.metas
 
     def get_meta(self, id_or_path) -> AlistMeta:
         """
-        获取指定meta
+        获取指定meta。从本地的meta快照中查找，快照过期时才从服务器重新加载。
 
         :param id_or_path: meta id 或者是 meta path
 
         >>> client.admin.metas.get_meta('/path')
         {'path': '/path', 'password': '789', 'hide': 'README.md', 'only_shows': '', 'upload': True, 'readme': '', 'id': 1}
         """
-        metas = self.get()
-        for meta in metas:
-            if meta['id'] == id_or_path or meta['path'] == id_or_path:
-                return meta
-        raise KeyError(f'{id_or_path} not found')
+        return AlistMeta(**self.store.get(id_or_path))
+
+    def reload(self):
+        """
+        从服务器重新加载meta快照。
+
+        :return: meta列表
+        """
+        return [AlistMeta(**r) for r in self.store.reload()]
+
+    def _records(self):
+        return [MetaRecord.from_dict(m) for m in self.get()]
 
     def __getitem__(self, index):
         return self.get()[index]
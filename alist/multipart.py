@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import mimetypes
+import mmap
+import os
+import uuid
+
+
+class MultipartEncoder(object):
+    """
+    流式的 ``multipart/form-data`` 编码器。文件在发送到它时才打开，按 ``chunk_size`` 分块读取，
+    发送完立即关闭，所以内存占用与文件大小和文件数量无关。
+
+    对象可以直接作为requests的 ``data`` 参数，长度预先计算，不需要分块传输编码。
+
+    .. code-block:: python
+
+        encoder = MultipartEncoder({'path': '/upload'}, [('files', 'big.iso')])
+        session.post(url, data=encoder, headers={'Content-Type': encoder.content_type})
+    """
+    def __init__(self, fields, files, chunk_size = 1024 * 1024, use_mmap = False, callback = None):
+        """
+        :param fields: 普通字段的字典，值为None的字段被忽略。
+        :param files: ``(字段名, 本地文件路径)`` 的列表。
+        :param chunk_size: 每次从文件读取的字节数。
+        :param use_mmap: 使用mmap读取文件。
+        :param callback: 进度回调函数，参数是
+                         ``(filename, file_sent, file_size, total_sent, total_size)`` ，
+                         total表示所有文件的字节数。
+        """
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.callback = callback
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+
+        self.parts = list()
+        for name, value in fields.items():
+            if value is None:
+                continue
+            self.parts.append((self._header(name) + f'{value}\r\n'.encode('utf-8'), None, 0))
+        for name, filename in files:
+            size = os.path.getsize(filename)
+            self.parts.append((self._header(name, filename), filename, size))
+        self.trailer = f'--{self.boundary}--\r\n'.encode('utf-8')
+
+        self.total = len(self.trailer)
+        for header, filename, size in self.parts:
+            self.total += len(header) + size + (2 if filename else 0)
+        self.files_total = sum(size for _, _, size in self.parts)
+        self.files_sent = 0
+        self._chunks = self._iter_chunks()
+        self._buf = memoryview(b'')
+        self._pos = 0
+
+    def _header(self, name, filename = None):
+        header = f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"'
+        if filename is None:
+            return (header + '\r\n\r\n').encode('utf-8')
+        basename = os.path.basename(filename).replace('"', '%22')
+        content_type = mimetypes.guess_type(basename)[0] or 'application/octet-stream'
+        header += f'; filename="{basename}"\r\nContent-Type: {content_type}\r\n\r\n'
+        return header.encode('utf-8')
+
+    def _iter_file(self, filename, size):
+        with open(filename, 'rb') as f:
+            if self.use_mmap and size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    for offset in range(0, size, self.chunk_size):
+                        yield m[offset:offset + self.chunk_size]
+            else:
+                while True:
+                    chunk = f.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def _iter_chunks(self):
+        for header, filename, size in self.parts:
+            yield header
+            if filename is None:
+                continue
+            file_sent = 0
+            if size == 0 and self.callback is not None:
+                self.callback(filename, 0, 0, self.files_sent, self.files_total)
+            for chunk in self._iter_file(filename, size):
+                file_sent += len(chunk)
+                self.files_sent += len(chunk)
+                yield chunk
+                if self.callback is not None:
+                    self.callback(filename, file_sent, size, self.files_sent, self.files_total)
+            yield b'\r\n'
+        yield self.trailer
+
+    def read(self, size = -1):
+        """
+        读取编码后的数据。
+
+        :param size: 最多读取的字节数，-1表示读取全部。
+        :return: 数据，读取完毕时返回空bytes。
+        """
+        if size is None or size < 0:
+            size = self.total
+        out = list()
+        n = 0
+        while n < size:
+            if self._pos >= len(self._buf):
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._buf = memoryview(chunk)
+                self._pos = 0
+            take = min(size - n, len(self._buf) - self._pos)
+            out.append(self._buf[self._pos:self._pos + take])
+            self._pos += take
+            n += take
+        return b''.join(out)
+
+    def __iter__(self):
+        while True:
+            data = self.read(self.chunk_size)
+            if not data:
+                return
+            yield data
+
+    def __len__(self):
+        return self.total
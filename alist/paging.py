@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import json
+
+
+class PageSizeTuner(object):
+    """
+    根据每页的耗时和数据量调整分页大小。耗时低于目标的一半时页面加倍，
+    超过目标时页面减半，估算的响应大小不会超过 ``max_page_bytes``。
+
+    Alist按 ``page_num`` 和 ``page_size`` 分页，新的页面大小必须能整除已经读取的文件数，
+    否则无法换算出下一页的 ``page_num``。
+    """
+    def __init__(self,
+                 page_size = 100,
+                 min_page_size = 10,
+                 max_page_size = 5000,
+                 target_latency = 1.0,
+                 max_page_bytes = 8 * 1024 * 1024):
+        """
+        :param page_size: 初始的页面大小。
+        :param min_page_size: 最小的页面大小。
+        :param max_page_size: 最大的页面大小。
+        :param target_latency: 每页的目标耗时，单位秒。
+        :param max_page_bytes: 每页响应的最大字节数。
+        """
+        self.page_size = page_size
+        self.min_page_size = min_page_size
+        self.max_page_size = max_page_size
+        self.target_latency = target_latency
+        self.max_page_bytes = max_page_bytes
+        self.latency = None
+        self.entry_bytes = None
+
+    def update(self, latency, files):
+        """
+        记录一页的耗时和内容。
+
+        :param latency: 请求这一页的耗时，单位秒。
+        :param files: 这一页的文件列表。
+        """
+        self.latency = latency
+        if self.entry_bytes is None and len(files) > 0:
+            sample = files[:16]
+            self.entry_bytes = len(json.dumps(sample)) / len(sample)
+
+    def next_page_size(self, offset):
+        """
+        计算下一页的大小。
+
+        :param offset: 已经读取的文件数。
+        :return: 页面大小，能整除offset。
+        """
+        size = self.page_size
+        if self.latency is None:
+            return size
+
+        larger = size * 2
+        entry_bytes = self.entry_bytes or 0
+        if (self.latency < self.target_latency / 2
+                and larger <= self.max_page_size
+                and entry_bytes * larger <= self.max_page_bytes
+                and offset % larger == 0):
+            size = larger
+        elif ((self.latency > self.target_latency or entry_bytes * size > self.max_page_bytes)
+                and size % 2 == 0
+                and size // 2 >= self.min_page_size):
+            size = size // 2
+
+        self.page_size = size
+        return size
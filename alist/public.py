@@ -4,7 +4,20 @@
 
 # doc: https://alist-doc.nn.ci/docs/api
 
+import time
+from concurrent.futures import ThreadPoolExecutor
 from alist.setting import AlistPublicSettings
+from alist.paging import PageSizeTuner
+from alist.schedule import inherit
+from alist.walk import AlistWalker
+from alist.cache import normpath
+from alist.multipart import MultipartEncoder
+from alist.upload import AlistBulkUploader
+from alist.download import AlistDownloader
+from alist.columnar import AlistColumns
+from alist.index import AlistSearchIndex
+from alist.snapshot import AlistSnapshot
+from alist import stream
 
 class AlistPublic(object):
     def __init__(self, alist):
@@ -14,7 +27,7 @@ class AlistPublic(object):
 
     def path(self, path, page_num=1, page_size=30, password=None):
         """
-        获取指定路径 path 下的文件和文件夹列表。
+        获取指定路径 path 下的文件和文件夹列表。客户端开启缓存时，优先返回缓存的结果。
 
         :param path: 路径
         :param page_num: 默认为1
@@ -35,7 +48,196 @@ class AlistPublic(object):
             'page_size': page_size
 
         }
-        return self.alist.post(endpoint, json=data)
+        key = ('path', normpath(path), page_num, page_size, password)
+        return self.alist.cached(key, self.alist.post, endpoint, json=data)
+
+    def iter_path(self, path, page_num=1, page_size=30, password=None, chunk_size=64 * 1024):
+        """
+        与 :meth:`path` 相同，但是边接收边解析响应，逐个生成文件。
+        无论目录有多大，内存占用都只与单个文件的信息有关。
+
+        :param path: 路径
+        :param page_num: 默认为1
+        :param page_size: 默认为30。一次列出超大目录时可以设置为目录中的文件数。
+        :param password: 路径的访问密码。
+        :param chunk_size: 每次从网络读取的字节数。
+        :return: 文件的迭代器。
+
+        .. code-block:: python
+
+            for f in client.public.iter_path('/path', page_size=200000):
+                print(f['name'])
+        """
+        endpoint = f'{self.endpoint}/path'
+        data = {
+            'path': path,
+            'password': password,
+            'page_num': page_num,
+            'page_size': page_size
+        }
+        with self.alist.stream('POST', endpoint, json=data) as response:
+            content_type = response.headers.get("content-type", "")
+            if content_type.split(";")[0] != "application/json":
+                raise ValueError(f"Invalid json content: {self.alist.decode_response(response)}")
+            chunks = response.iter_content(chunk_size)
+            yield from stream.iter_response_items(chunks, 'files', response.encoding)
+
+    def iter_files(self, path, password=None, page_size=100, prefetch=True, tuner=None):
+        """
+        遍历指定路径下的所有文件，自动翻页。处理当前页时，后台线程已经开始请求下一页。
+        页面大小会根据每页的耗时和数据量自动调整。
+
+        :param path: 路径
+        :param password: 路径的访问密码。
+        :param page_size: 初始的页面大小。
+        :param prefetch: 是否在后台预取下一页。
+        :param tuner: 自定义的 :class:`PageSizeTuner <alist.paging.PageSizeTuner>`。
+        :return: 文件的迭代器。
+
+        .. code-block:: python
+
+            for f in client.public.iter_files('/path'):
+                print(f['name'])
+        """
+        if tuner is None:
+            tuner = PageSizeTuner(page_size)
+
+        def fetch(page_num, size):
+            start = time.monotonic()
+            result = self.path(path, page_num, size, password)
+            return result, size, time.monotonic() - start
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        def submit(page_num, size):
+            if executor is None:
+                return lambda: fetch(page_num, size)
+            return executor.submit(inherit(fetch, None), page_num, size).result
+
+        offset = 0
+        pending = submit(1, tuner.page_size)
+        try:
+            while pending is not None:
+                result, size, latency = pending()
+                files = result['files']
+                offset += len(files)
+                tuner.update(latency, files)
+
+                total = (result.get('meta') or {}).get('total')
+                if total is None:
+                    done = len(files) < size
+                else:
+                    done = len(files) == 0 or offset >= total
+                if done:
+                    pending = None
+                else:
+                    size = tuner.next_page_size(offset)
+                    pending = submit(offset // size + 1, size)
+
+                yield from files
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def scandir(self, path, password=None, page_size=100):
+        """
+        列出目录中的所有文件，自动翻页。
+
+        :param path: 路径
+        :param password: 路径的访问密码。
+        :param page_size: 初始的页面大小。
+        :return: 文件信息列表。
+        """
+        return list(self.iter_files(path, password, page_size, prefetch=False))
+
+    def columns(self, path, password=None, page_size=100):
+        """
+        列出目录中的所有文件，返回按列保存的 :class:`AlistColumns <alist.columnar.AlistColumns>` ，
+        可以向量化地过滤、排序和统计。依赖 ``numpy`` 。
+
+        .. code-block:: python
+
+            cols = client.public.columns('/movies')
+            print(cols.sum('size'), cols.group_by_type())
+
+        :param path: 路径
+        :param password: 路径的访问密码。
+        :param page_size: 初始的页面大小。
+        :return: :class:`AlistColumns <alist.columnar.AlistColumns>`
+        """
+        return AlistColumns.from_files(self.iter_files(path, password, page_size))
+
+    def walk(self, top, max_depth=None, include=None, exclude=None,
+             password=None, passwords=None, workers=8, onerror=None):
+        """
+        类似 ``os.walk`` ，遍历目录树，生成 ``(dirpath, dirnames, filenames)`` 。
+        多个目录在线程池中并发列出，哪个先完成就先返回哪个。
+        建议使用 ``thread_safe=True`` 的客户端，并且 ``pool_maxsize`` 不小于 ``workers`` 。
+
+        :param top: 开始遍历的路径。
+        :param max_depth: 最大深度。0表示只列出top，None表示不限制。
+        :param include: 文件的glob模式列表，只返回匹配的文件。包含 ``/`` 的模式匹配完整路径。
+        :param exclude: glob模式列表，匹配的文件和目录都会被跳过。
+        :param password: 默认的访问密码。
+        :param passwords: 路径到访问密码的字典，使用最长匹配的路径的密码。
+        :param workers: 同时请求的目录数。
+        :param onerror: 列目录失败时的回调函数，参数是路径和异常。为None时触发异常。
+        :return: ``(dirpath, dirnames, filenames)`` 的迭代器。
+
+        .. code-block:: python
+
+            for dirpath, dirnames, filenames in client.public.walk('/', exclude=['.git']):
+                print(dirpath, filenames)
+        """
+        walker = AlistWalker(self, top,
+                             max_depth=max_depth,
+                             include=include,
+                             exclude=exclude,
+                             password=password,
+                             passwords=passwords,
+                             workers=workers,
+                             onerror=onerror)
+        for dirpath, dirs, files in walker:
+            yield dirpath, [d['name'] for d in dirs], [f['name'] for f in files]
+
+    def build_index(self, top='/', password=None, passwords=None, workers=8):
+        """
+        遍历目录树，建立本地的文件名搜索索引。查询不需要请求服务器，也不需要开启 ``enable search`` 。
+
+        .. code-block:: python
+
+            index = client.public.build_index('/movies')
+            for path, entry in index.glob('*.mkv'):
+                print(path, entry['size'])
+
+        :param top: 建立索引的目录。
+        :param password: 默认的访问密码。
+        :param passwords: 路径到访问密码的字典，使用最长匹配的路径的密码。
+        :param workers: 同时请求的目录数。
+        :return: :class:`AlistSearchIndex <alist.index.AlistSearchIndex>`
+        """
+        index = AlistSearchIndex(self, top, password, passwords, workers)
+        index.build()
+        return index
+
+    def snapshot(self, database, top='/', password=None, passwords=None, workers=8):
+        """
+        打开保存在SQLite数据库中的目录树快照。
+
+        .. code-block:: python
+
+            with client.public.snapshot('inventory.db', '/movies') as snapshot:
+                old = snapshot.latest()
+                new = snapshot.scan()
+                print(snapshot.diff(old, new)['added'])
+
+        :param database: SQLite数据库的文件名。
+        :param top: 扫描的目录。
+        :param password: 默认的访问密码。
+        :param passwords: 路径到访问密码的字典，使用最长匹配的路径的密码。
+        :param workers: 同时请求的目录数。
+        :return: :class:`AlistSnapshot <alist.snapshot.AlistSnapshot>`
+        """
+        return AlistSnapshot(self, database, top, password, passwords, workers)
 
     def preview(self, path):
         """
@@ -50,6 +252,31 @@ class AlistPublic(object):
         }
         return self.alist.post(endpoint, json=data)
 
+    def download(self, path, local, segments=4, chunk_size=1024 * 1024, retries=3, callback=None):
+        """
+        下载文件到本地。大文件使用HTTP Range请求分段并发下载，中断后再次调用可以继续下载。
+        登录后通过 :meth:`AlistAdmin.link <alist.admin.AlistAdmin.link>` 获取真实链接，
+        否则使用 ``/d`` 下载地址。
+
+        :param path: 文件路径
+        :param local: 本地文件路径
+        :param segments: 最多同时下载的分段数。
+        :param chunk_size: 每次写入文件的字节数。
+        :param retries: 每个分段失败后的重试次数。
+        :param callback: 进度回调函数，参数是 ``(downloaded, size)`` 。
+        :return: 本地文件路径。
+
+        .. code-block:: python
+
+            client.public.download('/path/to/movie.mkv', 'movie.mkv', segments=8)
+        """
+        downloader = AlistDownloader(self.alist,
+                                     segments=segments,
+                                     chunk_size=chunk_size,
+                                     retries=retries,
+                                     callback=callback)
+        return downloader.download(path, local)
+
     def search(self, path, keyword):
         """
         搜索文件。需要开启设置 enable search。默认是关闭的。
@@ -65,13 +292,18 @@ class AlistPublic(object):
         }
         return self.alist.post(endpoint, json=data)
 
-    def upload(self, files, path, password=None):
+    def upload(self, files, path, password=None, callback=None, chunk_size=1024 * 1024, use_mmap=False, retry=True):
         """
         上传文件到指定路径。如果没有登录，则需要开启允许游客上传。参考meta。
+        文件在发送时才逐个打开并分块读取，发送完立即关闭，内存占用与文件大小无关。
 
         :param files: 文件列表
         :param path: 上传的路径
         :param password: 访问密码
+        :param callback: 进度回调函数，参数是 ``(filename, file_sent, file_size, total_sent, total_size)`` 。
+        :param chunk_size: 每次从文件读取的字节数。
+        :param use_mmap: 使用mmap读取文件。
+        :param retry: 为False时不使用客户端的重试策略，由调用者自己重试。
         :type files: list
         :return: 上传结果。True表示成功，False表示失败。
 
@@ -86,9 +318,49 @@ class AlistPublic(object):
             'path': path,
             'password': password,
         }
-        # https://docs.python-requests.org/en/latest/user/advanced/#post-multiple-multipart-encoded-files
-        fs = [
-            ('files', (filename, open(filename, 'rb'))) for filename in files
-        ]
-        return self.alist.post(endpoint, files=fs, data=data)
+        encoder = MultipartEncoder(data,
+                                   [('files', filename) for filename in files],
+                                   chunk_size=chunk_size,
+                                   use_mmap=use_mmap,
+                                   callback=callback)
+        headers = {'Content-Type': encoder.content_type}
+        try:
+            return self.alist.post(endpoint, data=encoder, headers=headers, retry=retry)
+        finally:
+            self.alist.invalidate_cache(path)
+
+    def upload_many(self, src, path, password=None, workers=4,
+                    max_batch_bytes=64 * 1024 * 1024, max_batch_files=100,
+                    retries=2, make_dirs=False, callback=None, replay=False):
+        """
+        批量上传文件。文件按目标目录分组，再按字节数和文件数打包成若干个multipart请求，
+        这些请求并发上传。没有发送到服务器的请求单独重试，无法读取的文件记为失败，不影响其他文件。
+
+        :param src: 本地目录，或者由本地文件路径、``(本地文件路径, 目标目录)`` 组成的可迭代对象。
+                    上传本地目录时保持目录结构。
+        :param path: 上传的路径
+        :param password: 访问密码
+        :param workers: 同时上传的请求数。
+        :param max_batch_bytes: 每个请求的最大字节数。
+        :param max_batch_files: 每个请求的最大文件数。
+        :param retries: 批次失败后的重试次数。批次不使用客户端的重试策略，只在这里重试。
+        :param make_dirs: 上传前创建目标目录，需要登录。
+        :param callback: 每个请求结束时调用，参数是该请求中文件的结果列表。
+        :param replay: 请求已经发送之后失败时也重试。上传不是幂等的，可能重复上传。
+        :return: 每个文件的结果，包含 ``file``、``path``、``success``、``error``、``attempts`` 。
 
+        .. code-block:: python
+
+            results = client.public.upload_many('/local/dir', '/target/path', make_dirs=True)
+            failed = [r for r in results if not r['success']]
+        """
+        uploader = AlistBulkUploader(self,
+                                     password=password,
+                                     workers=workers,
+                                     max_batch_bytes=max_batch_bytes,
+                                     max_batch_files=max_batch_files,
+                                     retries=retries,
+                                     make_dirs=make_dirs,
+                                     callback=callback,
+                                     replay=replay)
+        return uploader.upload(src, path)
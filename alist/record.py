@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+from collections.abc import Mapping
+
+
+class AlistRecord(Mapping):
+    """
+    紧凑的只读记录。字段名保存在类中，每个对象只保存一个值的元组，
+    比同样内容的dict占用的内存少得多，适合在内存中保存大量的账号、设置或文件信息。
+
+    支持dict的读取接口：``record['name']``、``get``、``keys``、``items``、``in`` 、``len`` 等，
+    也可以用 ``dict(record)`` 或 ``AlistAccount(**record)`` 转换。
+
+    子类只需要定义 ``fields`` 。
+
+    .. code-block:: python
+
+        class FileRecord(AlistRecord):
+            __slots__ = ()
+            fields = ('name', 'size', 'type')
+    """
+    __slots__ = ('_values',)
+    fields = ()
+    """字段名"""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fields = tuple(cls.fields)
+        cls._index = {key: i for i, key in enumerate(cls.fields)}
+
+    def __init__(self, **kwargs):
+        """
+        :param kwargs: 字段的值。没有提供的字段为None，未知的字段被忽略。
+        """
+        self._values = tuple(map(kwargs.get, self.fields))
+
+    @classmethod
+    def from_dict(cls, d):
+        """
+        从dict创建记录，比 ``cls(**d)`` 更快。
+
+        :param d: 包含字段的dict。
+        """
+        record = cls.__new__(cls)
+        record._values = tuple(map(d.get, cls.fields))
+        return record
+
+    def __getitem__(self, key):
+        return self._values[self._index[key]]
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, key, default = None):
+        i = self._index.get(key)
+        return default if i is None else self._values[i]
+
+    def to_dict(self):
+        """转换为dict"""
+        return dict(zip(self.fields, self._values))
+
+    def replace(self, **kwargs):
+        """
+        返回修改了部分字段的新记录。
+
+        :param kwargs: 新的字段值。
+        """
+        d = self.to_dict()
+        for key in kwargs:
+            if key not in self._index:
+                raise KeyError(key)
+        d.update(kwargs)
+        return self.from_dict(d)
+
+    def __getstate__(self):
+        return self._values
+
+    def __setstate__(self, state):
+        self._values = state
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+
+class FileRecord(AlistRecord):
+    """
+    文件列表中的一个文件，字段与 :meth:`AlistPublic.path <alist.public.AlistPublic.path>`
+    返回的 ``files`` 相同。
+
+    .. code-block:: python
+
+        files = [FileRecord.from_dict(f) for f in client.public.iter_files('/movies')]
+    """
+    __slots__ = ()
+    fields = ('name', 'size', 'type', 'driver', 'updated_at',
+              'thumbnail', 'url', 'size_str', 'time_str')
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import threading
+import time
+
+
+class AlistRegistry(object):
+    """
+    服务器列表数据的本地快照，按若干个字段建立索引，查找的复杂度是O(1)。
+    快照在 ``ttl`` 秒后过期，下次访问时重新加载。写操作成功后可以直接更新快照，不需要重新加载。
+
+    .. code-block:: python
+
+        registry = AlistRegistry(client.admin.accounts.get, ('id', 'name'))
+        account = registry.get('/native')
+    """
+    def __init__(self, loader, keys, ttl = 60):
+        """
+        :param loader: 加载完整列表的函数。
+        :param keys: 建立索引的字段，查找时按顺序匹配。
+        :param ttl: 快照的有效时间，单位秒。None表示永不过期，0表示每次都重新加载。
+        """
+        self.loader = loader
+        self.keys = tuple(keys)
+        self.ttl = ttl
+        self.items = dict()
+        self.indexes = {key: dict() for key in self.keys}
+        self.expires = None
+        self.lock = threading.RLock()
+
+    def is_expired(self):
+        """快照是否需要重新加载。"""
+        if self.expires is None:
+            return True
+        return self.ttl is not None and time.monotonic() >= self.expires
+
+    def set_items(self, items):
+        """
+        使用items替换快照。
+
+        :param items: 完整的列表。
+        """
+        with self.lock:
+            self.items = dict()
+            self.indexes = {key: dict() for key in self.keys}
+            for item in items:
+                self.items[item.get(self.keys[0])] = item
+                self._index(item)
+            self.expires = float('inf') if self.ttl is None else time.monotonic() + self.ttl
+
+    def reload(self):
+        """
+        立即从服务器重新加载快照。
+
+        :return: 完整的列表。
+        """
+        items = self.loader()
+        self.set_items(items)
+        return list(items)
+
+    def invalidate(self):
+        """使快照失效，下次访问时重新加载。"""
+        with self.lock:
+            self.expires = None
+
+    def _fresh(self):
+        if self.is_expired():
+            self.reload()
+
+    def _index(self, item):
+        for key in self.keys:
+            value = item.get(key)
+            if value is not None:
+                self.indexes[key][value] = item
+
+    def _unindex(self, item):
+        for key in self.keys:
+            value = item.get(key)
+            if self.indexes[key].get(value) is item:
+                del self.indexes[key][value]
+
+    def all(self):
+        """
+        :return: 完整的列表。
+        """
+        self._fresh()
+        with self.lock:
+            return list(self.items.values())
+
+    def find(self, value):
+        """
+        查找快照中的元素，不检查是否过期。
+
+        :param value: 任意索引字段的值。
+        :return: 找到的元素，没有找到返回None。
+        """
+        with self.lock:
+            for key in self.keys:
+                item = self.indexes[key].get(value)
+                if item is not None:
+                    return item
+        return None
+
+    def get(self, value):
+        """
+        查找元素，快照过期时先重新加载。
+
+        :param value: 任意索引字段的值。
+        :return: 找到的元素。
+        :raises: 没有找到时触发KeyError。
+        """
+        self._fresh()
+        item = self.find(value)
+        if item is None:
+            raise KeyError(f'{value} not found')
+        return item
+
+    def put(self, item):
+        """
+        添加或替换快照中的元素。按第一个索引字段判断是否是同一个元素。
+
+        :param item: 新的元素。
+        """
+        with self.lock:
+            old = self.items.get(item.get(self.keys[0]))
+            if old is not None:
+                self._unindex(old)
+            self.items[item.get(self.keys[0])] = item
+            self._index(item)
+
+    def remove(self, item):
+        """
+        从快照中删除元素。
+
+        :param item: 要删除的元素，按第一个索引字段匹配。
+        """
+        with self.lock:
+            old = self.items.pop(item.get(self.keys[0]), None)
+            if old is not None:
+                self._unindex(old)
+
+    def __len__(self):
+        return len(self.items)
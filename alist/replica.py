@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import threading
+import time
+from alist import utils
+from alist.retry import idempotent_endpoints
+
+
+class AlistReplica(object):
+    """
+    一个Alist副本的状态。
+    """
+    def __init__(self, url):
+        """
+        :param url: 副本的地址。
+        """
+        self.url = url.rstrip('/')
+        self.healthy = True
+        self.in_flight = 0
+        self.latency = None
+        self.failures = 0
+        self.version = None
+        self.checked_at = None
+
+    def score(self):
+        """
+        路由的代价，越小越优先：平均延迟乘以正在进行的请求数加一。
+        还没有延迟数据的副本优先，以便尽快测量。
+        """
+        return (self.in_flight + 1) * (self.latency or 0)
+
+    def __repr__(self) -> str:
+        state = 'healthy' if self.healthy else 'ejected'
+        return f'AlistReplica({self.url}, {state}, in_flight={self.in_flight}, latency={self.latency})'
+
+
+class AlistReplicaSet(object):
+    """
+    多个Alist副本。读请求发送到负载最低、延迟最小的健康副本，修改操作总是发送到主副本，
+    避免写入不同的副本。
+
+    请求出现连接错误时立即摘除副本，连续 ``max_failures`` 次超时或5xx时也摘除副本。
+    后台线程每隔 ``interval`` 秒通过公开设置的 ``version`` 检查所有副本，
+    检查失败的副本被摘除，恢复的副本重新加入。所有副本都被摘除时，仍然尝试主副本。
+
+    .. code-block:: python
+
+        client = AlistClient(['https://a.alist.domain', 'https://b.alist.domain'], password='xxxxx')
+        print(client.replicas.replicas)
+    """
+    def __init__(self,
+                 alist,
+                 urls,
+                 primary = 0,
+                 interval = 10,
+                 timeout = 5,
+                 max_failures = 3,
+                 smoothing = 0.2,
+                 endpoints = idempotent_endpoints):
+        """
+        :param alist: :class:`AlistClient <alist.AlistClient>`
+        :param urls: 副本地址的列表。
+        :param primary: 主副本在urls中的下标。
+        :param interval: 健康检查的间隔秒数，0表示不在后台检查。
+        :param timeout: 健康检查的超时秒数。
+        :param max_failures: 连续失败多少次后摘除副本。
+        :param smoothing: 平均延迟的平滑系数。
+        :param endpoints: 作为读请求的POST端点，GET请求总是读请求。
+        """
+        if not urls:
+            raise ValueError('at least one replica is required')
+        self.alist = alist
+        self.replicas = [AlistReplica(url) for url in urls]
+        self.primary = self.replicas[primary]
+        self.interval = interval
+        self.timeout = timeout
+        self.max_failures = max_failures
+        self.smoothing = smoothing
+        self.endpoints = frozenset(endpoints)
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.closed = False
+
+    def healthy(self):
+        """
+        :return: 健康的副本。
+        """
+        return [r for r in self.replicas if r.healthy]
+
+    def is_read(self, method, endpoint):
+        """
+        请求是否是读请求。
+
+        :param method: 请求方法。
+        :param endpoint: 端点。
+        """
+        return method == 'GET' or endpoint in self.endpoints
+
+    def choose(self, method, endpoint):
+        """
+        选择副本并增加它正在进行的请求数，请求结束后调用 :meth:`release` 。
+        修改操作总是选择主副本。
+
+        :param method: 请求方法。
+        :param endpoint: 端点。
+        :return: :class:`AlistReplica`
+        """
+        self.start()
+        with self.lock:
+            replica = self.primary
+            if self.is_read(method, endpoint):
+                candidates = self.healthy()
+                if candidates:
+                    replica = min(candidates, key=AlistReplica.score)
+            replica.in_flight += 1
+            return replica
+
+    def release(self, replica, latency = None, ok = None, connected = True):
+        """
+        请求结束，更新副本的状态。
+
+        :param replica: :meth:`choose` 返回的副本。
+        :param latency: 请求的耗时，没有完成时为None。
+        :param ok: 请求是否成功。超时和5xx是失败，4xx是成功。None表示结果与副本无关，不更新状态。
+        :param connected: 是否建立了连接。连接失败时立即摘除副本。
+        """
+        with self.lock:
+            replica.in_flight -= 1
+            if ok is not None:
+                self._update(replica, latency, ok, connected)
+
+    def _update(self, replica, latency, ok, connected = True):
+        if latency is not None:
+            if replica.latency is None:
+                replica.latency = latency
+            else:
+                replica.latency += self.smoothing * (latency - replica.latency)
+        if ok:
+            replica.failures = 0
+            replica.healthy = True
+            return
+        replica.failures += 1
+        if not connected or replica.failures >= self.max_failures:
+            replica.healthy = False
+
+    def check(self, replica):
+        """
+        检查副本是否正常：能否获取公开设置中的 ``version`` 。
+
+        :return: 是否正常。
+        """
+        session = self.session()
+        start = time.monotonic()
+        try:
+            response = session.get(f'{replica.url}{self.alist.get_api_url("/public/settings")}',
+                                   timeout=self.timeout,
+                                   verify=self.alist.ssl_verify,
+                                   cert=self.alist.cert)
+            content = utils.json_loads(response.content)
+            version = [s['value'] for s in content['data'] if s['key'] == 'version'][0]
+        except Exception:
+            with self.lock:
+                replica.checked_at = time.time()
+                self._update(replica, None, ok=False, connected=False)
+            return False
+        with self.lock:
+            replica.checked_at = time.time()
+            replica.version = version
+            self._update(replica, time.monotonic() - start, ok=True)
+        return True
+
+    def check_all(self):
+        """检查所有副本。"""
+        for replica in self.replicas:
+            self.check(replica)
+
+    def session(self):
+        # 健康检查在后台线程中进行，使用独立的会话
+        local = self.alist._local
+        if getattr(local, 'replica_session', None) is None:
+            local.replica_session = self.alist.new_session()
+        return local.replica_session
+
+    def start(self):
+        """启动后台的健康检查线程，已经启动或者已经关闭时不做任何事。"""
+        if self.interval <= 0 or self._thread is not None or self.closed:
+            return
+        with self.lock:
+            if self._thread is not None or self.closed:
+                return
+            self._thread = threading.Thread(target=self._run, name='alist-replica-check', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """停止后台的健康检查线程。"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stop.clear()
+
+    def close(self):
+        """停止后台的健康检查线程，之后的请求不再启动它。"""
+        self.closed = True
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check_all()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+idempotent_endpoints = frozenset([
+    '/public/path',
+    '/public/preview',
+    '/public/search',
+    '/admin/link',
+    '/admin/folder',
+])
+"""可以重复发送的端点。GET请求总是可以重复发送，这里主要列出只读的POST请求。"""
+
+retry_statuses = frozenset([408, 429, 500, 502, 503, 504])
+"""需要重试的HTTP状态码"""
+
+
+class RetryPolicy(object):
+    """
+    请求的重试策略。只有可以重复发送的请求才会在连接错误、超时和 ``retry_statuses`` 中的状态码时重试，
+    上传、复制、移动等修改操作只在连接没有建立（连接超时）时重试，不会被重复执行。
+
+    第n次重试前等待 ``backoff * 2 ** (n - 1)`` 秒，不超过 ``max_backoff`` ，并加上随机抖动。
+    响应包含 ``Retry-After`` 时，按照服务器的要求等待。
+
+    .. code-block:: python
+
+        client = AlistClient('https://your.alist.domain', retry=RetryPolicy(retries=5), timeout=(5, 60))
+    """
+    def __init__(self,
+                 retries = 3,
+                 backoff = 0.5,
+                 max_backoff = 30,
+                 jitter = True,
+                 statuses = retry_statuses,
+                 endpoints = idempotent_endpoints):
+        """
+        :param retries: 最多重试的次数。
+        :param backoff: 第一次重试前等待的秒数。
+        :param max_backoff: 最长的等待秒数，包括 ``Retry-After`` 。
+        :param jitter: 是否加入随机抖动，避免多个客户端同时重试。
+        :param statuses: 需要重试的HTTP状态码。
+        :param endpoints: 可以重复发送的端点，GET请求总是可以重复发送。
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.endpoints = frozenset(endpoints)
+
+    def is_idempotent(self, method, endpoint):
+        """
+        请求是否可以重复发送。
+
+        :param method: 请求方法。
+        :param endpoint: 端点。
+        """
+        return method == 'GET' or endpoint in self.endpoints
+
+    def retry_status(self, method, endpoint, status_code, attempt):
+        """
+        收到status_code后是否重试。
+
+        :param attempt: 已经重试的次数。
+        """
+        return (attempt < self.retries and
+                status_code in self.statuses and
+                self.is_idempotent(method, endpoint))
+
+    def retry_error(self, method, endpoint, connected, attempt):
+        """
+        发生连接错误或超时后是否重试。
+
+        :param connected: 是否已经建立了连接。没有建立连接时请求一定没有发送，修改操作也可以重试。
+        :param attempt: 已经重试的次数。
+        """
+        return attempt < self.retries and (not connected or self.is_idempotent(method, endpoint))
+
+    def delay(self, attempt, retry_after = None):
+        """
+        下一次重试前等待的秒数。
+
+        :param attempt: 已经重试的次数。
+        :param retry_after: 响应头中的 ``Retry-After`` 。
+        """
+        after = parse_retry_after(retry_after)
+        if after is not None:
+            return min(after, self.max_backoff)
+        delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+        if self.jitter:
+            # full jitter：在0到delay之间均匀分布
+            delay = random.uniform(0, delay)
+        return delay
+
+
+def parse_retry_after(value):
+    """
+    解析 ``Retry-After`` ，可以是秒数或者HTTP日期。
+
+    :return: 等待的秒数，无法解析时返回None。
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+priority_weights = {
+    'interactive': 8,
+    'background': 1,
+}
+"""默认的优先级类别和权重。排队时交互请求获得的并发数是后台请求的8倍。"""
+
+default_priority = 'interactive'
+"""没有设置优先级时使用的类别"""
+
+_priority = contextvars.ContextVar('alist_priority', default=None)
+
+
+@contextmanager
+def priority(name):
+    """
+    在with语句中发送的请求使用指定的优先级，对当前线程或者协程有效。
+    优先级决定请求在限流器中排队的顺序，客户端没有设置 ``limiter`` 时请求不排队，优先级不起作用。
+
+    .. code-block:: python
+
+        client = AlistClient('https://your.alist.domain', limiter=True)
+        with priority('background'):
+            client.public.upload(files, '/backup')
+
+    :param name: 优先级类别，例如 ``interactive`` 、 ``background`` 。
+    """
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(default = default_priority):
+    """
+    当前的优先级类别。
+
+    :param default: 没有设置优先级时返回的类别。
+    """
+    return _priority.get() or default
+
+
+def inherit(func, default = 'background'):
+    """
+    包装提交到线程池的函数，使它在调用者的优先级下执行。线程池中的线程不会继承调用者的上下文。
+    遍历、上传、下载等批量操作的调用者没有设置优先级时，使用default。
+
+    :param func: 在线程池中执行的函数。
+    :param default: 调用者没有设置优先级时使用的类别。
+    """
+    name = current_priority(default)
+
+    def run(*args, **kwargs):
+        token = _priority.set(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _priority.reset(token)
+    return run
+
+
+class FairQueue(object):
+    """
+    加权公平队列。每个元素按照类别的权重得到虚拟的完成时间，出队时选择完成时间最早的元素，
+    同一类别内先进先出。积压的类别按权重分享出队的机会，没有积压的类别不会积累额度。
+    """
+    def __init__(self, weights = None):
+        """
+        :param weights: 类别到权重的字典，默认是 ``priority_weights`` 。
+        """
+        self.weights = dict(weights or priority_weights)
+        self.queues = {name: deque() for name in self.weights}
+        self.finish = dict.fromkeys(self.weights, 0.0)
+        self.vtime = 0.0
+
+    def append(self, item, name):
+        """
+        :param item: 元素。
+        :param name: 类别。
+        """
+        if name not in self.weights:
+            raise KeyError(f'unknown priority {name}')
+        tag = max(self.vtime, self.finish[name]) + 1.0 / self.weights[name]
+        self.finish[name] = tag
+        self.queues[name].append((tag, item))
+
+    def pop(self, allowed = None):
+        """
+        取出下一个元素。
+
+        :param allowed: 判断类别是否可以出队的函数，默认所有类别都可以。
+        :return: 元素，没有可以出队的元素时返回None。
+        """
+        best = None
+        for name, queue in self.queues.items():
+            if queue and (allowed is None or allowed(name)) and (best is None or queue[0][0] < best[0][0]):
+                best = queue
+        if best is None:
+            return None
+        tag, item = best.popleft()
+        self.vtime = tag
+        return item
+
+    def remove(self, item):
+        """
+        删除元素。
+
+        :return: 是否找到了元素。
+        """
+        for queue in self.queues.values():
+            for entry in queue:
+                if entry[1] is item:
+                    queue.remove(entry)
+                    return True
+        return False
+
+    def lengths(self):
+        """
+        :return: 每个类别排队的元素数。
+        """
+        return {name: len(queue) for name, queue in self.queues.items()}
+
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues.values())
@@ -4,7 +4,8 @@
 
 from collections.abc import Iterator
 import json
-from copy import deepcopy
+from alist.registry import AlistRegistry
+from alist.record import AlistRecord
 
 group_front = 0
 group_back  = 1
@@ -27,7 +28,7 @@ class AlistSetting(dict):
     必须设置key。对象初始化之后，只能修改value，其他属性不能修改。
     """
     def __init__(self, **kwargs):
-        super().__init__(deepcopy(empty_setting))
+        super().__init__(empty_setting)
         if 'key' not in kwargs:
             raise ValueError("must set \"key\"")
 
@@ -73,6 +74,94 @@ class AlistSetting(dict):
         return self['value']
 
 
+class SettingRecord(AlistRecord):
+    """
+    设置的紧凑只读记录，字段与 :class:`AlistSetting` 相同。
+    设置快照使用它保存设置。
+    """
+    __slots__ = ()
+    fields = tuple(empty_setting)
+
+
+class AlistSettingsBatch(object):
+    """
+    批量修改设置。修改先在本地按照设置的 ``type`` 和 ``values`` 检查，
+    提交时只把值有变化的设置通过一次请求保存。作为上下文管理器使用时，
+    退出时自动提交，发生异常时放弃所有修改。
+
+    .. code-block:: python
+
+        with client.admin.settings.batch() as batch:
+            batch.set_value('title', 'My Alist')
+            batch.set_value('enable search', 'true')
+    """
+    def __init__(self, settings):
+        """
+        :param settings: :class:`AlistAaminSettings`
+        """
+        self.settings = settings
+        self.changes = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def set_value(self, key, new):
+        """
+        修改设置的值，规则与 :meth:`AlistSetting.set_value` 相同。
+
+        :param key: 设置的键值
+        :param new: 新值
+        :return: 新值new。
+        """
+        if key in self.settings.settings_ro:
+            raise KeyError(f'setting \'{key}\' is read only')
+        s = self.changes.get(key)
+        if s is None:
+            s = self.settings.get_setting(key)
+        s.set_value(new)
+        self.changes[key] = s
+        return new
+
+    def get_value(self, key):
+        """
+        获取设置的值，包括尚未提交的修改。
+
+        :param key: 设置的键值
+        """
+        if key in self.changes:
+            return self.changes[key].get_value()
+        return self.settings.get_setting(key).get_value()
+
+    def changed(self):
+        """
+        :return: 值与设置快照不同的设置列表。
+        """
+        return [s for key, s in self.changes.items()
+                if s.get_value() != self.settings.get_setting(key).get_value()]
+
+    def commit(self):
+        """
+        提交修改。没有变化时不发送请求。
+
+        :return: 保存的设置列表。
+        """
+        changed = self.changed()
+        if len(changed) != 0:
+            self.settings.save(changed)
+        self.changes.clear()
+        return changed
+
+    def rollback(self):
+        """放弃所有修改。"""
+        self.changes.clear()
+
+
 class AlistAaminSettings(object):
     """
     Alist管理员设置
@@ -95,9 +184,13 @@ class AlistAaminSettings(object):
                    'Aria2 RPC secret',]
     """可修改的设置"""
 
+    ttl = 60
+    """设置快照的有效时间，单位秒"""
+
     def __init__(self, alist, admin, endpoint):
         self.alist = alist
         self.endpoint = endpoint
+        self.store = AlistRegistry(self._records, ('key',), self.ttl)
 
         for key in self.settings_ro:
             attr = f"setting_{key.replace(' ', '_').replace('.', '_')}"
@@ -139,25 +232,53 @@ class AlistAaminSettings(object):
 
     def get_setting(self, key) -> AlistSetting:
         """
-        获取指定设置。
+        获取指定设置。从本地的设置快照中查找，快照过期时才从服务器重新加载。
 
         :param key: 设置的键值
         """
-        settings = self.get()
-        for s in settings:
-            if s['key'] == key:
-                return s
-        raise KeyError(f'setting \'{key}\' not found')
+        try:
+            return AlistSetting(**self.store.get(key))
+        except KeyError:
+            raise KeyError(f'setting \'{key}\' not found')
+
+    def reload(self):
+        """
+        从服务器重新加载设置快照。
+
+        :return: 管理员设置。
+        """
+        return [AlistSetting(**s) for s in self.store.reload()]
+
+    def _records(self):
+        return [SettingRecord.from_dict(s) for s in self.get()]
 
     def save(self, settings: list):
         """
-        保存设置
+        保存设置。保存成功后更新本地的设置快照。
 
         :param settings: AlistSetting列表
         :return: 保存成功返回True
         """
         endpoint = f'{self.endpoint}/settings'
-        return self.alist.post(endpoint, json=[s for s in settings])
+        result = self.alist.post(endpoint, json=[s for s in settings])
+        for s in settings:
+            self.store.put(SettingRecord.from_dict(s))
+        self.alist.public.settings.store.invalidate()
+        return result
+
+    def batch(self):
+        """
+        批量修改设置，所有修改通过一次请求保存。
+
+        .. code-block:: python
+
+            with client.admin.settings.batch() as batch:
+                batch.set_value('title', 'My Alist')
+                batch.set_value('enable search', 'true')
+
+        :return: :class:`AlistSettingsBatch`
+        """
+        return AlistSettingsBatch(self)
 
     def _get_or_update(self, key, new = None):
         """
@@ -201,9 +322,13 @@ class AlistPublicSettings(object):
                 'enable search', 'no cors', 'no upload']
     """公开设置的键值"""
 
+    ttl = 60
+    """设置快照的有效时间，单位秒"""
+
     def __init__(self, alist, public, endpoint):
         self.alist = alist
         self.endpoint = endpoint
+        self.store = AlistRegistry(self._records, ('key',), self.ttl)
 
         for key in self.settings:
             attr = f"setting_{key.replace(' ', '_').replace('.', '_')}"
@@ -224,15 +349,25 @@ class AlistPublicSettings(object):
 
     def get_setting(self, key):
         """
-        获取指定设置。
+        获取指定设置。从本地的设置快照中查找，快照过期时才从服务器重新加载。
 
         :param key: 设置的键值
         """
-        settings = self.get()
-        for s in settings:
-            if s['key'] == key:
-                return s
-        raise KeyError(f'setting \'{key}\' not found')
+        try:
+            return AlistSetting(**self.store.get(key))
+        except KeyError:
+            raise KeyError(f'setting \'{key}\' not found')
+
+    def reload(self):
+        """
+        从服务器重新加载设置快照。
+
+        :return: 公开的设置
+        """
+        return [AlistSetting(**s) for s in self.store.reload()]
+
+    def _records(self):
+        return [SettingRecord.from_dict(s) for s in self.get()]
 
     def _factory_get_setting(self, key):
         def _get_setting_wrapper():
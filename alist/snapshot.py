@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import sqlite3
+import time
+from alist.cache import normpath
+from alist.walk import AlistWalker, join_path, is_folder
+
+schema = '''
+CREATE TABLE IF NOT EXISTS snapshots (
+    id          INTEGER PRIMARY KEY,
+    top         TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    listed      INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    path        TEXT NOT NULL,
+    parent      TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    size        INTEGER,
+    type        INTEGER,
+    updated_at  TEXT,
+    added       INTEGER NOT NULL,
+    removed     INTEGER,
+    PRIMARY KEY (path, added)
+);
+CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent, removed);
+CREATE INDEX IF NOT EXISTS entries_added ON entries (added);
+CREATE INDEX IF NOT EXISTS entries_removed ON entries (removed);
+CREATE TABLE IF NOT EXISTS listed (
+    path        TEXT PRIMARY KEY
+);
+'''
+
+columns = ('path', 'name', 'size', 'type', 'updated_at')
+"""快照中每个文件保存的字段"""
+
+
+class AlistSnapshot(object):
+    """
+    保存在SQLite数据库中的目录树快照。
+
+    每条记录保存它出现（``added``）和消失（``removed``）的快照ID，没有变化的文件不会重复保存。
+    重新扫描时只进入新增的或者文件信息（大小、修改时间）变化了的目录，
+    耗时与变化的数量成正比。注意很多存储只在直接的子项变化时才更新目录的修改时间，
+    需要完整扫描时使用 ``scan(full=True)`` 。
+
+    .. code-block:: python
+
+        with client.public.snapshot('inventory.db', '/movies') as snapshot:
+            old = snapshot.latest()
+            new = snapshot.scan()
+            changes = snapshot.diff(old, new)
+            print(len(changes['added']), len(changes['removed']), len(changes['modified']))
+    """
+    def __init__(self,
+                 public,
+                 database,
+                 top = '/',
+                 password = None,
+                 passwords = None,
+                 workers = 8,
+                 page_size = 100):
+        """
+        :param public: :class:`AlistPublic <alist.public.AlistPublic>`
+        :param database: SQLite数据库的文件名。
+        :param top: 扫描的目录。
+        :param password: 默认的访问密码。
+        :param passwords: 路径到访问密码的字典，使用最长匹配的路径的密码。
+        :param workers: 同时请求的目录数。
+        :param page_size: 列目录时的初始页面大小。
+        """
+        self.public = public
+        self.top = normpath(top)
+        self.password = password
+        self.passwords = passwords
+        self.workers = workers
+        self.page_size = page_size
+        self.db = sqlite3.connect(database)
+        self.db.executescript(schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """关闭数据库。"""
+        self.db.close()
+
+    def scan(self, full = False):
+        """
+        扫描目录树，保存为新的快照。扫描失败时不保存任何修改。
+
+        :param full: 是否列出所有目录。默认只列出变化了的目录。
+        :return: 新快照的ID。
+        """
+        with self.db:
+            cursor = self.db.execute('INSERT INTO snapshots (top, created_at, listed) VALUES (?, ?, 0)',
+                                     (self.top, time.time()))
+            snapshot = cursor.lastrowid
+            if full:
+                self.db.execute('DELETE FROM listed')
+
+            walker = AlistWalker(self.public,
+                                 self.top,
+                                 password=self.password,
+                                 passwords=self.passwords,
+                                 workers=self.workers,
+                                 page_size=self.page_size,
+                                 descend=self.is_changed)
+            listed = 0
+            for path, dirs, files in walker:
+                self.apply(snapshot, path, dirs + files)
+                listed += 1
+            self.db.execute('UPDATE snapshots SET listed = ? WHERE id = ?', (listed, snapshot))
+        return snapshot
+
+    def is_changed(self, path, entry):
+        """
+        目录是否需要重新列出。
+
+        :param path: 目录的路径。
+        :param entry: 父目录列表中的文件信息。
+        """
+        if self.db.execute('SELECT 1 FROM listed WHERE path = ?', (path,)).fetchone() is None:
+            return True
+        row = self.db.execute('SELECT size, updated_at FROM entries WHERE path = ? AND removed IS NULL',
+                              (path,)).fetchone()
+        return row is None or row != (entry.get('size'), entry.get('updated_at'))
+
+    def apply(self, snapshot, path, files):
+        """
+        把目录的最新列表写入快照。
+
+        :param snapshot: 快照ID。
+        :param path: 目录的路径。
+        :param files: 目录中的所有文件。
+        """
+        path = normpath(path)
+        current = dict()
+        for row in self.db.execute('SELECT name, size, type, updated_at FROM entries '
+                                   'WHERE parent = ? AND removed IS NULL', (path,)):
+            current[row[0]] = row[1:]
+
+        names = set()
+        for f in files:
+            name = f['name']
+            names.add(name)
+            values = (f.get('size'), f.get('type'), f.get('updated_at'))
+            old = current.get(name)
+            if old == values:
+                continue
+            full = join_path(path, name)
+            if old is not None:
+                self._remove(snapshot, full, subtree=(old[1] == 1 and not is_folder(f)))
+            self.db.execute('INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, NULL)',
+                            (full, path, name) + values + (snapshot,))
+
+        for name in current.keys() - names:
+            self._remove(snapshot, join_path(path, name), subtree=True)
+        self.db.execute('INSERT OR IGNORE INTO listed VALUES (?)', (path,))
+
+    def _remove(self, snapshot, path, subtree):
+        self.db.execute('UPDATE entries SET removed = ? WHERE path = ? AND removed IS NULL',
+                        (snapshot, path))
+        if subtree:
+            # 子路径都以 path + '/' 开头，用范围查询代替LIKE，避免转义通配符
+            prefix = path.rstrip('/') + '/'
+            end = prefix[:-1] + chr(ord('/') + 1)
+            self.db.execute('UPDATE entries SET removed = ? WHERE path >= ? AND path < ? AND removed IS NULL',
+                            (snapshot, prefix, end))
+            self.db.execute('DELETE FROM listed WHERE path = ? OR (path >= ? AND path < ?)',
+                            (path, prefix, end))
+
+    def snapshots(self):
+        """
+        :return: 所有快照，包含 ``id``、``top``、``created_at``、``listed`` （列出的目录数）。
+        """
+        rows = self.db.execute('SELECT id, top, created_at, listed FROM snapshots ORDER BY id')
+        return [dict(zip(('id', 'top', 'created_at', 'listed'), row)) for row in rows]
+
+    def latest(self):
+        """
+        :return: 最新的快照ID，没有快照时返回None。
+        """
+        return self.db.execute('SELECT MAX(id) FROM snapshots').fetchone()[0]
+
+    def entries(self, snapshot = None, parent = None):
+        """
+        快照中的文件。
+
+        :param snapshot: 快照ID，默认是最新的快照。
+        :param parent: 只返回这个目录中的文件，默认返回所有文件。
+        :return: 文件信息的迭代器，包含 ``path``、``name``、``size``、``type``、``updated_at`` 。
+        """
+        if snapshot is None:
+            snapshot = self.latest()
+        sql = ('SELECT path, name, size, type, updated_at FROM entries '
+               'WHERE added <= ? AND (removed IS NULL OR removed > ?)')
+        params = [snapshot, snapshot]
+        if parent is not None:
+            sql += ' AND parent = ?'
+            params.append(normpath(parent))
+        for row in self.db.execute(sql + ' ORDER BY path', params):
+            yield dict(zip(columns, row))
+
+    def diff(self, old, new = None):
+        """
+        比较两个快照。
+
+        :param old: 旧快照的ID。
+        :param new: 新快照的ID，默认是最新的快照。
+        :return: ``{'added': [...], 'removed': [...], 'modified': [(旧, 新), ...]}`` ，
+                 元素是文件信息，按路径排序。
+        """
+        if new is None:
+            new = self.latest()
+        # 只有在两个快照之间出现或者消失的记录才可能不同
+        lo, hi = min(old, new), max(old, new)
+        sql = ('SELECT path, name, size, type, updated_at, '
+               'added <= ? AND (removed IS NULL OR removed > ?), '
+               'added <= ? AND (removed IS NULL OR removed > ?) '
+               'FROM entries WHERE (added > ? AND added <= ?) OR (removed > ? AND removed <= ?)')
+        before, after = dict(), dict()
+        for row in self.db.execute(sql, (old, old, new, new, lo, hi, lo, hi)):
+            entry = dict(zip(columns, row[:5]))
+            if row[5]:
+                before[entry['path']] = entry
+            if row[6]:
+                after[entry['path']] = entry
+
+        added = [after[p] for p in sorted(after.keys() - before.keys())]
+        removed = [before[p] for p in sorted(before.keys() - after.keys())]
+        modified = [(before[p], after[p]) for p in sorted(before.keys() & after.keys())
+                    if before[p] != after[p]]
+        return {'added': added, 'removed': removed, 'modified': modified}
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import codecs
+import json
+from requests import HTTPError
+
+_decoder = json.JSONDecoder()
+_whitespace = ' \t\n\r'
+
+
+class JSONStreamReader(object):
+    """
+    增量JSON读取器。从数据块迭代器中按需读取数据，只缓存尚未解析的部分，
+    已解析的数据会被丢弃，所以内存占用与单个元素的大小相关，与整个响应的大小无关。
+    """
+    def __init__(self, chunks, encoding='utf-8'):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder(encoding or 'utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """读取下一个数据块。没有更多数据时返回False。"""
+        if self.eof:
+            return False
+        try:
+            chunk = next(self.chunks)
+            text = self.decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        except StopIteration:
+            self.eof = True
+            text = self.decoder.decode(b'', final=True)
+        # 丢弃已经解析的数据
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """跳过空白，返回下一个字符，但不消耗它。数据结束时返回空字符串。"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _whitespace:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, ch):
+        """消耗下一个字符，它必须是ch。"""
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"Invalid json content: expect '{ch}' but got '{got}' at {self.pos}")
+        self.pos += 1
+
+    def read_value(self):
+        """读取一个完整的JSON值。"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self._fill():
+                    continue
+                raise
+            # 数字等值可能被截断在数据块末尾，需要更多数据才能确定已经完整
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _next(self, close):
+        """处理容器中元素之间的逗号。到达容器末尾时返回False。"""
+        ch = self.peek()
+        if ch == ',':
+            self.pos += 1
+            return True
+        self.expect(close)
+        return False
+
+    def iter_object(self):
+        """迭代当前对象，生成键值。值需要由调用者读取，或调用 :meth:`read_value` 跳过。"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            if not self._next('}'):
+                return
+
+    def iter_array(self):
+        """迭代当前数组，逐个生成元素。"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if not self._next(']'):
+                return
+
+
+def iter_items(reader, path, fields=None):
+    """
+    逐个生成 ``path`` 指向的数组中的元素。其他路径上的值会被完整读取后丢弃，
+    顶层对象的值保存在 ``fields`` 中。
+
+    :param reader: :class:`JSONStreamReader`
+    :param path: 键的序列，例如 ``('data', 'files')``。
+    :param fields: 可选的字典，保存顶层对象中除path以外的值。
+    """
+    for key in reader.iter_object():
+        if key == path[0] and len(path) > 1 and reader.peek() == '{':
+            yield from iter_items(reader, path[1:])
+        elif key == path[0] and len(path) == 1 and reader.peek() == '[':
+            yield from reader.iter_array()
+        else:
+            value = reader.read_value()
+            if fields is not None:
+                fields[key] = value
+
+
+def iter_response_items(chunks, key = 'files', encoding = 'utf-8'):
+    """
+    从Alist响应的数据块中逐个生成 ``data[key]`` 中的元素。
+    错误处理与 :meth:`AlistClient.decode_response <alist.AlistClient.decode_response>` 相同。
+
+    :param chunks: 响应数据块的迭代器。
+    :param key: ``data`` 中数组的键。
+    :param encoding: 数据的编码。
+    :raises: 如果响应包含错误则触发requests.HTTPError。
+    """
+    reader = JSONStreamReader(chunks, encoding)
+    fields = dict()
+    for key_ in reader.iter_object():
+        if key_ == 'data':
+            if fields.get('code', 200) != 200:
+                break
+            if reader.peek() == '{':
+                yield from iter_items(reader, (key,))
+                continue
+        fields[key_] = reader.read_value()
+    if fields.get('code', 200) != 200:
+        raise HTTPError(fields['code'], fields.get('message'))
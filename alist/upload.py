@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.exceptions import ConnectionError, Timeout
+import alist
+from alist.cache import normpath
+from alist.schedule import inherit
+
+
+def collect_files(src, path):
+    """
+    收集需要上传的文件。
+
+    :param src: 本地目录，或者由本地文件路径、``(本地文件路径, 目标目录)`` 组成的可迭代对象。
+    :param path: 目标目录。上传本地目录时，保持目录结构不变。
+    :return: ``(本地文件路径, 目标目录)`` 的列表。
+    """
+    path = normpath(path)
+    files = list()
+    if isinstance(src, (str, os.PathLike)) and os.path.isdir(src):
+        for root, _, names in os.walk(src):
+            rel = os.path.relpath(root, src).replace(os.sep, '/')
+            target = path if rel == '.' else normpath(f'{path}/{rel}')
+            for name in sorted(names):
+                files.append((os.path.join(root, name), target))
+        return files
+
+    for item in src:
+        if isinstance(item, (tuple, list)):
+            files.append((item[0], normpath(item[1])))
+        else:
+            files.append((item, path))
+    return files
+
+
+def plan_batches(files, max_batch_bytes = 64 * 1024 * 1024, max_batch_files = 100, failed = None):
+    """
+    按目标目录分组，再按字节数和文件数的上限把文件装入批次。
+    超过字节数上限的文件单独成为一个批次。
+
+    :param files: ``(本地文件路径, 目标目录)`` 的列表。
+    :param max_batch_bytes: 每个批次的最大字节数。
+    :param max_batch_files: 每个批次的最大文件数。
+    :param failed: 列表。指定时，无法读取大小的文件以 ``(本地文件路径, 目标目录, 异常)``
+                   加入这个列表并跳过，否则触发异常。
+    :return: ``(目标目录, [本地文件路径, ...])`` 的列表。
+    """
+    groups = dict()
+    for filename, target in files:
+        try:
+            file_size = os.path.getsize(filename)
+        except OSError as e:
+            if failed is None:
+                raise
+            failed.append((filename, target, e))
+            continue
+        groups.setdefault(target, []).append((file_size, filename))
+
+    batches = list()
+    for target, items in groups.items():
+        # 从大到小装箱，每个批次的大小更平均
+        items.sort(reverse=True)
+        batch, size = list(), 0
+        for file_size, filename in items:
+            if batch and (size + file_size > max_batch_bytes or len(batch) >= max_batch_files):
+                batches.append((target, batch))
+                batch, size = list(), 0
+            batch.append(filename)
+            size += file_size
+        if batch:
+            batches.append((target, batch))
+    return batches
+
+
+def result(filename, target, error, attempts):
+    """一个文件的上传结果。"""
+    return {
+        'file': filename,
+        'path': target,
+        'success': error is None,
+        'error': error,
+        'attempts': attempts,
+    }
+
+
+class AlistBulkUploader(object):
+    """
+    批量上传文件。文件按目标目录和大小分批，每个批次是一个multipart请求，
+    多个批次并发上传。上传不是幂等的，默认只重试没有发送到服务器的批次（连接没有建立）；
+    ``replay=True`` 时已经发送的批次失败后也重试，可能重复上传。
+    批次只在这里重试，不再使用客户端的重试策略，避免两层重试叠加。
+
+    无法读取的文件不影响其他文件，在结果中记为失败，``attempts`` 为0。
+    """
+    def __init__(self,
+                 public,
+                 password = None,
+                 workers = 4,
+                 max_batch_bytes = 64 * 1024 * 1024,
+                 max_batch_files = 100,
+                 retries = 2,
+                 backoff = 1.0,
+                 make_dirs = False,
+                 callback = None,
+                 replay = False):
+        """
+        :param public: :class:`AlistPublic <alist.public.AlistPublic>`
+        :param password: 访问密码。
+        :param workers: 同时上传的批次数。
+        :param max_batch_bytes: 每个批次的最大字节数。
+        :param max_batch_files: 每个批次的最大文件数。
+        :param retries: 批次失败后的重试次数。
+        :param backoff: 第n次重试前等待 ``backoff * 2 ** (n - 1)`` 秒。
+        :param make_dirs: 上传前创建目标目录，需要登录。
+        :param callback: 每个批次结束时调用，参数是该批次的结果列表。
+        :param replay: 请求已经发送之后失败时是否也重试。
+        """
+        self.public = public
+        self.password = password
+        self.workers = workers
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_files = max_batch_files
+        self.retries = retries
+        self.backoff = backoff
+        self.make_dirs = make_dirs
+        self.callback = callback
+        self.replay = replay
+
+    def retryable(self, error):
+        """
+        批次失败后能否重试。
+
+        :param error: 上传时的异常。
+        :return: 请求一定没有发送到服务器，或者开启了 ``replay`` 时返回True。
+        """
+        if self.replay:
+            return True
+        return isinstance(error, (ConnectionError, Timeout)) and not alist.is_connected(error)
+
+    def upload_batch(self, target, filenames):
+        """
+        上传一个批次，按照 :meth:`retryable` 重试。
+
+        :return: 每个文件的结果。
+        """
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                self.public.upload(filenames, target, self.password, retry=False)
+                error = None
+            except Exception as e:
+                error = e
+            if error is None or attempts > self.retries or not self.retryable(error):
+                break
+            time.sleep(self.backoff * 2 ** (attempts - 1))
+
+        return [result(filename, target, error, attempts) for filename in filenames]
+
+    def upload(self, src, path):
+        """
+        上传文件。
+
+        :param src: 本地目录，或者由本地文件路径、``(本地文件路径, 目标目录)`` 组成的可迭代对象。
+        :param path: 目标目录。
+        :return: 每个文件的结果，包含 ``file``、``path``、``success``、``error``、``attempts`` 。
+        """
+        failed = list()
+        batches = plan_batches(collect_files(src, path),
+                               self.max_batch_bytes,
+                               self.max_batch_files,
+                               failed)
+        results = [result(filename, target, error, 0) for filename, target, error in failed]
+        if results and self.callback is not None:
+            self.callback(list(results))
+
+        if self.make_dirs:
+            for target in sorted({target for target, _ in batches}):
+                self.public.alist.admin.mkdir(target)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            upload_batch = inherit(self.upload_batch)
+            futures = [executor.submit(upload_batch, target, filenames)
+                       for target, filenames in batches]
+            for future in as_completed(futures):
+                batch = future.result()
+                if self.callback is not None:
+                    self.callback(batch)
+                results.extend(batch)
+        return results
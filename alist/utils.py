@@ -5,6 +5,21 @@
 import time
 from datetime import datetime
 import hashlib
+import json
+
+# 优先使用更快的JSON库，它们都可以直接解析bytes
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_backend = 'orjson'
+except ImportError:
+    try:
+        import ujson
+        json_loads = ujson.loads
+        json_backend = 'ujson'
+    except ImportError:
+        json_loads = json.loads
+        json_backend = 'json'
 
 def get_timestamp():
     now = time.time()
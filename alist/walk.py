@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from fnmatch import fnmatchcase
+from alist.schedule import inherit
+
+file_type_unknown = 0
+file_type_folder  = 1
+file_type_office  = 2
+file_type_video   = 3
+file_type_audio   = 4
+file_type_text    = 5
+file_type_image   = 6
+
+
+def join_path(parent, name):
+    """拼接Alist路径。"""
+    return f"{parent.rstrip('/')}/{name}"
+
+
+def is_folder(entry):
+    """文件列表中的元素是否是文件夹。"""
+    return entry['type'] == file_type_folder
+
+
+def match(patterns, path, name):
+    """
+    检查路径是否匹配任意一个模式。包含 ``/`` 的模式匹配完整路径，其他模式只匹配文件名。
+
+    :param patterns: glob模式列表。
+    :param path: 完整路径。
+    :param name: 文件名。
+    """
+    for pattern in patterns:
+        if fnmatchcase(path if '/' in pattern else name, pattern):
+            return True
+    return False
+
+
+class AlistWalker(object):
+    """
+    并发遍历目录树。目录的列表请求分发到线程池中，最多同时请求 ``workers`` 个目录，
+    哪个目录先完成就先返回哪个，所以返回的顺序与 ``os.walk`` 不同。
+
+    迭代生成 ``(dirpath, dirs, files)``，其中 ``dirs`` 和 ``files`` 是
+    :meth:`AlistPublic.path <alist.public.AlistPublic.path>` 返回的文件信息。
+    """
+    def __init__(self,
+                 public,
+                 top,
+                 max_depth = None,
+                 include = None,
+                 exclude = None,
+                 password = None,
+                 passwords = None,
+                 workers = 8,
+                 page_size = 100,
+                 onerror = None,
+                 descend = None):
+        """
+        :param public: :class:`AlistPublic <alist.public.AlistPublic>`
+        :param top: 开始遍历的路径。
+        :param max_depth: 最大深度。0表示只列出top，None表示不限制。
+        :param include: 文件的glob模式列表，只返回匹配的文件。不影响目录的遍历。
+        :param exclude: glob模式列表，匹配的文件和目录都会被跳过，目录不会继续遍历。
+        :param password: 默认的访问密码。
+        :param passwords: 路径到访问密码的字典，使用最长匹配的路径的密码。
+        :param workers: 同时请求的目录数。
+        :param page_size: 列目录时的初始页面大小。
+        :param onerror: 列目录失败时的回调函数，参数是路径和异常。为None时触发异常。
+        :param descend: 判断是否进入子目录的函数，参数是子目录的路径和文件信息，返回False时不进入。
+                        为None时进入所有子目录。
+        """
+        self.public = public
+        self.top = top
+        self.max_depth = max_depth
+        self.include = include or []
+        self.exclude = exclude or []
+        self.password = password
+        self.passwords = passwords or {}
+        self.workers = workers
+        self.page_size = page_size
+        self.onerror = onerror
+        self.descend = descend
+
+    def get_password(self, path):
+        """
+        获取路径的访问密码。
+
+        :param path: 路径
+        :return: passwords中最长匹配的路径的密码，没有匹配时返回默认密码。
+        """
+        best = None
+        for prefix in self.passwords:
+            p = prefix.rstrip('/')
+            if path == p or path.startswith(p + '/'):
+                if best is None or len(p) > len(best.rstrip('/')):
+                    best = prefix
+        if best is None:
+            return self.password
+        return self.passwords[best]
+
+    def listdir(self, path):
+        """列出目录中的所有文件，自动翻页。"""
+        return list(self.public.iter_files(path,
+                                           password=self.get_password(path),
+                                           page_size=self.page_size,
+                                           prefetch=False))
+
+    def split(self, path, files):
+        """按照过滤规则把目录内容分为文件夹和文件。"""
+        dirs, others = list(), list()
+        for f in files:
+            full = join_path(path, f['name'])
+            if self.exclude and match(self.exclude, full, f['name']):
+                continue
+            if is_folder(f):
+                dirs.append(f)
+            elif not self.include or match(self.include, full, f['name']):
+                others.append(f)
+        return dirs, others
+
+    def __iter__(self):
+        queue = deque([(self.top, 0)])
+        pending = dict()
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        listdir = inherit(self.listdir)
+        try:
+            while queue or pending:
+                while queue and len(pending) < self.workers:
+                    path, depth = queue.popleft()
+                    pending[executor.submit(listdir, path)] = (path, depth)
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, depth = pending.pop(future)
+                    try:
+                        files = future.result()
+                    except Exception as e:
+                        if self.onerror is None:
+                            raise
+                        self.onerror(path, e)
+                        continue
+
+                    dirs, others = self.split(path, files)
+                    if self.max_depth is None or depth < self.max_depth:
+                        for d in dirs:
+                            full = join_path(path, d['name'])
+                            if self.descend is None or self.descend(full, d):
+                                queue.append((full, depth + 1))
+                    yield path, dirs, others
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+"""
+比较 ``AlistClient.decode_content`` 与旧版本解析方式（strip、decode、json.loads）
+在大目录 ``public.path`` 响应上的耗时和内存峰值。
+
+.. code-block:: shell
+
+    python -m benchmarks.bench_decode --files 50000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from alist import AlistClient
+from alist import utils
+
+
+def make_payload(n):
+    files = [{
+        "name": f"file-{i:06d}.mkv",
+        "size": i * 1024,
+        "type": 3,
+        "driver": "Native",
+        "updated_at": "2023-06-11T11:03:03.684818327+08:00",
+        "thumbnail": "",
+        "url": "",
+        "size_str": "",
+        "time_str": "",
+    } for i in range(n)]
+    data = {"type": "folder", "meta": {"driver": "Native", "upload": False, "total": n, "readme": ""}, "files": files}
+    return json.dumps({"code": 200, "message": "success", "data": data}).encode('utf-8')
+
+
+def decode_legacy(content, encoding):
+    content = content.strip()
+    content = content.decode(encoding)
+    content = json.loads(content)
+    return content['data']
+
+
+def decode_current(content, encoding):
+    return AlistClient.decode_content(content, 'application/json; charset=utf-8', encoding)
+
+
+def measure(func, content, rounds):
+    func(content, 'utf-8')
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(content, 'utf-8')
+    elapsed = (time.perf_counter() - start) / rounds
+
+    tracemalloc.start()
+    func(content, 'utf-8')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=50000, help='number of entries in the listing')
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    content = make_payload(args.files)
+    print(f'payload: {len(content) / 1024 / 1024:.1f} MiB, {args.files} files, json backend: {utils.json_backend}')
+    for name, func in [('legacy', decode_legacy), ('current', decode_current)]:
+        elapsed, peak = measure(func, content, args.rounds)
+        print(f'{name:8s} {elapsed * 1000:8.1f} ms  peak {peak / 1024 / 1024:8.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+"""
+比较账号和文件列表在三种表示方式下的创建耗时和内存占用：
+旧版本的 ``AlistAccount`` （deepcopy模板）、当前的 ``AlistAccount`` 和紧凑的记录类。
+
+.. code-block:: shell
+
+    python -m benchmarks.bench_records --accounts 10000 --files 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+from copy import deepcopy
+
+from alist.account import AlistAccount, AccountRecord, empty_account
+from alist.record import FileRecord
+
+
+class LegacyAccount(dict):
+    def __init__(self, **kwargs):
+        super().__init__(deepcopy(empty_account))
+        for key in kwargs:
+            if key in self or key == 'id':
+                super().__setitem__(key, kwargs[key])
+
+
+def make_accounts(n):
+    return [{
+        'id': i,
+        'name': f'/native-{i}',
+        'type': 'Native',
+        'root_folder': f'/data/{i}',
+        'status': 'work',
+        'index': i,
+        'webdav_direct': False,
+        'updated_at': '2023-06-11T11:03:03.684818327+08:00',
+    } for i in range(n)]
+
+
+def make_files(n):
+    return [{
+        'name': f'file-{i:06d}.mkv',
+        'size': i * 1024,
+        'type': 3,
+        'driver': 'Native',
+        'updated_at': '2023-06-11T11:03:03.684818327+08:00',
+        'thumbnail': '',
+        'url': '',
+        'size_str': '',
+        'time_str': '',
+    } for i in range(n)]
+
+
+def measure(build, items):
+    start = time.perf_counter()
+    build(items)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = build(items)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, current
+
+
+def report(title, items, builders):
+    print(title)
+    for name, build in builders:
+        elapsed, size = measure(build, items)
+        print(f'  {name:16s} {elapsed * 1000:8.1f} ms  {size / 1024 / 1024:8.1f} MiB'
+              f'  {size / len(items):6.0f} B/item')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--accounts', type=int, default=10000)
+    parser.add_argument('--files', type=int, default=100000)
+    args = parser.parse_args()
+
+    report(f'{args.accounts} accounts', make_accounts(args.accounts), [
+        ('legacy dict', lambda items: [LegacyAccount(**a) for a in items]),
+        ('AlistAccount', lambda items: [AlistAccount(**a) for a in items]),
+        ('AccountRecord', lambda items: [AccountRecord.from_dict(a) for a in items]),
+    ])
+    # 文件列表的dict来自JSON解析，这里只计算复制一份的开销
+    report(f'{args.files} files', make_files(args.files), [
+        ('dict', lambda items: [dict(f) for f in items]),
+        ('FileRecord', lambda items: [FileRecord.from_dict(f) for f in items]),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -28,3 +28,7 @@ def client_nologin():
 @pytest.fixture
 def client():
     return AlistClient(BASE_URL, password=PASSWORD)
+
+@pytest.fixture
+def client_thread_safe():
+    return AlistClient(BASE_URL, password=PASSWORD, thread_safe=True, pool_maxsize=64)
@@ -3,6 +3,7 @@
 # @Author: Kai Peng
 
 import pytest
+from alist.meta import AlistMeta
 
 def test_settings_get(client):
     settings = client.admin.settings.get()
@@ -46,6 +47,23 @@ def test_settings_save(client):
     assert client.admin.settings.save([setting]) == True
     assert client.admin.setting_enable_search() == old_value
 
+def test_settings_batch(client):
+    old_value = client.admin.setting_enable_search()
+    new_value = 'false' if old_value == 'true' else 'true'
+
+    with client.admin.settings.batch() as batch:
+        batch.set_value('enable search', new_value)
+        assert batch.get_value('enable search') == new_value
+    assert client.admin.setting_enable_search() == new_value
+
+    with pytest.raises(ValueError):
+        with client.admin.settings.batch() as batch:
+            batch.set_value('enable search', 'yes')
+
+    with client.admin.settings.batch() as batch:
+        batch.set_value('enable search', old_value)
+    assert client.admin.setting_enable_search() == old_value
+
 
 
 
@@ -92,6 +110,18 @@ def test_accounts_delete(client):
     r = client.admin.account.delete(account_name)
     assert r == True
 
+def test_accounts_create_many(client):
+    names = [f'{account_name}_{i}' for i in range(3)]
+    accounts = [{'type': 'Native', 'name': name, 'root_folder': '/tmp'} for name in names]
+    accounts.append({'type': 'Native', 'name': f'{account_name}_bad'})
+
+    results = client.admin.accounts.create_many(accounts, workers=2)
+    assert [r['success'] for r in results] == [True, True, True, False]
+    assert isinstance(results[-1]['error'], ValueError)
+
+    for name in names:
+        assert client.admin.account.delete(name) == True
+
 
 
 
@@ -122,6 +152,11 @@ def test_meta_save(client):
     new_meta = client.admin.metas.get_meta(meta_path)
     assert new_meta['upload'] == new_upload
 
+def test_meta_copy():
+    meta = AlistMeta(path='/path', hide=['a.txt', 'b.txt'], id=1)
+    assert meta['hide'] == 'a.txt,b.txt'
+    assert AlistMeta(**meta) == meta
+
 @pytest.mark.run(after='test_meta_save')
 def test_meta_delete(client):
     r = client.admin.meta.delete(meta_path)
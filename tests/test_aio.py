@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import asyncio
+import json
+import pytest
+from requests import HTTPError
+
+pytest.importorskip('aiohttp')
+
+from alist import AsyncAlistClient
+from alist.walk import file_type_folder, file_type_text
+from alist.setting import empty_setting
+
+settings = [
+    {'key': 'version', 'value': 'v2.6.4', 'type': 'string', 'group': 0},
+    {'key': 'title', 'value': 'Alist', 'type': 'string', 'group': 0},
+    {'key': 'enable search', 'value': 'false', 'type': 'bool', 'group': 1},
+]
+
+drivers = {
+    'Native': [
+        {'name': 'root_folder', 'label': '', 'type': 'string', 'default': '',
+         'values': '', 'required': True, 'description': ''},
+    ],
+}
+
+tree = {
+    '/': [{'name': 'a', 'type': file_type_folder}, {'name': 'x.txt', 'type': file_type_text, 'size': 1}],
+    '/a': [{'name': 'y.txt', 'type': file_type_text, 'size': 2}, {'name': 'z.txt', 'type': file_type_text, 'size': 3}],
+}
+
+
+class FakeServer(object):
+    """代替 :meth:`AsyncAlistClient.send` ，按端点返回固定的数据。"""
+    def __init__(self):
+        self.requests = list()
+        self.accounts = [{'id': 1, 'name': '/native', 'type': 'Native', 'root_folder': '/tmp'}]
+        self.metas = [{'id': 1, 'path': '/a', 'password': ''}]
+        self.fail = set()
+
+    def handle(self, method, endpoint, kwargs):
+        data = kwargs.get('json')
+        if endpoint in ('/public/settings', '/admin/settings'):
+            return settings if method == 'GET' else None
+        if endpoint == '/public/path':
+            files = tree[data['path']]
+            start = (data['page_num'] - 1) * data['page_size']
+            return {'type': 'folder', 'meta': {'total': len(files)},
+                    'files': files[start:start + data['page_size']]}
+        if endpoint in ('/public/preview', '/admin/link'):
+            return {'url': f"http://alist{data['path']}"}
+        if endpoint == '/public/search':
+            return [f for f in tree['/a'] if data['keyword'] in f['name']]
+        if endpoint == '/admin/folder':
+            return [f for f in tree[data['path']] if f['type'] == file_type_folder]
+        if endpoint == '/admin/drivers':
+            return drivers
+        if endpoint == '/admin/accounts':
+            return self.accounts
+        if endpoint == '/admin/metas':
+            return self.metas
+        return None
+
+    async def send(self, method, endpoint, **kwargs):
+        self.requests.append((method, endpoint))
+        await asyncio.sleep(0)
+        if endpoint in self.fail:
+            return json.dumps({'code': 500, 'message': 'failed', 'data': None}).encode('utf-8'), \
+                   'application/json', 'utf-8', 200
+        content = json.dumps({'code': 200, 'message': 'success', 'data': self.handle(method, endpoint, kwargs)})
+        return content.encode('utf-8'), 'application/json', 'utf-8', 200
+
+
+def make_client(server = None):
+    client = AsyncAlistClient('http://alist', coalesce=False)
+    client.send = (server or FakeServer()).send
+    return client
+
+
+def test_async_request_dict():
+    client = make_client()
+    # headers为None时与同步客户端相同，只使用默认的头部
+    request_kwargs = client.get_request_dict('POST', '/public/path', headers=None, json={'path': '/'})
+    assert request_kwargs['headers']['Accept'] == 'application/json, text/plain, */*'
+    assert 'Authorization' not in request_kwargs['headers']
+    request_kwargs = client.get_request_dict('POST', '/public/path', headers={'X-Test': '1'})
+    assert request_kwargs['headers']['X-Test'] == '1'
+
+
+def test_async_sync_only_methods():
+    client = make_client()
+    asyncio.run(client.login('pw'))
+    # 依赖线程池或者同步响应的方法不出现在异步客户端上
+    for name in ['iter_path', 'build_index', 'snapshot', 'download', 'upload_many']:
+        assert not hasattr(client.public, name)
+
+
+def test_async_public():
+    async def run():
+        client = make_client()
+        assert (await client.public.path('/'))['files'][0]['name'] == 'a'
+        assert [f['name'] async for f in client.public.iter_files('/a', page_size=1)] == ['y.txt', 'z.txt']
+        assert [f['name'] for f in await client.public.scandir('/a', page_size=1)] == ['y.txt', 'z.txt']
+        walked = sorted([w async for w in client.public.walk('/')])
+        assert walked == [('/', ['a'], ['x.txt']), ('/a', [], ['y.txt', 'z.txt'])]
+        assert [w async for w in client.public.walk('/', max_depth=0)] == [('/', ['a'], ['x.txt'])]
+        assert (await client.public.preview('/x.txt'))['url'] == 'http://alist/x.txt'
+        assert len(await client.public.search('/', 'y')) == 1
+        assert (await client.public.setting_version())['value'] == 'v2.6.4'
+        assert (await client.public.settings.get_setting('title'))['value'] == 'Alist'
+        assert len(await client.public.settings()) == 3
+    asyncio.run(run())
+
+
+def test_async_public_columns():
+    pytest.importorskip('numpy')
+
+    async def run():
+        cols = await make_client().public.columns('/a')
+        assert cols.sum('size') == 5
+    asyncio.run(run())
+
+
+def test_async_admin():
+    async def run():
+        client = make_client()
+        assert await client.login('pw') is True
+        admin = client.admin
+        assert await admin.clear_cache() is True
+        assert (await admin.link('/x.txt'))['url'] == 'http://alist/x.txt'
+        assert await admin.files('/', ['x.txt']) is True
+        assert await admin.mkdir('/b') is True
+        assert await admin.rename('/b', 'c') is True
+        assert await admin.move('/', '/a', ['x.txt']) is True
+        assert await admin.copy('/', '/a', ['x.txt']) is True
+        assert (await admin.folder('/'))[0]['name'] == 'a'
+        assert await admin.refresh('/') is True
+
+        assert len(await admin.settings.get()) == 3
+        assert len(await admin.settings.frontend()) == 3
+        assert await admin.setting_version() == 'v2.6.4'
+        assert await admin.setting_title() == 'Alist'
+        assert await admin.setting_title('New') == 'New'
+        assert await admin.settings.save([]) is True
+    asyncio.run(run())
+
+
+def test_async_settings_registry():
+    async def run():
+        server = FakeServer()
+        client = make_client(server)
+        await client.login('pw')
+        admin_settings = client.admin.settings
+        # 快照加载一次，之后从本地查找
+        assert await admin_settings.get_setting('title') == {**empty_setting, **settings[1]}
+        assert await client.admin.setting_version() == 'v2.6.4'
+        assert server.requests.count(('GET', '/admin/settings')) == 1
+        with pytest.raises(KeyError):
+            await admin_settings.get_setting('missing')
+
+        await client.public.setting_version()
+        await client.public.setting_title()
+        assert server.requests.count(('GET', '/public/settings')) == 1
+
+        # 保存失败时快照不变
+        server.fail.add('/admin/settings')
+        s = await admin_settings.get_setting('title')
+        s.set_value('Failed')
+        with pytest.raises(HTTPError):
+            await admin_settings.save([s])
+        assert (await admin_settings.get_setting('title'))['value'] == 'Alist'
+        assert not client.public.settings.store.is_expired()
+
+        # 保存成功后更新快照，公开设置的快照失效
+        server.fail.clear()
+        assert await client.admin.setting_title('Saved') == 'Saved'
+        assert (await admin_settings.get_setting('title'))['value'] == 'Saved'
+        assert server.requests.count(('GET', '/admin/settings')) == 1
+        assert client.public.settings.store.is_expired()
+
+        assert len(await admin_settings.reload()) == 3
+        assert (await admin_settings.get_setting('title'))['value'] == 'Alist'
+    asyncio.run(run())
+
+
+def test_async_settings_batch():
+    async def run():
+        server = FakeServer()
+        client = make_client(server)
+        await client.login('pw')
+        async with client.admin.settings.batch() as batch:
+            batch.set_value('title', 'My Alist')
+            batch.set_value('enable search', 'true')
+            batch.set_value('enable search', 'false')
+            assert batch.get_value('title') == 'My Alist'
+            with pytest.raises(ValueError):
+                batch.set_value('enable search', 'yes')
+            with pytest.raises(KeyError):
+                batch.set_value('version', 'v3')
+            assert [s['key'] for s in batch.changed()] == ['title']
+        # 快照只加载一次，只有值变化的设置通过一次请求保存
+        assert server.requests.count(('GET', '/admin/settings')) == 1
+        assert server.requests.count(('POST', '/admin/settings')) == 1
+        assert (await client.admin.settings.get_setting('title'))['value'] == 'My Alist'
+
+        with pytest.raises(RuntimeError):
+            async with client.admin.settings.batch() as batch:
+                batch.set_value('title', 'Discarded')
+                raise RuntimeError()
+        assert server.requests.count(('POST', '/admin/settings')) == 1
+
+        batch = client.admin.settings.batch()
+        with pytest.raises(RuntimeError):
+            batch.set_value('title', 'Not loaded')
+    asyncio.run(run())
+
+
+def test_async_admin_drivers_accounts_metas():
+    async def run():
+        client = make_client()
+        await client.login('pw')
+        admin = client.admin
+        assert [d.get_name() for d in await admin.drivers.get()] == ['Native']
+        assert (await admin.drivers.get_driver('Native')).get_required() == ['root_folder']
+        assert (await client.driver_Native()).get_name() == 'Native'
+        assert await admin.drivers.validate([{'type': 'Native', 'name': '/b'}]) == \
+               [['Native must set root_folder']]
+        assert len(await admin.drivers.reload()) == 1
+
+        assert (await admin.accounts.get())[0]['name'] == '/native'
+        assert (await admin.accounts[0])['name'] == '/native'
+        assert (await admin.accounts.get_account('/native'))['id'] == 1
+        assert len(await admin.accounts.reload()) == 1
+        assert await admin.account.create_Native('/new', '/tmp') is True
+        with pytest.raises(ValueError):
+            await admin.account.create_Native('/bad', None)
+        with pytest.raises(KeyError):
+            await admin.account.create_Alist('/alist', 'http://other', 'token')
+        account = await admin.accounts.get_account(1)
+        assert await admin.account.save(account) is True
+        assert await admin.account.delete('/native') is True
+        results = await admin.accounts.create_many([
+            {'type': 'Native', 'name': '/c', 'root_folder': '/tmp'},
+            {'type': 'Native', 'name': '/d'},
+        ])
+        assert [r['success'] for r in results] == [True, False]
+
+        assert (await admin.metas.get())[0]['path'] == '/a'
+        assert (await admin.metas[0])['path'] == '/a'
+        assert (await admin.metas.get_meta('/a'))['id'] == 1
+        assert len(await admin.metas.reload()) == 1
+        assert await admin.meta.create('/b', password='123') is True
+        meta = await admin.metas.get_meta(1)
+        assert await admin.meta.save(meta) is True
+        assert await admin.meta.delete('/a') is True
+    asyncio.run(run())
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import asyncio
+from alist import AsyncAlistClient
+
+def test_async_path(base_url, password):
+    async def run():
+        async with AsyncAlistClient(base_url, password=password) as client:
+            return await asyncio.gather(*[client.public.path('/') for _ in range(10)])
+    results = asyncio.run(run())
+    assert len(results) == 10
+    assert all(r != None for r in results)
+
+def test_async_settings(base_url, password):
+    async def run():
+        async with AsyncAlistClient(base_url, password=password) as client:
+            version = await client.public.setting_version()
+            settings = await client.admin.settings.get()
+            return version, settings
+    version, settings = asyncio.run(run())
+    assert version != None
+    assert len(settings) != 0
+
+def test_async_drivers(base_url, password):
+    async def run():
+        async with AsyncAlistClient(base_url, password=password) as client:
+            return await client.admin.drivers.get_driver('Native')
+    assert asyncio.run(run()) != None
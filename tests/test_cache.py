@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import time
+import pytest
+from requests import HTTPError
+from alist import AlistClient, ListingCache
+from alist.admin import AlistAdmin
+from alist.cache import parent_path
+
+def test_cache_lru():
+    cache = ListingCache(maxsize=2)
+    cache.set(('path', '/a'), 1)
+    cache.set(('path', '/b'), 2)
+    assert cache.get(('path', '/a')) == (True, 1)
+    cache.set(('path', '/c'), 3)
+    assert cache.get(('path', '/b')) == (False, None)
+    assert cache.stats()['evictions'] == 1
+
+def test_cache_ttl():
+    cache = ListingCache(ttl=0.01)
+    cache.set(('path', '/a'), 1)
+    time.sleep(0.02)
+    assert cache.get(('path', '/a')) == (False, None)
+
+def test_cache_invalidate():
+    cache = ListingCache()
+    for path in ['/a', '/a/b', '/a/b/c', '/ab']:
+        cache.set(('path', path, 1, 30, None), path)
+    cache.invalidate('/a/b/', recursive=True)
+    assert sorted(cache.paths) == ['/a', '/ab']
+    cache.invalidate('/a')
+    assert sorted(cache.paths) == ['/ab']
+
+def test_cache_invalidate_in_flight():
+    cache = ListingCache()
+    key = ('path', '/a/b', 1, 30, None)
+    generation = cache.begin(key)
+    other = cache.begin(('path', '/c', 1, 30, None))
+    # 请求期间父目录被递归删除，结果不缓存
+    cache.invalidate('/a', recursive=True)
+    assert cache.set(key, 'stale', generation) is False
+    assert cache.set(('path', '/c', 1, 30, None), 'fresh', other) is True
+    cache.end(key)
+    cache.end(('path', '/c', 1, 30, None))
+    assert cache.get(key) == (False, None)
+    assert cache.fetching == {} and cache.generations == {}
+    # 删除之后开始的请求正常缓存
+    generation = cache.begin(key)
+    assert cache.set(key, 'fresh', generation) is True
+    cache.end(key)
+
+def test_client_cache_interleaving():
+    client = AlistClient('http://127.0.0.1:9', cache=True)
+    key = ('path', '/a', 1, 30, None)
+
+    def fetch():
+        # 读请求进行期间，修改操作删除了缓存
+        client.invalidate_cache('/a')
+        return 'stale'
+
+    assert client.cached(key, fetch) == 'stale'
+    assert client.cached(key, lambda: 'fresh') == 'fresh'
+    assert client.cached(key, lambda: 'unused') == 'fresh'
+
+cached_paths = ['/', '/a', '/a/x', '/a/x/sub', '/a/y', '/a/z', '/a/new', '/b', '/b/x', '/b/x/sub', '/c']
+
+@pytest.mark.parametrize('mutation,dropped', [
+    (lambda c, f: c.admin.mkdir('/a/new'), ['/a', '/a/new']),
+    (lambda c, f: c.admin.rename('/a/x', 'z'), ['/a', '/a/x', '/a/x/sub', '/a/z']),
+    (lambda c, f: c.admin.move('/a', '/b', ['x']), ['/a', '/a/x', '/a/x/sub', '/b', '/b/x', '/b/x/sub']),
+    (lambda c, f: c.admin.copy('/a', '/b', ['x']), ['/b', '/b/x', '/b/x/sub']),
+    (lambda c, f: c.admin.files('/a', ['x', 'y']), ['/a', '/a/x', '/a/x/sub', '/a/y']),
+    (lambda c, f: c.admin.refresh('/a'), ['/a', '/a/x', '/a/x/sub', '/a/y', '/a/z', '/a/new']),
+    (lambda c, f: c.public.upload([f], '/a'), ['/a']),
+])
+def test_client_cache_mutations(tmp_path, mutation, dropped):
+    client = AlistClient('http://127.0.0.1:9', cache=True)
+    client.admin = AlistAdmin(client)
+    sent = list()
+
+    def transport(endpoint, **kwargs):
+        sent.append(endpoint)
+        if endpoint == '/public/path':
+            return {'files': [], 'fresh': True}
+        return True
+    client.post = client.delete = transport
+    for path in cached_paths:
+        client.cache.set(('path', path, 1, 30, None), {'files': [], 'fresh': False})
+        client.cache.set(('folder', path), [])
+    filename = str(tmp_path / 'f.txt')
+    with open(filename, 'w') as f:
+        f.write('f')
+
+    mutation(client, filename)
+    # 修改操作删除父目录和子路径的所有缓存，其他路径不受影响
+    remaining = set(cached_paths) - set(dropped)
+    if '/public/path' in sent:
+        # 刷新之后重新列出目录
+        remaining.add('/a')
+        assert client.public.path('/a')['fresh'] is True
+    assert set(client.cache.paths) == remaining
+    assert sent.count('/public/path') <= 1
+
+    # 请求失败时同样删除缓存
+    for path in cached_paths:
+        client.cache.set(('path', path, 1, 30, None), {'files': [], 'fresh': False})
+
+    def fail(endpoint, **kwargs):
+        raise HTTPError('failed')
+    client.post = client.delete = fail
+    with pytest.raises(HTTPError):
+        mutation(client, filename)
+    assert not set(dropped) & set(client.cache.paths)
+
+def test_parent_path():
+    assert parent_path('/a/b/') == '/a'
+    assert parent_path('/a') == '/'
+
+def test_client_cache(base_url, password):
+    client = AlistClient(base_url, password=password, cache=True)
+    assert client.public.path('/') is client.public.path('/')
+    assert client.cache.stats()['hits'] == 1
+    client.admin.refresh('/')
+    assert client.cache.stats()['invalidations'] == 1
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from alist.coalesce import SingleFlight
+
+def test_single_flight_key():
+    flight = SingleFlight()
+    assert flight.key('GET', '/public/settings', {}) is not None
+    assert flight.key('POST', '/public/path', {'json': {'path': '/', 'page_num': 1}}) == \
+           flight.key('POST', '/public/path', {'json': {'page_num': 1, 'path': '/'}})
+    assert flight.key('POST', '/public/path', {'json': {'path': '/a'}}) != \
+           flight.key('POST', '/public/path', {'json': {'path': '/b'}})
+    assert flight.key('POST', '/admin/copy', {'json': {}}) is None
+    assert flight.key('POST', '/public/path', {'files': [object()]}) is None
+
+def test_single_flight_threads():
+    flight = SingleFlight()
+    gate = threading.Event()
+    calls = list()
+
+    def fetch():
+        calls.append(1)
+        gate.wait()
+        return 'result'
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(flight.do, 'key', fetch) for _ in range(8)]
+        time.sleep(0.1)
+        gate.set()
+        assert [f.result() for f in futures] == ['result'] * 8
+    assert len(calls) == 1 and flight.calls == {}
+    # 完成后的调用重新发送
+    assert flight.do('key', lambda: 'new') == 'new'
+
+def test_single_flight_read_your_writes():
+    flight = SingleFlight()
+    gate = threading.Event()
+    state = {'value': 'old'}
+
+    def read():
+        value = state['value']
+        gate.wait()
+        return value
+
+    def write():
+        state['value'] = 'new'
+        return True
+
+    def fetch(method, endpoint, kwargs, func):
+        key = flight.key(method, endpoint, kwargs)
+        if key is None:
+            return flight.write(func)
+        return flight.do(key, func)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # 修改之前发出的读请求还在进行
+        before = executor.submit(fetch, 'POST', '/public/path', {'json': {'path': '/'}}, read)
+        time.sleep(0.1)
+        assert fetch('POST', '/admin/mkdir', {'json': {'path': '/a'}}, write) is True
+        # 修改完成之后发出的相同读请求单独发送，读到新的数据
+        after = executor.submit(fetch, 'POST', '/public/path', {'json': {'path': '/'}}, read)
+        time.sleep(0.1)
+        gate.set()
+        assert before.result() == 'old'
+        assert after.result() == 'new'
+    assert flight.calls == {}
+
+def test_single_flight_error():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do('key', lambda: int('x'))
+    assert flight.calls == {}
+
+def test_single_flight_async():
+    async def main():
+        flight = SingleFlight()
+        calls = list()
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'result'
+
+        tasks = [asyncio.ensure_future(flight.do_async('key', fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        tasks[0].cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert isinstance(results[0], asyncio.CancelledError)
+        assert results[1:] == ['result'] * 4
+        assert len(calls) == 1 and flight.tasks == {}
+    asyncio.run(main())
+
+def test_single_flight_async_read_your_writes():
+    async def main():
+        flight = SingleFlight()
+        state = {'value': 'old'}
+
+        async def read():
+            value = state['value']
+            await asyncio.sleep(0.05)
+            return value
+
+        async def write():
+            await asyncio.sleep(0)
+            state['value'] = 'new'
+
+        key = flight.key('GET', '/public/settings', {})
+        before = asyncio.ensure_future(flight.do_async(key, read))
+        await asyncio.sleep(0)
+        await flight.write_async(write)
+        key = flight.key('GET', '/public/settings', {})
+        assert await asyncio.gather(before, flight.do_async(key, read)) == ['old', 'new']
+    asyncio.run(main())
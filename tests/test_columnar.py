@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import pytest
+from alist.columnar import AlistColumns, parse_time
+
+numpy = pytest.importorskip('numpy')
+
+files = [
+    {'name': 'A.MKV', 'size': 5, 'type': 3, 'updated_at': '2023-01-01T00:00:00Z'},
+    {'name': 'b.txt', 'size': 1, 'type': 5, 'updated_at': ''},
+    {'name': 'c.mp4', 'size': 9, 'type': 3, 'updated_at': '2023-06-11T11:03:03.684818327+08:00'},
+]
+
+def test_parse_time():
+    times = parse_time(['2023-06-11T11:03:03.684818327+08:00', '2023-01-01T00:00:00-05:30', ''])
+    assert str(times[0]) == '2023-06-11T03:03:03'
+    assert str(times[1]) == '2023-01-01T05:30:00'
+    assert numpy.isnat(times[2])
+
+def test_parse_time_invalid():
+    times = parse_time(['garbage-garbage-garbage', '2023-01-01T00:00:00+08:00', '2023-13-45T99:99:99+ab:cd'])
+    assert numpy.isnat(times[0])
+    assert str(times[1]) == '2022-12-31T16:00:00'
+    assert numpy.isnat(times[2])
+
+def test_columns_names_not_padded():
+    cols = AlistColumns.from_files([{'name': 'a'}, {'name': 'b' * 1000}])
+    # 定长的str数组每个元素都会占用4000字节
+    assert cols['name'].itemsize < 1000
+    assert list(cols.sort('name')['name']) == ['a', 'b' * 1000]
+    assert cols.has_ext('a').tolist() == [True, False]
+
+def test_columns():
+    cols = AlistColumns.from_files(files)
+    assert len(cols) == 3
+    assert cols.sum('size') == 15
+    assert cols.group_by_type() == {3: {'count': 2, 'size': 14}, 5: {'count': 1, 'size': 1}}
+    assert list(cols.sort('size', reverse=True)['name']) == ['c.mp4', 'A.MKV', 'b.txt']
+    assert list(cols[cols['size'] > 1]['name']) == ['A.MKV', 'c.mp4']
+
+    videos = cols.filter(cols.has_ext('.mkv', '.mp4')).to_dicts()
+    assert [f['name'] for f in videos] == ['A.MKV', 'c.mp4']
+    assert videos[1]['updated_at'] == '2023-06-11T03:03:03Z'
+    assert cols[1:].to_dicts()[0]['updated_at'] is None
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import json
+import pytest
+from requests import HTTPError
+from alist import AlistClient
+
+def encode(code, data, message='success'):
+    return json.dumps({'code': code, 'message': message, 'data': data}).encode('utf-8')
+
+def test_decode_json():
+    content = b'  ' + encode(200, {'files': [{'name': '文件'}]}) + b'\n'
+    r = AlistClient.decode_content(content, 'application/json; charset=utf-8', 'utf-8')
+    assert r == {'files': [{'name': '文件'}]}
+
+def test_decode_null_data():
+    assert AlistClient.decode_content(encode(200, None), 'application/json', None) == True
+
+def test_decode_error():
+    with pytest.raises(HTTPError):
+        AlistClient.decode_content(encode(500, None, 'failed'), 'application/json', 'utf-8')
+
+def test_decode_text():
+    assert AlistClient.decode_content(b' hello \n', 'text/plain', 'utf-8') == 'hello'
+    assert AlistClient.decode_content(b'  ', 'application/json', 'utf-8') == ''
+
+def test_decode_http_error():
+    with pytest.raises(HTTPError):
+        AlistClient.decode_content(b'<html>502 Bad Gateway</html>', 'text/html', 'utf-8', status_code=502)
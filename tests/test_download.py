@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import os
+import re
+import threading
+import pytest
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from types import SimpleNamespace
+from alist import download
+from alist.download import AlistDownloader, state_suffix
+from alist.retry import RetryPolicy
+from alist.limit import AlistLimiter
+from alist.schedule import priority, current_priority
+
+content = bytes(range(256)) * 1024
+
+@pytest.mark.parametrize('size,count', [(1, 1), (10 * 1024 * 1024, 2), (100 * 1024 * 1024 + 1, 4)])
+def test_plan(size, count):
+    downloader = AlistDownloader(None, segments=4)
+    segments = downloader.plan(size)
+    assert len(segments) == count
+    assert segments[0][0] == 0
+    assert segments[-1][1] == size - 1
+    for prev, cur in zip(segments, segments[1:]):
+        assert cur[0] == prev[1] + 1
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """
+    支持Range请求的文件服务器。获取文件大小的请求之外，前failures个请求返回503，
+    truncate不为0时，第一个分段只发送truncate个字节就断开连接。
+    """
+    def do_GET(self):
+        server = self.server
+        server.ranges.append(self.headers.get('Range'))
+        probe = self.headers.get('Range') == 'bytes=0-0'
+        if server.failures > 0 and not probe:
+            server.failures -= 1
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        m = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if m is None:
+            self.send_response(200)
+            start, end = 0, len(content) - 1
+        else:
+            start = int(m.group(1))
+            end = int(m.group(2)) if m.group(2) else len(content) - 1
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(content)}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        if server.truncate and start == 0 and not probe:
+            end = server.truncate - 1
+            server.truncate = 0
+            self.close_connection = True
+        self.wfile.write(content[start:end + 1])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    server.ranges = list()
+    server.failures = 0
+    server.truncate = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_downloader(limiter = None, **kwargs):
+    alist = SimpleNamespace(new_session=requests.Session, ssl_verify=True, cert=None, retry=None, limiter=limiter)
+    return AlistDownloader(alist, segments=2, min_segment_size=1024, chunk_size=16 * 1024, **kwargs)
+
+
+def test_download_resume(server, tmp_path):
+    url = f'http://127.0.0.1:{server.server_address[1]}/file'
+    local = str(tmp_path / 'file')
+
+    # 第一个分段下载了一部分之后连接断开，进度保存在状态文件中
+    server.truncate = 64 * 1024
+    with pytest.raises(Exception):
+        make_downloader(retries=0).download('/file', local, url=url)
+    state = make_downloader().load_state(local + state_suffix, '/file', len(content))
+    first, second = state['segments']
+    assert 0 < first[2] < first[1] - first[0] + 1
+    assert second[2] == second[1] - second[0] + 1
+
+    # 再次下载时只请求第一个分段剩下的部分
+    server.ranges.clear()
+    assert make_downloader().download('/file', local, url=url) == local
+    assert server.ranges == ['bytes=0-0', f'bytes={first[0] + first[2]}-{first[1]}']
+    with open(local, 'rb') as f:
+        assert f.read() == content
+    assert not os.path.exists(local + state_suffix)
+
+
+def test_download_backoff(server, tmp_path, monkeypatch):
+    url = f'http://127.0.0.1:{server.server_address[1]}/file'
+    local = str(tmp_path / 'file')
+    sleeps = list()
+    monkeypatch.setattr(download.time, 'sleep', sleeps.append)
+
+    downloader = make_downloader(retry=RetryPolicy(backoff=0.25, jitter=False))
+    downloader.segments = 1
+    server.failures = 2
+    downloader.download('/file', local, url=url)
+    # 分段的两次503按照RetryPolicy等待，Retry-After优先
+    assert sleeps == [0, 0]
+    with open(local, 'rb') as f:
+        assert f.read() == content
+
+    sleeps.clear()
+    server.failures = 0
+    segment = [0, 1023, 0]
+    calls = iter([ConnectionResetError(), ConnectionResetError()])
+
+    def flaky(*args, **kwargs):
+        error = next(calls, None)
+        if error is not None:
+            raise error
+        return original(*args, **kwargs)
+    original = downloader._get
+    downloader._get = flaky
+    with open(local, 'r+b') as f:
+        downloader._download_segment(f, url, {}, segment, lambda n: None)
+    assert segment[2] == 1024
+    assert sleeps == [0.25, 0.5]
+
+
+class RecordingLimiter(AlistLimiter):
+    """记录每次请求的优先级和结果。"""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.acquired = list()
+        self.released = list()
+
+    def acquire(self, priority = None):
+        self.acquired.append(current_priority())
+        return super().acquire(priority)
+
+    def release(self, started, endpoint = None, status = None, timeout = False):
+        self.released.append(status)
+        super().release(started, endpoint, status, timeout)
+
+
+def test_download_limiter_sessions(server, tmp_path):
+    url = f'http://127.0.0.1:{server.server_address[1]}/file'
+    local = str(tmp_path / 'file')
+    limiter = RecordingLimiter()
+    downloader = make_downloader(limiter=limiter)
+    sessions = list()
+    new_session = downloader.alist.new_session
+
+    def record():
+        session = new_session()
+        sessions.append((threading.get_ident(), session))
+        return session
+    downloader.alist.new_session = record
+
+    server.failures = 1
+    downloader.download('/file', local, url=url)
+    with open(local, 'rb') as f:
+        assert f.read() == content
+    # 获取大小、两个分段和一次503的重试都经过限流器，默认是后台请求
+    assert limiter.acquired == ['background'] * 4
+    assert sorted(limiter.released) == [206, 206, 206, 503]
+    assert limiter.in_flight == 0
+    # 每个线程使用自己的会话
+    assert len(sessions) == len({ident for ident, _ in sessions}) >= 2
+
+    limiter.acquired.clear()
+    with priority('interactive'):
+        make_downloader(limiter=limiter).download('/file', local, url=url)
+    assert limiter.acquired == ['interactive'] * 3
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import pytest
+from types import SimpleNamespace
+from alist.driver import AlistAdminDrivers
+
+results = {
+    'Native': [
+        {'name': 'root_folder', 'label': '', 'type': 'string', 'default': '',
+         'values': '', 'required': True, 'description': ''},
+    ],
+}
+
+def test_driver_cache(tmp_path):
+    alist = SimpleNamespace(base_url='http://alist', driver_cache_dir=str(tmp_path))
+    drivers = AlistAdminDrivers(alist, '/admin')
+    assert drivers.load_cache('v2.6.4') is None
+
+    drivers.save_cache('v2.6.4', results)
+    assert drivers.load_cache('v2.6.4') == results
+    assert drivers.load_cache('v2.6.5') is None
+
+    other = SimpleNamespace(base_url='http://other', driver_cache_dir=str(tmp_path))
+    assert AlistAdminDrivers(other, '/admin').load_cache('v2.6.4') is None
+
+def test_driver_index():
+    alist = SimpleNamespace(base_url='http://alist', driver_cache_dir=None)
+    drivers = AlistAdminDrivers(alist, '/admin')
+    drivers.set_drivers(results)
+    assert drivers.get_driver('Native').get_required() == ['root_folder']
+    assert alist.driver_Native() is drivers.get_driver('Native')
+
+def test_driver_validate():
+    alist = SimpleNamespace(base_url='http://alist', driver_cache_dir=None)
+    drivers = AlistAdminDrivers(alist, '/admin')
+    drivers.set_drivers({
+        'Native': results['Native'] + [
+            {'name': 'order_by', 'label': '', 'type': 'select', 'default': '',
+             'values': 'name,size', 'required': False, 'description': ''},
+            {'name': 'limit', 'label': '', 'type': 'number', 'default': '',
+             'values': '', 'required': False, 'description': ''},
+        ],
+    })
+    errors = drivers.validate([
+        {'type': 'Native', 'name': '/a', 'root_folder': '/tmp', 'order_by': 'name', 'limit': 10},
+        {'type': 'Native', 'name': '/b'},
+        {'type': 'Native', 'name': '/c', 'root_folder': '/tmp', 'order_by': 'date', 'limit': True},
+        {'type': 'Unknown', 'name': '/d'},
+    ])
+    assert errors[0] == []
+    assert errors[1] == ['Native must set root_folder']
+    assert len(errors[2]) == 2
+    assert errors[3] == ['Unknown not support']
+
+    validator = drivers.get_driver('Native').get_validator()
+    assert validator is drivers.get_driver('Native').get_validator()
+    with pytest.raises(ValueError):
+        validator.validate({'name': '/b'})
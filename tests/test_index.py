@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+from alist.index import AlistSearchIndex, literals
+
+def entry(name, type = 0, size = 0, updated_at = '2023-01-01T00:00:00Z'):
+    return {'name': name, 'type': type, 'size': size, 'updated_at': updated_at}
+
+def make_index():
+    index = AlistSearchIndex(None)
+    index.apply('/', [entry('movies', 1), entry('readme.txt')])
+    index.apply('/movies', [entry('Alien.1979.mkv'), entry('aliens.mp4'), entry('heat.mkv')])
+    return index
+
+def test_literals():
+    assert literals('*.mkv') == ['.mkv']
+    assert literals('a?b[cd]e*') == ['a', 'b', 'e']
+
+def test_index_query():
+    index = make_index()
+    assert len(index) == 5
+    assert [p for p, _ in index.search('alien')] == ['/movies/Alien.1979.mkv', '/movies/aliens.mp4']
+    assert [p for p, _ in index.prefix('he')] == ['/movies/heat.mkv']
+    assert [p for p, _ in index.glob('*.mkv')] == ['/movies/Alien.1979.mkv', '/movies/heat.mkv']
+    assert [p for p, _ in index.glob('/movies/a*')] == ['/movies/aliens.mp4']
+    assert index.search('nothing') == []
+    assert index.get('/movies/heat.mkv')['name'] == 'heat.mkv'
+
+def test_index_update():
+    index = make_index()
+    index.apply('/movies', [entry('heat.mkv', size=10), entry('ronin.mkv')])
+    assert '/movies/aliens.mp4' not in index
+    assert index.get('/movies/heat.mkv')['size'] == 10
+    assert [p for p, _ in index.search('mkv')] == ['/movies/heat.mkv', '/movies/ronin.mkv']
+
+    assert not index.is_changed('/movies', entry('movies', 1))
+    assert index.is_changed('/movies', entry('movies', 1, updated_at='2024-01-01T00:00:00Z'))
+
+    index.apply('/', [entry('readme.txt')])
+    assert len(index) == 1
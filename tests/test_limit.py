@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import asyncio
+import threading
+import time
+import pytest
+from alist.limit import TokenBucket, AlistLimiter
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # 令牌用完后预约之后的令牌
+    assert 0.09 < bucket.reserve() <= 0.1
+    assert 0.19 < bucket.reserve() <= 0.2
+
+def test_limiter_increase():
+    limiter = AlistLimiter(limit=2, max_limit=3)
+    for _ in range(20):
+        a, b = limiter.acquire(), limiter.acquire()
+        limiter.release(a, '/public/path', 200)
+        limiter.release(b, '/public/path', 200)
+    assert limiter.limit == 3
+    # 没有占满并发数时不增加
+    limiter = AlistLimiter(limit=2)
+    for _ in range(20):
+        limiter.release(limiter.acquire(), '/public/path', 200)
+    assert limiter.limit == 2
+
+def test_limiter_decrease():
+    limiter = AlistLimiter(limit=16)
+    started = [limiter.acquire() for _ in range(4)]
+    # 同一轮的多个错误只减少一次
+    for s in started:
+        limiter.release(s, '/public/path', 503)
+    assert limiter.limit == 8
+    limiter.release(limiter.acquire(), '/public/path', timeout=True)
+    assert limiter.limit == 4
+    limiter.release(limiter.acquire(), '/public/path', 429)
+    limiter.release(limiter.acquire(), '/public/path', 429)
+    limiter.release(limiter.acquire(), '/public/path', 429)
+    assert limiter.limit == 1
+    assert limiter.stats() == {'limit': 1, 'in_flight': 0, 'queued': 0,
+                               'queues': {'interactive': 0, 'background': 0}}
+
+def test_limiter_latency_spike():
+    limiter = AlistLimiter(limit=8, min_latency=0.01)
+    now = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(now - 0.02, '/public/path', 200)
+    # 其他端点的延迟不影响
+    limiter.acquire()
+    limiter.release(now - 1, '/public/upload', 200)
+    assert limiter.limit == 8
+    limiter.acquire()
+    limiter.release(time.monotonic() - 0.5, '/public/path', 200)
+    assert limiter.limit == 4
+
+def test_limiter_queue():
+    limiter = AlistLimiter(limit=1, max_limit=1)
+    first = limiter.acquire()
+    order = list()
+
+    def worker(i):
+        limiter.release(limiter.acquire(), '/public/path', 200)
+        order.append(i)
+
+    threads = list()
+    for i in range(3):
+        threads.append(threading.Thread(target=worker, args=(i,)))
+        threads[-1].start()
+        while limiter.queued < i + 1:
+            time.sleep(0.001)
+    assert limiter.stats()['queued'] == 3
+    limiter.release(first, '/public/path', 200)
+    for t in threads:
+        t.join()
+    assert order == [0, 1, 2]
+    assert limiter.in_flight == 0
+
+def test_limiter_async_cancel():
+    async def main():
+        limiter = AlistLimiter(limit=1, max_limit=1)
+        first = await limiter.acquire_async()
+        task = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        task.cancel()
+        await asyncio.sleep(0)
+        assert limiter.queued == 0
+        limiter.release(first, '/public/path', 200)
+        await limiter.acquire_async()
+        assert limiter.in_flight == 1
+    asyncio.run(main())
+
+def test_limiter_interrupted(monkeypatch):
+    limiter = AlistLimiter(limit=1, max_limit=1)
+    first = limiter.acquire()
+
+    class Interrupted(threading.Event):
+        grant = False
+
+        def wait(self, timeout = None):
+            if self.grant:
+                # 在中断之前刚好得到了并发数
+                limiter.release(first, '/public/path', 200)
+            raise KeyboardInterrupt()
+    monkeypatch.setattr(threading, 'Event', Interrupted)
+
+    # 还在排队时被中断，离开队列
+    with pytest.raises(KeyboardInterrupt):
+        limiter.acquire()
+    assert limiter.queued == 0 and limiter.in_flight == 1
+
+    # 已经得到并发数时被中断，归还并发数
+    Interrupted.grant = True
+    with pytest.raises(KeyboardInterrupt):
+        limiter.acquire()
+    assert limiter.queued == 0 and limiter.in_flight == 0
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import os
+import pytest
+from email.parser import BytesParser
+from alist.multipart import MultipartEncoder
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_multipart_encoder(tmp_path, use_mmap):
+    contents = {'a.txt': b'', 'b.bin': os.urandom(100000)}
+    for name, data in contents.items():
+        (tmp_path / name).write_bytes(data)
+
+    progress = list()
+    encoder = MultipartEncoder({'path': '/upload', 'password': None},
+                               [('files', str(tmp_path / name)) for name in contents],
+                               chunk_size=4096,
+                               use_mmap=use_mmap,
+                               callback=lambda *args: progress.append(args))
+    body = b''.join(iter(lambda: encoder.read(1000), b''))
+    assert len(body) == len(encoder)
+    assert progress[-1][3:] == (100000, 100000)
+
+    header = f'Content-Type: {encoder.content_type}\r\n\r\n'.encode()
+    message = BytesParser().parsebytes(header + body)
+    parts = message.get_payload()
+    assert parts[0].get_payload() == '/upload'
+    assert [p.get_filename() for p in parts[1:]] == list(contents)
+    assert parts[2].get_payload(decode=True) == contents['b.bin']
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+from alist.paging import PageSizeTuner
+
+files = [{'name': f'file{i}', 'size': i} for i in range(100)]
+
+def test_tuner_grow():
+    tuner = PageSizeTuner(100, target_latency=1.0)
+    tuner.update(0.1, files)
+    assert tuner.next_page_size(200) == 200
+    # 300不能被400整除，保持不变
+    tuner.update(0.1, files)
+    assert tuner.next_page_size(300) == 200
+
+def test_tuner_shrink():
+    tuner = PageSizeTuner(100, min_page_size=50, target_latency=1.0)
+    tuner.update(2.0, files)
+    assert tuner.next_page_size(100) == 50
+    tuner.update(2.0, files)
+    assert tuner.next_page_size(150) == 50
+
+def test_tuner_max_bytes():
+    tuner = PageSizeTuner(100, target_latency=1.0, max_page_bytes=1024)
+    tuner.update(0.1, files)
+    assert tuner.next_page_size(100) == 50
+
+def test_iter_files(client):
+    files = list(client.public.iter_files('/', page_size=10))
+    assert len(files) == len(client.public.path('/', page_size=100000)['files'])
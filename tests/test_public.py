@@ -3,10 +3,27 @@
 # @Author: Kai Peng
 
 import pytest
+from concurrent.futures import ThreadPoolExecutor
+from alist import AlistClient
 
 def test_path(client):
     assert client.public.path('/') != None
 
+def test_thread_safe_shared_pool():
+    client = AlistClient('http://127.0.0.1:9', thread_safe=True, pool_maxsize=4)
+    with ThreadPoolExecutor(1) as executor:
+        other = executor.submit(lambda: client.session).result()
+    # 每个线程的会话不同，但是共享同一个连接池
+    assert other is not client.session
+    for session in [other, client.session]:
+        assert session.get_adapter('http://127.0.0.1:9') is client.adapter
+        assert session.get_adapter('https://127.0.0.1:9') is client.adapter
+
+def test_path_thread_safe(client_thread_safe):
+    with ThreadPoolExecutor(64) as executor:
+        results = list(executor.map(lambda _: client_thread_safe.public.path('/'), range(256)))
+    assert all(r != None for r in results)
+
 @pytest.mark.parametrize('path', [('')])
 def test_preview(client, path):
     pytest.skip()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import json
+import pickle
+import pytest
+from alist.record import FileRecord
+from alist.account import AlistAccount, AccountRecord
+from alist.driver import AlistDriverAttribute
+
+def test_record_read():
+    record = FileRecord.from_dict({'name': 'a.txt', 'size': 10, 'type': 5, 'unknown': 1})
+    assert record['name'] == 'a.txt'
+    assert record.get('driver') is None
+    assert record.get('unknown', 0) == 0
+    assert 'size' in record and 'unknown' not in record
+    assert len(record) == len(FileRecord.fields)
+    assert record == dict(record)
+    with pytest.raises(KeyError):
+        record['unknown']
+    with pytest.raises(TypeError):
+        record['name'] = 'b.txt'
+    assert not hasattr(record, '__dict__')
+
+def test_record_replace():
+    record = FileRecord(name='a.txt', size=10)
+    new = record.replace(size=20)
+    assert record['size'] == 10 and new['size'] == 20
+    with pytest.raises(KeyError):
+        record.replace(unknown=1)
+    assert pickle.loads(pickle.dumps(new)) == new
+
+def test_record_account():
+    account = AlistAccount(name='/native', type='Native', root_folder='/tmp', id=1)
+    record = AccountRecord.from_dict(account)
+    assert record == account
+    assert AlistAccount(**record) == account
+
+def test_driver_attribute():
+    attr = AlistDriverAttribute(name='root_folder', label='', type='string', default='',
+                                values='', required=True, description='')
+    assert attr.get_name() == 'root_folder'
+    assert attr.is_required()
+    assert attr['values'] == ''
+    # 驱动属性是公开的数据，保持dict
+    assert isinstance(attr, dict)
+    assert json.loads(json.dumps(attr))['name'] == 'root_folder'
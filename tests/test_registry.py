@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import pytest
+from alist.registry import AlistRegistry
+
+class Loader(object):
+    def __init__(self, items):
+        self.items = items
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return [dict(i) for i in self.items]
+
+def test_registry_get():
+    loader = Loader([{'id': 1, 'name': '/a'}, {'id': 2, 'name': '/b'}])
+    registry = AlistRegistry(loader, ('id', 'name'))
+    assert registry.get(1)['name'] == '/a'
+    assert registry.get('/b')['id'] == 2
+    assert loader.calls == 1
+    with pytest.raises(KeyError):
+        registry.get('/c')
+
+def test_registry_ttl():
+    loader = Loader([{'key': 'title', 'value': 'a'}])
+    registry = AlistRegistry(loader, ('key',), ttl=0)
+    registry.get('title')
+    registry.get('title')
+    assert loader.calls == 2
+
+    registry = AlistRegistry(loader, ('key',), ttl=None)
+    registry.get('title')
+    registry.invalidate()
+    registry.get('title')
+    assert loader.calls == 4
+
+def test_registry_put_remove():
+    loader = Loader([{'id': 1, 'name': '/a'}])
+    registry = AlistRegistry(loader, ('id', 'name'))
+    registry.all()
+    registry.put({'id': 1, 'name': '/renamed'})
+    assert registry.find('/a') is None
+    assert registry.get('/renamed')['id'] == 1
+    registry.put({'id': 2, 'name': '/b'})
+    registry.remove({'id': 1})
+    assert [i['id'] for i in registry.all()] == [2]
+    assert loader.calls == 1
+
+def test_settings_store(client):
+    version = client.admin.setting_version()
+    assert client.admin.settings.store.get('version')['value'] == version
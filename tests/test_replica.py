@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import json
+import pytest
+import requests
+from types import SimpleNamespace
+from alist import AlistClient
+from alist.replica import AlistReplicaSet
+from alist.schedule import priority
+
+def make_replicas(**kwargs):
+    return AlistReplicaSet(None, ['http://a', 'http://b/', 'http://c'], interval=0, **kwargs)
+
+def test_replica_routing():
+    replicas = make_replicas(primary=1)
+    a, b, c = replicas.replicas
+    assert replicas.primary is b and b.url == 'http://b'
+    a.latency, b.latency, c.latency = 0.12, 0.2, 0.05
+    assert replicas.choose('POST', '/public/path') is c
+    # c正在处理请求，负载加权后a的代价更低
+    assert replicas.choose('POST', '/public/path') is c
+    assert replicas.choose('POST', '/public/path') is a
+    # 修改操作总是发送到主副本
+    assert replicas.choose('POST', '/admin/copy') is b
+    assert (a.in_flight, b.in_flight, c.in_flight) == (1, 1, 2)
+
+def test_replica_eject():
+    replicas = make_replicas(max_failures=2)
+    a, b, c = replicas.replicas
+    replicas.release(replicas.choose('GET', '/public/settings'), ok=False, connected=False)
+    assert not a.healthy and replicas.healthy() == [b, c]
+    replicas.release(replicas.choose('GET', '/public/settings'), ok=False)
+    assert b.healthy
+    replicas.release(replicas.choose('GET', '/public/settings'), ok=False)
+    assert replicas.healthy() == [c]
+    # 成功的请求或者健康检查使副本重新加入
+    replicas.release(replicas.choose('POST', '/admin/copy'), 0.1, ok=True)
+    assert replicas.healthy() == [a, c]
+    # 结果未知时只释放请求数
+    replica = replicas.choose('GET', '/public/settings')
+    replicas.release(replica)
+    assert replica.failures == 0 and replica.in_flight == 0
+
+def test_replica_all_ejected():
+    replicas = make_replicas(primary=2)
+    for replica in replicas.replicas:
+        replica.healthy = False
+    assert replicas.choose('GET', '/public/settings') is replicas.primary
+
+def test_replica_empty():
+    with pytest.raises(ValueError):
+        AlistReplicaSet(None, [])
+
+
+class FakeSession(object):
+    """按副本地址返回公开设置或者触发异常。"""
+    def __init__(self, responses):
+        self.responses = responses
+        self.urls = list()
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        response = self.responses[url.split('/api/')[0]]
+        if isinstance(response, Exception):
+            raise response
+        return SimpleNamespace(content=response)
+
+def test_replica_check():
+    client = AlistClient(['http://a', 'http://b', 'http://c'], health_interval=0)
+    replicas = client.replicas
+    a, b, c = replicas.replicas
+    session = FakeSession({
+        'http://a': json.dumps({'code': 200, 'data': [{'key': 'version', 'value': 'v2.6.4'}]}).encode(),
+        'http://b': requests.ConnectionError(),
+        'http://c': b'<html>bad gateway</html>',
+    })
+    replicas.session = lambda: session
+    assert replicas.check(a) is True
+    assert a.healthy and a.version == 'v2.6.4' and a.latency is not None and a.checked_at
+    assert session.urls == ['http://a/api/public/settings']
+    # 连接失败或者响应无法解析时立即摘除
+    assert replicas.check(b) is False and not b.healthy
+    assert replicas.check(c) is False and not c.healthy and c.version is None
+    replicas.check_all()
+    assert replicas.healthy() == [a]
+
+    # 副本恢复后重新加入
+    session.responses['http://b'] = session.responses['http://a']
+    assert replicas.check(b) is True and replicas.healthy() == [a, b]
+
+def test_client_close():
+    with AlistClient(['http://a', 'http://b'], health_interval=60) as client:
+        replicas = client.replicas
+        replicas.start()
+        thread = replicas._thread
+        assert thread.is_alive()
+    assert not thread.is_alive() and replicas._thread is None
+    # 关闭之后选择副本不会重新启动健康检查
+    replicas.release(replicas.choose('GET', '/public/settings'))
+    assert replicas._thread is None
+
+def test_replica_limiter_error():
+    client = AlistClient(['http://a', 'http://b'], health_interval=0, limiter=True)
+    # 在限流器中排队失败时，副本的请求数不变
+    with priority('unknown'):
+        with pytest.raises(KeyError):
+            client.request('GET', '/public/settings')
+    assert [r.in_flight for r in client.replicas.replicas] == [0, 0]
+    assert client.limiter.in_flight == 0
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+from email.utils import formatdate
+import json
+import threading
+import time
+import pytest
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import alist
+from alist import AlistClient
+from alist.retry import RetryPolicy, parse_retry_after
+
+def test_retry_idempotent():
+    policy = RetryPolicy(retries=2)
+    assert policy.retry_status('GET', '/public/settings', 503, 0)
+    assert policy.retry_status('POST', '/public/path', 502, 1)
+    assert not policy.retry_status('POST', '/public/path', 502, 2)
+    assert not policy.retry_status('POST', '/public/path', 404, 0)
+    assert not policy.retry_status('POST', '/admin/copy', 502, 0)
+    assert not policy.retry_status('POST', '/admin/account/create', 503, 0)
+
+def test_retry_error():
+    policy = RetryPolicy(retries=1)
+    # 连接没有建立时修改操作也可以重试
+    assert policy.retry_error('POST', '/admin/copy', False, 0)
+    assert not policy.retry_error('POST', '/admin/copy', True, 0)
+    assert policy.retry_error('POST', '/public/path', True, 0)
+    assert not policy.retry_error('POST', '/public/path', True, 1)
+
+def test_retry_delay():
+    policy = RetryPolicy(backoff=1, max_backoff=5, jitter=False)
+    assert [policy.delay(i) for i in range(5)] == [1, 2, 4, 5, 5]
+    assert policy.delay(0, '3') == 3
+    assert policy.delay(0, '120') == 5
+    policy = RetryPolicy(backoff=1, max_backoff=5)
+    assert all(0 <= policy.delay(3) <= 5 for _ in range(100))
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('10') == 10
+    assert parse_retry_after('-1') == 0
+    assert parse_retry_after('soon') is None
+    assert 8 < parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+    assert parse_retry_after(formatdate(time.time() - 10, usegmt=True)) == 0
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """
+    按路径依次执行server.actions中的动作：``502`` 、``503`` （带Retry-After）返回错误，
+    ``drop`` 读完请求之后不响应直接断开连接，动作用完之后返回成功。
+    """
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        path = self.path[len('/api'):]
+        server.requests.append(path)
+        actions = server.actions.get(path) or []
+        action = actions.pop(0) if actions else 'ok'
+        if action == 'drop':
+            self.close_connection = True
+            return
+        if action in ('502', '503'):
+            # 网关返回的错误页面
+            body = b'<html>Bad Gateway</html>'
+            self.send_response(int(action))
+            self.send_header('Content-Type', 'text/html')
+            if action == '503':
+                self.send_header('Retry-After', '7')
+        else:
+            body = json.dumps({'code': 200, 'message': 'success', 'data': {'path': path}}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    server.requests = list()
+    server.actions = dict()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = list()
+    monkeypatch.setattr(alist.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def make_client(server):
+    return AlistClient(f'http://127.0.0.1:{server.server_address[1]}', coalesce=False,
+                       retry=RetryPolicy(retries=3, backoff=0.25, jitter=False))
+
+def test_client_retry_idempotent(server, sleeps):
+    client = make_client(server)
+    server.actions['/public/path'] = ['502', '503', 'drop']
+    assert client.post('/public/path', json={'path': '/'}) == {'path': '/public/path'}
+    # 502按退避等待，503按Retry-After等待，连接断开后也重试
+    assert server.requests == ['/public/path'] * 4
+    assert sleeps == [0.25, 7, 1.0]
+
+    server.requests.clear()
+    server.actions['/public/path'] = ['502'] * 4
+    with pytest.raises(requests.HTTPError):
+        client.post('/public/path', json={'path': '/'})
+    assert server.requests == ['/public/path'] * 4
+
+@pytest.mark.parametrize('action,error', [('502', requests.HTTPError), ('drop', requests.ConnectionError)])
+def test_client_retry_writes(server, sleeps, tmp_path, action, error):
+    client = make_client(server)
+    filename = str(tmp_path / 'a.txt')
+    with open(filename, 'w') as f:
+        f.write('a')
+    # 请求已经到达服务器的修改操作不会重发
+    for endpoint, call in [('/admin/copy', lambda: client.post('/admin/copy', json={'names': ['a']})),
+                           ('/admin/move', lambda: client.post('/admin/move', json={'names': ['a']})),
+                           ('/public/upload', lambda: client.public.upload([filename], '/'))]:
+        server.requests.clear()
+        server.actions[endpoint] = [action]
+        with pytest.raises(error):
+            call()
+        assert server.requests == [endpoint]
+    assert sleeps == []
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from alist.schedule import FairQueue, priority, current_priority, inherit
+from alist.limit import AlistLimiter
+from alist import AlistClient
+from alist.admin import AlistAdmin
+
+def test_fair_queue_weights():
+    queue = FairQueue({'interactive': 3, 'background': 1})
+    for i in range(8):
+        queue.append(('b', i), 'background')
+    for i in range(6):
+        queue.append(('i', i), 'interactive')
+    assert queue.lengths() == {'interactive': 6, 'background': 8}
+    order = [queue.pop()[0] for _ in range(8)]
+    # 同时积压时按3:1出队
+    assert order.count('i') == 6 and order.count('b') == 2
+    assert [queue.pop() for _ in range(6)] == [('b', i) for i in range(2, 8)]
+    assert queue.pop() is None
+
+def test_fair_queue_allowed():
+    queue = FairQueue()
+    queue.append('b', 'background')
+    queue.append('i', 'interactive')
+    assert queue.pop(lambda name: name == 'background') == 'b'
+    assert queue.pop(lambda name: name == 'background') is None
+    assert queue.remove('i') and not queue.remove('i')
+    assert len(queue) == 0
+    with pytest.raises(KeyError):
+        queue.append('x', 'unknown')
+
+def test_priority_context():
+    assert current_priority() == 'interactive'
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(inherit(current_priority)).result() == 'background'
+        with priority('interactive'):
+            assert executor.submit(inherit(current_priority)).result() == 'interactive'
+        assert executor.submit(current_priority).result() == 'interactive'
+    with priority('background'):
+        assert current_priority() == 'background'
+    assert current_priority() == 'interactive'
+
+def test_limiter_priority():
+    limiter = AlistLimiter(limit=3, max_limit=3, reserve=1)
+    started = [limiter.acquire('background'), limiter.acquire('background')]
+    # 后台请求不能占用保留的并发数
+    woken = list()
+    limiter._enter(lambda: woken.append('b'), 'background')
+    assert limiter.stats()['queues'] == {'interactive': 0, 'background': 1}
+    started.append(limiter.acquire('interactive'))
+    limiter._enter(lambda: woken.append('i'), 'interactive')
+    assert limiter.queued == 2
+    limiter.release(started.pop(), '/public/path', 200)
+    assert woken == ['i']
+    limiter.release(started.pop(), '/public/path', 200)
+    limiter.release(started.pop(), '/public/path', 200)
+    assert woken == ['i', 'b']
+    assert limiter.in_flight == 2
+
+def test_refresh_priority():
+    client = AlistClient('http://127.0.0.1:9')
+    client.admin = AlistAdmin(client)
+    seen = list()
+    client.post = lambda endpoint, **kwargs: seen.append((endpoint, current_priority()))
+    client.public.path = lambda path: seen.append(('path', current_priority()))
+    # 刷新默认是后台请求，调用者设置的优先级优先
+    assert client.admin.refresh('/a') is True
+    with priority('interactive'):
+        client.admin.refresh('/a')
+    assert seen == [('/admin/refresh', 'background'), ('path', 'background'),
+                    ('/admin/refresh', 'interactive'), ('path', 'interactive')]
+    assert current_priority() == 'interactive'
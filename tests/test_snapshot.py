@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+from alist.snapshot import AlistSnapshot
+
+def entry(name, type = 0, size = 0, updated_at = '2023-01-01T00:00:00Z'):
+    return {'name': name, 'type': type, 'size': size, 'updated_at': updated_at}
+
+def test_snapshot_diff(tmp_path):
+    with AlistSnapshot(None, str(tmp_path / 'snapshot.db')) as snapshot:
+        first = snapshot.db.execute("INSERT INTO snapshots VALUES (1, '/', 0, 0)").lastrowid
+        snapshot.apply(first, '/', [entry('movies', 1), entry('readme.txt')])
+        snapshot.apply(first, '/movies', [entry('a.mkv', size=1), entry('b.mkv', size=2)])
+        assert snapshot.is_changed('/movies', entry('movies', 1)) == False
+        assert snapshot.is_changed('/movies', entry('movies', 1, updated_at='2024')) == True
+
+        second = snapshot.db.execute("INSERT INTO snapshots VALUES (2, '/', 0, 0)").lastrowid
+        snapshot.apply(second, '/movies', [entry('a.mkv', size=10), entry('c.mkv')])
+        snapshot.apply(second, '/', [entry('movies', 1)])
+
+        assert [e['path'] for e in snapshot.entries(first)] == \
+            ['/movies', '/movies/a.mkv', '/movies/b.mkv', '/readme.txt']
+        assert [e['path'] for e in snapshot.entries(second)] == \
+            ['/movies', '/movies/a.mkv', '/movies/c.mkv']
+
+        changes = snapshot.diff(first, second)
+        assert [e['path'] for e in changes['added']] == ['/movies/c.mkv']
+        assert [e['path'] for e in changes['removed']] == ['/movies/b.mkv', '/readme.txt']
+        assert [(o['size'], n['size']) for o, n in changes['modified']] == [(1, 10)]
+
+def test_snapshot_remove_dir(tmp_path):
+    with AlistSnapshot(None, str(tmp_path / 'snapshot.db')) as snapshot:
+        snapshot.apply(1, '/', [entry('movies', 1)])
+        snapshot.apply(1, '/movies', [entry('a.mkv')])
+        snapshot.apply(2, '/', [])
+        assert list(snapshot.entries(2)) == []
+        assert snapshot.is_changed('/movies', entry('movies', 1)) == True
+        assert [e['path'] for e in snapshot.diff(1, 2)['removed']] == ['/movies', '/movies/a.mkv']
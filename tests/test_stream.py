@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import json
+import pytest
+from requests import HTTPError
+from alist.stream import iter_response_items
+
+def chunked(content, size):
+    return (content[i:i + size] for i in range(0, len(content), size))
+
+@pytest.mark.parametrize('size', [1, 3, 7, 4096])
+def test_iter_response_items(size):
+    files = [{'name': f'文件{i}', 'size': i * 12345678901} for i in range(100)]
+    data = {'type': 'folder', 'meta': {'readme': '"files": [1]'}, 'files': files}
+    content = json.dumps({'code': 200, 'message': 'success', 'data': data}).encode('utf-8')
+    assert list(iter_response_items(chunked(content, size))) == files
+
+def test_iter_response_items_error():
+    content = b'{"code": 404, "message": "path not found", "data": null}'
+    with pytest.raises(HTTPError):
+        list(iter_response_items(chunked(content, 5)))
+
+def test_iter_path(client):
+    files = list(client.public.iter_path('/'))
+    assert files == client.public.path('/')['files']
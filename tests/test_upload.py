@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import pytest
+from types import SimpleNamespace
+from requests.exceptions import ConnectionError
+from urllib3.exceptions import NewConnectionError
+import alist
+from alist import AlistClient
+from alist.retry import RetryPolicy
+from alist.upload import collect_files, plan_batches, AlistBulkUploader
+
+def make_tree(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    for i in range(5):
+        (tmp_path / f'{i}.bin').write_bytes(b'x' * (i * 100))
+        (tmp_path / 'sub' / f'{i}.bin').write_bytes(b'x' * 10)
+
+def test_collect_files(tmp_path):
+    make_tree(tmp_path)
+    files = collect_files(str(tmp_path), '/target/')
+    assert len(files) == 10
+    assert {target for _, target in files} == {'/target', '/target/sub'}
+
+    files = collect_files([str(tmp_path / '0.bin'), (str(tmp_path / '1.bin'), '/other')], '/target')
+    assert [target for _, target in files] == ['/target', '/other']
+
+def test_plan_batches(tmp_path):
+    make_tree(tmp_path)
+    batches = plan_batches(collect_files(str(tmp_path), '/t'), max_batch_bytes=500, max_batch_files=3)
+    assert sum(len(b) for _, b in batches) == 10
+    for target, filenames in batches:
+        assert len(filenames) <= 3
+    assert [len(b) for t, b in batches if t == '/t'] == [1, 2, 2]
+
+def test_plan_batches_missing_file(tmp_path):
+    make_tree(tmp_path)
+    files = collect_files(str(tmp_path), '/t') + [(str(tmp_path / 'missing.bin'), '/t')]
+    with pytest.raises(OSError):
+        plan_batches(files)
+    failed = list()
+    batches = plan_batches(files, failed=failed)
+    assert sum(len(b) for _, b in batches) == 10
+    assert [(f, t) for f, t, _ in failed] == [(str(tmp_path / 'missing.bin'), '/t')]
+
+class FakePublic(object):
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def upload(self, files, path, password=None, retry=True):
+        # 批次由AlistBulkUploader重试，不使用客户端的重试策略
+        assert retry is False
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return True
+
+def not_connected():
+    return ConnectionError(SimpleNamespace(reason=NewConnectionError(None, 'refused')))
+
+def test_upload_retry_not_connected(tmp_path):
+    make_tree(tmp_path)
+    files = [str(tmp_path / '1.bin'), str(tmp_path / 'missing.bin')]
+
+    public = FakePublic([not_connected()])
+    results = AlistBulkUploader(public, backoff=0).upload(files, '/t')
+    results = {r['file']: r for r in results}
+    assert results[files[0]]['success'] and results[files[0]]['attempts'] == 2
+    assert not results[files[1]]['success'] and results[files[1]]['attempts'] == 0
+
+    # 请求已经发送之后失败，默认不重试
+    public = FakePublic([ConnectionError('reset'), ValueError()])
+    results = AlistBulkUploader(public, backoff=0).upload(files[:1], '/t')
+    assert public.calls == 1 and not results[0]['success']
+
+    public = FakePublic([ConnectionError('reset'), ValueError()])
+    results = AlistBulkUploader(public, backoff=0, replay=True).upload(files[:1], '/t')
+    assert public.calls == 3 and results[0]['success']
+
+def test_upload_retry_one_layer(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    monkeypatch.setattr(alist.time, 'sleep', lambda delay: None)
+    client = AlistClient('http://127.0.0.1:9', retry=RetryPolicy(retries=3))
+    sent = list()
+
+    def request(*args, **kwargs):
+        sent.append(args)
+        raise not_connected()
+    client.session.request = request
+    results = client.public.upload_many([str(tmp_path / '1.bin')], '/t', retries=2)
+    # 每次批次尝试只发送一次请求，客户端的重试策略不叠加
+    assert len(sent) == 3 and results[0]['attempts'] == 3 and not results[0]['success']
+
+    sent.clear()
+    with pytest.raises(ConnectionError):
+        client.public.upload([str(tmp_path / '1.bin')], '/t')
+    assert len(sent) == 4
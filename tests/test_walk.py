@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# @Author: Kai Peng
+
+import threading
+import time
+import pytest
+from requests import HTTPError
+from alist.walk import AlistWalker, match, file_type_folder, file_type_text
+
+@pytest.mark.parametrize('patterns,path,name,result', [
+    (['*.txt'], '/a/b.txt', 'b.txt', True),
+    (['/a/*'], '/a/b.txt', 'b.txt', True),
+    (['/b/*'], '/a/b.txt', 'b.txt', False),
+    (['a'], '/a', 'a', True),
+])
+def test_match(patterns, path, name, result):
+    assert match(patterns, path, name) == result
+
+def test_get_password():
+    walker = AlistWalker(None, '/', password='default',
+                         passwords={'/a': '1', '/a/b/': '2'})
+    assert walker.get_password('/') == 'default'
+    assert walker.get_password('/a') == '1'
+    assert walker.get_password('/ab') == 'default'
+    assert walker.get_password('/a/b/c') == '2'
+
+def test_walk(client):
+    for dirpath, dirnames, filenames in client.public.walk('/', max_depth=1):
+        assert dirpath.startswith('/')
+
+
+class FakePublic(object):
+    """按照目录树返回文件列表，记录请求的路径、密码和同时进行的请求数。"""
+    def __init__(self, tree, delay = 0, fail = ()):
+        self.tree = tree
+        self.delay = delay
+        self.fail = set(fail)
+        self.listed = list()
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def iter_files(self, path, password = None, page_size = 100, prefetch = True):
+        with self.lock:
+            self.listed.append((path, password))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if path in self.fail:
+                raise HTTPError(f'failed to list {path}')
+            files = self.tree[path]
+        finally:
+            with self.lock:
+                self.active -= 1
+        for f in files:
+            yield f
+
+
+def folder(name):
+    return {'name': name, 'type': file_type_folder}
+
+def text(name):
+    return {'name': name, 'type': file_type_text}
+
+tree = {
+    '/': [folder('a'), folder('b'), folder('skip'), text('root.txt')],
+    '/a': [folder('c'), text('a.txt'), text('a.log')],
+    '/a/c': [text('c.txt')],
+    '/b': [text('b.txt')],
+    '/skip': [text('hidden.txt')],
+}
+
+def names(result):
+    return {path: ([d['name'] for d in dirs], [f['name'] for f in files]) for path, dirs, files in result}
+
+def test_walk_offline():
+    public = FakePublic(tree)
+    result = names(AlistWalker(public, '/', password='pw', passwords={'/b': 'b'}))
+    assert result == {
+        '/': (['a', 'b', 'skip'], ['root.txt']),
+        '/a': (['c'], ['a.txt', 'a.log']),
+        '/a/c': ([], ['c.txt']),
+        '/b': ([], ['b.txt']),
+        '/skip': ([], ['hidden.txt']),
+    }
+    assert dict(public.listed)['/b'] == 'b'
+    assert dict(public.listed)['/a/c'] == 'pw'
+
+def test_walk_concurrency():
+    public = FakePublic({'/': [folder(str(i)) for i in range(8)],
+                         **{f'/{i}': [] for i in range(8)}}, delay=0.05)
+    assert len(list(AlistWalker(public, '/', workers=4))) == 9
+    # 最多同时请求workers个目录，并且确实并发
+    assert public.peak == 4
+
+def test_walk_max_depth():
+    public = FakePublic(tree)
+    assert list(names(AlistWalker(public, '/', max_depth=0))) == ['/']
+    public = FakePublic(tree)
+    assert sorted(names(AlistWalker(public, '/', max_depth=1))) == ['/', '/a', '/b', '/skip']
+    assert '/a/c' not in [path for path, _ in public.listed]
+
+def test_walk_exclude_include():
+    public = FakePublic(tree)
+    result = names(AlistWalker(public, '/', exclude=['skip', '*.log'], include=['*.txt', '/a/*']))
+    # 被排除的目录不会列出，include不影响目录的遍历
+    assert '/skip' not in [path for path, _ in public.listed]
+    assert result['/'] == (['a', 'b'], ['root.txt'])
+    assert result['/a'] == (['c'], ['a.txt'])
+    assert set(result) == {'/', '/a', '/a/c', '/b'}
+
+    public = FakePublic(tree)
+    result = names(AlistWalker(public, '/', descend=lambda path, d: path != '/a'))
+    assert set(result) == {'/', '/b', '/skip'}
+
+def test_walk_onerror():
+    errors = list()
+    public = FakePublic(tree, fail=['/a'])
+    result = names(AlistWalker(public, '/', onerror=lambda path, e: errors.append((path, type(e)))))
+    assert errors == [('/a', HTTPError)]
+    assert set(result) == {'/', '/b', '/skip'}
+
+    with pytest.raises(HTTPError):
+        list(AlistWalker(FakePublic(tree, fail=['/a']), '/'))